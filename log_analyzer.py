@@ -2,192 +2,452 @@
 """
 Log analysis script for the TLNG Summit application.
 Provides insights into errors, warnings, and application usage.
+
+Every log is read together with its RotatingFileHandler backups
+(``error.log.1`` ... ``error.log.5``) and the ``logs/archive/*.log.gz`` files
+written by rotate_logs.sh. Files are streamed through ``log_parser`` in
+record batches, one process per file, and the per-file counters are merged
+afterwards.
+
+Per-file results are kept in ``logs/.analyzer_checkpoint.json`` keyed by
+inode, together with the byte offset reached. A rerun only reads what was
+appended since, and a file renamed by rotation keeps its inode and is not
+read again. Use ``--full`` to ignore the checkpoint.
+Usage: python log_analyzer.py [errors|requests|security|ratelimit] [--full] [--workers N]
 """
 
+import argparse
+import gzip
+import hashlib
+import json
 import os
 import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from collections import Counter, defaultdict
 from pathlib import Path
 
-def parse_log_line(line):
-    """Parse a log line and extract timestamp, level, and message."""
-    # Pattern for our log format: LEVEL TIMESTAMP MESSAGE
-    pattern = r'(\w+)\s+(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2},\d{3})\s+(.+)'
-    match = re.match(pattern, line)
-    if match:
-        level, timestamp, message = match.groups()
-        try:
-            dt = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S,%f')
-            return level, dt, message
-        except ValueError:
-            return None, None, None
-    return None, None, None
+from log_parser import LogParser
+
+LOGS_DIR = Path(__file__).parent / 'logs'
+ARCHIVE_DIR = LOGS_DIR / 'archive'
+CHECKPOINT_FILE = LOGS_DIR / '.analyzer_checkpoint.json'
+CHECKPOINT_VERSION = 2
+
+# How many of the latest entries each analysis keeps for its listings.
+LATEST_KEEP = 10
+# Leading bytes hashed to tell a reused inode from the file we checkpointed.
+FINGERPRINT_BYTES = 256
+
+RATE_LIMIT_PATTERN = re.compile(r'Rate limit exceeded: scope=(\S+) key=(\S+) rejected=(\d+) window=(\d+)')
+
+def new_summary():
+    """Return an empty summary: entry count, per-minute counts and named counters."""
+    return {'files': 0, 'total': 0, 'minutes': Counter(), 'counts': {}, 'peaks': {}, 'latest': []}
+
+def summary_from_json(data):
+    summary = dict(data)
+    summary['minutes'] = Counter({int(minute): count for minute, count in data['minutes'].items()})
+    summary['counts'] = {name: Counter(counter) for name, counter in data['counts'].items()}
+    return summary
+
+def merge_summaries(summary, other):
+    """Add ``other`` into ``summary`` and return it."""
+    summary['files'] += other['files']
+    summary['total'] += other['total']
+    summary['minutes'].update(other['minutes'])
+    for name, counter in other['counts'].items():
+        summary['counts'].setdefault(name, Counter()).update(counter)
+    for key, value in other['peaks'].items():
+        summary['peaks'][key] = max(summary['peaks'].get(key, 0), value)
+    summary['latest'] = sorted(summary['latest'] + other['latest'])[-LATEST_KEEP:]
+    return summary
+
+def _count_records(summary, timestamps):
+    summary['total'] += len(timestamps)
+    # Minutes are keyed by epoch minute.
+    summary['minutes'].update(int(timestamp // 60) for timestamp in timestamps)
+
+def _keep_latest(summary, timestamps, messages):
+    latest = [
+        [timestamp, message.partition('\n')[0]]
+        for timestamp, message in zip(timestamps[-LATEST_KEEP:], messages[-LATEST_KEEP:])
+    ]
+    summary['latest'] = (summary['latest'] + latest)[-LATEST_KEEP:]
+
+def scan_errors(summary, batch):
+    _count_records(summary, batch.timestamps)
+    # Error type: the module that logged it (the first word for simple-format lines)
+    summary['counts'].setdefault('types', Counter()).update(
+        module or message.split(' ', 1)[0] or 'Unknown'
+        for module, message in zip(batch.modules, batch.messages)
+    )
+    _keep_latest(summary, batch.timestamps, batch.messages)
+
+def scan_requests(summary, batch):
+    paths = summary['counts'].setdefault('paths', Counter())
+    status_codes = summary['counts'].setdefault('status_codes', Counter())
+    timestamps = []
+    for timestamp, message in zip(batch.timestamps, batch.messages):
+        if 'HTTP' not in message:
+            continue
+        timestamps.append(timestamp)
+
+        # Extract status code and path
+        parts = message.split('"')
+        if len(parts) >= 3:
+            request_line = parts[1]
+            status_part = parts[2].strip()
+
+            if ' ' in request_line:
+                method, path = request_line.split(' ')[:2]
+                paths[path] += 1
+
+            if status_part:
+                status_codes[status_part.split()[0]] += 1
+    _count_records(summary, timestamps)
+
+def scan_security(summary, batch):
+    _count_records(summary, batch.timestamps)
+    _keep_latest(summary, batch.timestamps, batch.messages)
+
+def scan_rate_limits(summary, batch):
+    for message in batch.messages:
+        if not message.startswith('Rate limit exceeded'):
+            continue
+        match = RATE_LIMIT_PATTERN.match(message)
+        if match:
+            scope, key, rejected, window = match.groups()
+            # The limiter logs a running count per window (the first
+            # rejection, then every 100th); keep the highest seen.
+            window_key = f'{scope} {key} {window}'
+            summary['peaks'][window_key] = max(summary['peaks'].get(window_key, 0), int(rejected))
+
+# analysis name -> (log it reads, batch scanner)
+ANALYSES = {
+    'errors': ('error', scan_errors),
+    'requests': ('django', scan_requests),
+    'security': ('security', scan_security),
+    'ratelimit': ('warning', scan_rate_limits),
+}
+
+def log_files(log_name):
+    """Return the archived, rotated and live files of a log, oldest first."""
+    archives = sorted(ARCHIVE_DIR.glob(f'{log_name}_*.log.gz'))
+    backups = [path for path in LOGS_DIR.glob(f'{log_name}.log.*') if path.suffix[1:].isdigit()]
+    backups.sort(key=lambda path: int(path.suffix[1:]), reverse=True)
+    live = LOGS_DIR / f'{log_name}.log'
+    return archives + backups + ([live] if live.exists() else [])
+
+def is_compressed(path):
+    return str(path).endswith('.gz')
+
+def fingerprint(path, length):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+def _complete_lines(f, compressed, progress):
+    """Yield decoded lines, adding their byte length to ``progress[0]``.
+
+    A trailing line without a newline is still being written and is left
+    for the next run.
+    """
+    for raw in f:
+        if not compressed and not raw.endswith(b'\n'):
+            break
+        progress[0] += len(raw)
+        yield raw.decode('utf-8', 'replace')
+
+def scan_file(analysis, path, offset):
+    """Summarise ``path`` from byte ``offset``; return (summary, offset reached).
+
+    Compressed archives are always read whole.
+    """
+    scan_batch = ANALYSES[analysis][1]
+    summary = new_summary()
+    summary['files'] = 1
+    compressed = is_compressed(path)
+    progress = [offset]
+
+    opener = gzip.open if compressed else open
+    with opener(path, 'rb') as f:
+        f.seek(offset)
+        for batch in LogParser().batches(_complete_lines(f, compressed, progress)):
+            scan_batch(summary, batch)
+
+    end = os.path.getsize(path) if compressed else progress[0]
+    return summary, end
+
+def load_checkpoint():
+    try:
+        data = json.loads(CHECKPOINT_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+    if data.get('version') != CHECKPOINT_VERSION:
+        return {}
+    return data['files']
+
+def save_checkpoint(files):
+    temp_file = CHECKPOINT_FILE.with_suffix('.tmp')
+    temp_file.write_text(json.dumps({'version': CHECKPOINT_VERSION, 'files': files}))
+    os.replace(temp_file, CHECKPOINT_FILE)
+
+def _resume_offset(path, stat, entry):
+    """Return the offset to continue ``path`` from, or 0 if it must be reread."""
+    if entry is None or stat.st_size < entry['offset']:
+        # New file, or truncated in place by rotate_logs.sh.
+        return 0
+    if is_compressed(path) and stat.st_size != entry['offset']:
+        return 0
+    if fingerprint(path, entry['fingerprint_length']) != entry['fingerprint']:
+        # The inode was reused by a different file.
+        return 0
+    return entry['offset']
+
+def collect(analyses, use_checkpoint=True, workers=None):
+    """Return ``{analysis: summary}`` across every file of each analysis's log."""
+    checkpoint = load_checkpoint() if use_checkpoint else {}
+    summaries = {analysis: new_summary() for analysis in analyses}
+    entries = {}
+    tasks = []
+
+    for analysis in analyses:
+        for path in log_files(ANALYSES[analysis][0]):
+            stat = path.stat()
+            key = f'{analysis}:{stat.st_dev}:{stat.st_ino}'
+            entry = checkpoint.get(key)
+            offset = _resume_offset(path, stat, entry)
+            if offset and offset == stat.st_size:
+                entries[key] = dict(entry, path=str(path))
+                merge_summaries(summaries[analysis], summary_from_json(entry['summary']))
+                continue
+            base = summary_from_json(entry['summary']) if offset else None
+            tasks.append((analysis, key, path, offset, base))
+
+    if len(tasks) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                scan_file, [t[0] for t in tasks], [t[2] for t in tasks], [t[3] for t in tasks]
+            ))
+    else:
+        results = [scan_file(analysis, path, offset) for analysis, key, path, offset, base in tasks]
 
-def analyze_error_log():
+    for (analysis, key, path, offset, base), (summary, end) in zip(tasks, results):
+        if base is not None:
+            summary = merge_summaries(base, summary)
+            summary['files'] = 1
+        length = min(end, FINGERPRINT_BYTES)
+        entries[key] = {
+            'path': str(path),
+            'offset': end,
+            'fingerprint_length': length,
+            'fingerprint': fingerprint(path, length),
+            'summary': summary,
+        }
+        merge_summaries(summaries[analysis], summary)
+
+    # Entries for other analyses stay; files that no longer exist are dropped.
+    files = {key: entry for key, entry in checkpoint.items() if key.split(':')[0] not in analyses}
+    files.update(entries)
+    if LOGS_DIR.exists():
+        save_checkpoint(files)
+    return summaries
+
+def recent_count(summary, **window):
+    """Count the summary's entries newer than ``timedelta(**window)`` ago."""
+    cutoff = (datetime.now() - timedelta(**window)).timestamp() // 60
+    return sum(count for minute, count in summary['minutes'].items() if minute >= cutoff)
+
+def recent_entries(summary, **window):
+    cutoff = (datetime.now() - timedelta(**window)).timestamp()
+    return [
+        (datetime.fromtimestamp(timestamp), message)
+        for timestamp, message in summary['latest'] if timestamp > cutoff
+    ]
+
+def analyze_error_log(summary=None):
     """Analyze error log for common issues."""
-    log_file = Path(__file__).parent / 'logs' / 'error.log'
-    if not log_file.exists():
+    if summary is None:
+        summary = collect(['errors'])['errors']
+    if not summary['files']:
         print("No error log found.")
         return
-    
-    errors = []
-    error_counts = Counter()
-    
-    with open(log_file, 'r') as f:
-        for line in f:
-            level, timestamp, message = parse_log_line(line)
-            if level and timestamp:
-                errors.append((timestamp, message))
-                # Extract error type
-                error_type = message.split()[0] if message else 'Unknown'
-                error_counts[error_type] += 1
-    
-    print(f"\n=== ERROR ANALYSIS (Total: {len(errors)}) ===")
-    
-    if not errors:
+
+    print(f"\n=== ERROR ANALYSIS (Total: {summary['total']}) ===")
+
+    if not summary['total']:
         print("No errors found!")
         return
-    
+
     # Recent errors (last 24 hours)
-    recent_cutoff = datetime.now() - timedelta(hours=24)
-    recent_errors = [e for e in errors if e[0] > recent_cutoff]
-    
-    print(f"Recent errors (last 24h): {len(recent_errors)}")
-    print(f"Most recent error: {errors[-1][0] if errors else 'None'}")
-    
+    print(f"Recent errors (last 24h): {recent_count(summary, hours=24)}")
+    print(f"Most recent error: {datetime.fromtimestamp(summary['latest'][-1][0]) if summary['latest'] else 'None'}")
+
     # Top error types
     print("\nTop error types:")
-    for error_type, count in error_counts.most_common(5):
+    for error_type, count in summary['counts'].get('types', Counter()).most_common(5):
         print(f"  {error_type}: {count}")
-    
+
     # Recent error details
+    recent_errors = recent_entries(summary, hours=24)
     if recent_errors:
         print(f"\nLast 5 errors:")
         for timestamp, message in recent_errors[-5:]:
             print(f"  {timestamp}: {message[:100]}...")
 
-def analyze_django_log():
+def analyze_django_log(summary=None):
     """Analyze Django log for request patterns."""
-    log_file = Path(__file__).parent / 'logs' / 'django.log'
-    if not log_file.exists():
+    if summary is None:
+        summary = collect(['requests'])['requests']
+    if not summary['files']:
         print("No Django log found.")
         return
-    
-    requests = []
-    status_codes = Counter()
-    paths = Counter()
-    
-    with open(log_file, 'r') as f:
-        for line in f:
-            level, timestamp, message = parse_log_line(line)
-            if level and timestamp and 'HTTP' in message:
-                requests.append((timestamp, message))
-                
-                # Extract status code and path
-                if '"' in message:
-                    parts = message.split('"')
-                    if len(parts) >= 3:
-                        request_line = parts[1]
-                        status_part = parts[2].strip()
-                        
-                        if ' ' in request_line:
-                            method, path = request_line.split(' ')[:2]
-                            paths[path] += 1
-                        
-                        if status_part:
-                            status_code = status_part.split()[0]
-                            status_codes[status_code] += 1
-    
-    print(f"\n=== DJANGO REQUEST ANALYSIS (Total: {len(requests)}) ===")
-    
-    if not requests:
+
+    print(f"\n=== DJANGO REQUEST ANALYSIS (Total: {summary['total']}) ===")
+
+    if not summary['total']:
         print("No requests logged!")
         return
-    
+
     # Recent requests (last hour)
-    recent_cutoff = datetime.now() - timedelta(hours=1)
-    recent_requests = [r for r in requests if r[0] > recent_cutoff]
-    
-    print(f"Recent requests (last hour): {len(recent_requests)}")
-    
+    print(f"Recent requests (last hour): {recent_count(summary, hours=1)}")
+
     # Top status codes
     print("\nTop status codes:")
-    for code, count in status_codes.most_common(10):
+    for code, count in summary['counts'].get('status_codes', Counter()).most_common(10):
         print(f"  {code}: {count}")
-    
+
     # Top requested paths
     print("\nTop requested paths:")
-    for path, count in paths.most_common(10):
+    for path, count in summary['counts'].get('paths', Counter()).most_common(10):
         print(f"  {path}: {count}")
 
-def analyze_security_log():
+def analyze_security_log(summary=None):
     """Analyze security log for suspicious activity."""
-    log_file = Path(__file__).parent / 'logs' / 'security.log'
-    if not log_file.exists():
+    if summary is None:
+        summary = collect(['security'])['security']
+    if not summary['files']:
         print("No security log found.")
         return
-    
-    security_events = []
-    
-    with open(log_file, 'r') as f:
-        for line in f:
-            level, timestamp, message = parse_log_line(line)
-            if level and timestamp:
-                security_events.append((timestamp, message))
-    
-    print(f"\n=== SECURITY ANALYSIS (Total: {len(security_events)}) ===")
-    
-    if not security_events:
+
+    print(f"\n=== SECURITY ANALYSIS (Total: {summary['total']}) ===")
+
+    if not summary['total']:
         print("No security events logged!")
         return
-    
+
     # Recent security events (last 24 hours)
-    recent_cutoff = datetime.now() - timedelta(hours=24)
-    recent_events = [e for e in security_events if e[0] > recent_cutoff]
-    
-    print(f"Recent security events (last 24h): {len(recent_events)}")
-    
+    print(f"Recent security events (last 24h): {recent_count(summary, hours=24)}")
+
     # Show recent events
+    recent_events = recent_entries(summary, hours=24)
     if recent_events:
         print("\nRecent security events:")
         for timestamp, message in recent_events[-10:]:
             print(f"  {timestamp}: {message[:100]}...")
 
-def generate_report():
+def analyze_rate_limits(summary=None):
+    """Summarise rate limiter rejections from the warning log."""
+    if summary is None:
+        summary = collect(['ratelimit'])['ratelimit']
+    if not summary['files']:
+        print("No warning log found.")
+        return
+
+    rejected_by_scope = Counter()
+    rejected_by_key = Counter()
+    for window_key, rejected in summary['peaks'].items():
+        scope, key, window = window_key.split(' ')
+        rejected_by_scope[scope] += rejected
+        rejected_by_key[f"{scope} {key}"] += rejected
+
+    print(f"\n=== RATE LIMIT ANALYSIS (Total rejected: {sum(rejected_by_scope.values())}) ===")
+
+    if not summary['peaks']:
+        print("No rate limited requests logged!")
+        return
+
+    print("\nRejected requests by endpoint:")
+    for scope, count in rejected_by_scope.most_common():
+        print(f"  {scope}: {count}")
+
+    print("\nTop offenders:")
+    for key, count in rejected_by_key.most_common(10):
+        print(f"  {key}: {count}")
+
+def generate_report(use_checkpoint=True, workers=None):
     """Generate a comprehensive log report."""
     print("=" * 60)
     print("TLNG SUMMIT LOG ANALYSIS REPORT")
     print(f"Generated: {datetime.now()}")
     print("=" * 60)
-    
-    analyze_error_log()
-    analyze_django_log()
-    analyze_security_log()
-    
+
+    summaries = collect(list(ANALYSES), use_checkpoint, workers)
+    analyze_error_log(summaries['errors'])
+    analyze_django_log(summaries['requests'])
+    analyze_security_log(summaries['security'])
+    analyze_rate_limits(summaries['ratelimit'])
+
     # Log file sizes
     print(f"\n=== LOG FILE SIZES ===")
-    logs_dir = Path(__file__).parent / 'logs'
-    if logs_dir.exists():
-        for log_file in logs_dir.glob('*.log'):
+    if LOGS_DIR.exists():
+        for log_file in sorted(LOGS_DIR.glob('*.log*')) + sorted(ARCHIVE_DIR.glob('*.log.gz')):
             size_mb = log_file.stat().st_size / (1024 * 1024)
-            print(f"  {log_file.name}: {size_mb:.2f} MB")
+            print(f"  {log_file.relative_to(LOGS_DIR)}: {size_mb:.2f} MB")
 
 def main():
-    import sys
-    
-    if len(sys.argv) > 1:
-        command = sys.argv[1]
-        if command == 'errors':
-            analyze_error_log()
-        elif command == 'requests':
-            analyze_django_log()
-        elif command == 'security':
-            analyze_security_log()
-        else:
-            print("Invalid command. Use: errors, requests, security, or no argument for full report")
-    else:
-        generate_report()
+    parser = argparse.ArgumentParser(description='Analyze the TLNG Summit logs.')
+    parser.add_argument(
+        'command', nargs='?', choices=list(ANALYSES) + ['ingest', 'query'],
+        help='Analysis to run, or ingest/query for the log warehouse (default: full report)'
+    )
+    parser.add_argument('--full', action='store_true', help='Ignore the checkpoint and reread every file')
+    parser.add_argument('--workers', type=int, help='Processes to scan files with (default: one per CPU)')
+    warehouse = parser.add_argument_group('query options')
+    warehouse.add_argument('--since', help='Start time, YYYY-MM-DD HH:MM[:SS]')
+    warehouse.add_argument('--until', help='End time (exclusive), YYYY-MM-DD HH:MM[:SS]')
+    warehouse.add_argument('--log', help='Only records from this log (error, warning, info, django, security)')
+    warehouse.add_argument('--level', help='Only records at this level')
+    warehouse.add_argument('--path', help='Only records for this request path')
+    warehouse.add_argument('--status', type=int, help='Only records with this status code')
+    warehouse.add_argument('--ip', help='Only records mentioning this client IP')
+    warehouse.add_argument('--contains', help='Only records whose message contains this text')
+    warehouse.add_argument('--group-by', help='Count matches by log, level, module, path, status, ip or minute')
+    warehouse.add_argument('--limit', type=int, default=50, help='Maximum rows to show (default: 50)')
+    args = parser.parse_args()
+
+    if args.command is None:
+        generate_report(not args.full, args.workers)
+        return
+
+    if args.command in ('ingest', 'query'):
+        import log_warehouse
+        if not LOGS_DIR.exists():
+            print("No logs directory found.")
+            return
+        if args.command == 'ingest':
+            start = datetime.now()
+            loaded = log_warehouse.ingest()
+            print(f"Loaded {loaded} records into {log_warehouse.WAREHOUSE_FILE} in {datetime.now() - start}")
+            return
+        try:
+            rows = log_warehouse.query(
+                since=args.since, until=args.until, log=args.log, level=args.level, path=args.path,
+                status=args.status, ip=args.ip, contains=args.contains, group_by=args.group_by,
+                limit=args.limit,
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        log_warehouse.print_query(rows, args.group_by)
+        return
+
+    summary = collect([args.command], not args.full, args.workers)[args.command]
+    {
+        'errors': analyze_error_log,
+        'requests': analyze_django_log,
+        'security': analyze_security_log,
+        'ratelimit': analyze_rate_limits,
+    }[args.command](summary)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,124 @@
+"""
+Parser for the TLNG Summit log formats.
+
+The file handlers use the ``verbose`` formatter,
+``{levelname} {asctime} {module} {process:d} {thread:d} {message}``, and the
+console uses ``simple``, ``{levelname} {asctime} {message}``. Each line is
+split once on spaces; there is no regex. Timestamps are not run through
+strptime per line: the epoch of each ``YYYY-MM-DD HH:MM`` prefix is computed
+once and cached, and the seconds and milliseconds are added to it.
+
+Records come out in ``RecordBatch`` objects, one column per field: levels,
+modules and messages are lists, timestamps (epoch seconds, local time), pids
+and thread ids are arrays. Lines that don't start a record (traceback lines,
+for instance) are appended to the previous record's message.
+"""
+
+from array import array
+from datetime import datetime
+
+LEVELS = frozenset(('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'))
+BATCH_SIZE = 10000
+
+
+class RecordBatch:
+    """Parsed log records stored column by column."""
+
+    __slots__ = ('levels', 'timestamps', 'modules', 'pids', 'threads', 'messages')
+
+    def __init__(self):
+        self.levels = []
+        self.timestamps = array('d')
+        self.modules = []
+        self.pids = array('q')
+        self.threads = array('q')
+        self.messages = []
+
+    def __len__(self):
+        return len(self.levels)
+
+    def append(self, record):
+        level, timestamp, module, pid, thread, message = record
+        self.levels.append(level)
+        self.timestamps.append(timestamp)
+        self.modules.append(module)
+        self.pids.append(pid)
+        self.threads.append(thread)
+        self.messages.append(message)
+
+    def rows(self):
+        """Iterate the batch as (level, timestamp, module, pid, thread, message) tuples."""
+        return zip(self.levels, self.timestamps, self.modules, self.pids, self.threads, self.messages)
+
+
+class LogParser:
+    """Parse verbose and simple format lines, caching timestamp prefixes."""
+
+    def __init__(self):
+        self._minutes = {}
+
+    def _minute_epoch(self, prefix):
+        try:
+            return self._minutes[prefix]
+        except KeyError:
+            pass
+        if len(self._minutes) > 100000:
+            self._minutes.clear()
+        epoch = datetime.strptime(prefix, '%Y-%m-%d%H:%M').timestamp()
+        self._minutes[prefix] = epoch
+        return epoch
+
+    def parse_line(self, line):
+        """Return (level, timestamp, module, pid, thread, message), or None."""
+        parts = line.rstrip('\r\n').split(' ', 6)
+        if len(parts) < 4 or parts[0] not in LEVELS:
+            return None
+        clock = parts[2]
+        if len(clock) != 12 or clock[8] != ',':
+            return None
+        try:
+            timestamp = self._minute_epoch(parts[1] + clock[:5]) + float(clock[6:].replace(',', '.'))
+        except ValueError:
+            return None
+
+        if len(parts) == 7 and parts[4].isdigit() and parts[5].isdigit():
+            return parts[0], timestamp, parts[3], int(parts[4]), int(parts[5]), parts[6]
+        return parts[0], timestamp, '', 0, 0, ' '.join(parts[3:])
+
+    def batches(self, lines, batch_size=BATCH_SIZE):
+        """Parse ``lines`` into RecordBatch objects of up to ``batch_size`` records.
+
+        A batch is only yielded when the next record starts, so each record
+        carries all of its continuation lines. Continuation lines before the
+        first record are dropped.
+        """
+        parse_line = self.parse_line
+        batch = RecordBatch()
+        levels, timestamps, modules, pids, threads, messages = (
+            batch.levels, batch.timestamps, batch.modules, batch.pids, batch.threads, batch.messages
+        )
+        for line in lines:
+            record = parse_line(line)
+            if record is None:
+                if messages and line.strip():
+                    messages[-1] += '\n' + line.rstrip('\r\n')
+                continue
+            if len(levels) >= batch_size:
+                yield batch
+                batch = RecordBatch()
+                levels, timestamps, modules, pids, threads, messages = (
+                    batch.levels, batch.timestamps, batch.modules, batch.pids, batch.threads, batch.messages
+                )
+            level, timestamp, module, pid, thread, message = record
+            levels.append(level)
+            timestamps.append(timestamp)
+            modules.append(module)
+            pids.append(pid)
+            threads.append(thread)
+            messages.append(message)
+        if levels:
+            yield batch
+
+def parse_lines(lines, batch_size=BATCH_SIZE):
+    """Parse an iterable of log lines into RecordBatch objects."""
+    return LogParser().batches(lines, batch_size)
@@ -0,0 +1,241 @@
+"""
+SQLite warehouse of parsed log records for ad-hoc queries.
+
+``python log_analyzer.py ingest`` loads every live, rotated and archived log
+under ``logs/`` into ``logs/warehouse.sqlite3``. Records are parsed in
+``log_parser`` batches and inserted with one ``executemany`` per batch, in
+WAL mode, with the request path, status code and client IP pulled out into
+indexed columns. The summit logger writes a WARNING or ERROR record to
+warning.log and error.log (and info.log) alike, so records are unique on
+(ts, pid, thread, level, message) and inserted with ``INSERT OR IGNORE``;
+``log`` is the first log the record was found in, error before warning
+before info. Like the analyzer checkpoint, each file is tracked by inode
+and byte offset, so a rerun only loads new lines. A file truncated by
+rotate_logs.sh has its rows replaced, because the same lines come back
+through the gzipped archive. Rows from files that have since been deleted
+are kept.
+
+``python log_analyzer.py query`` filters by time window, log, level, path,
+status, IP and message text, or counts matches grouped by one column::
+
+    python log_analyzer.py query --since "2026-03-02 14:03" --until "2026-03-02 14:04" --status 500
+    python log_analyzer.py query --since "2026-03-02 14:00" --group-by path
+"""
+
+import gzip
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+from log_analyzer import (
+    FINGERPRINT_BYTES, LOGS_DIR, _complete_lines, _resume_offset, fingerprint, is_compressed, log_files,
+)
+from log_parser import LogParser
+
+WAREHOUSE_FILE = LOGS_DIR / 'warehouse.sqlite3'
+WAREHOUSE_LOGS = ('error', 'warning', 'info', 'django', 'security')
+GROUP_COLUMNS = ('log', 'level', 'module', 'path', 'status', 'ip', 'minute')
+
+REQUEST_PATTERN = re.compile(r'"[A-Z]+ (\S+) HTTP/[\d.]+" (\d{3})')
+# "Internal Server Error: /register/", "Forbidden (CSRF token missing.): /nomination/"
+PATH_PATTERN = re.compile(r': (/\S*)$')
+IP_PATTERN = re.compile(r'(?<![\d.])(\d{1,3}(?:\.\d{1,3}){3})(?![\d.])')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    key TEXT UNIQUE,
+    log TEXT NOT NULL,
+    path TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    fingerprint_length INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL,
+    log TEXT NOT NULL,
+    level TEXT NOT NULL,
+    ts REAL NOT NULL,
+    module TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    thread INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    path TEXT,
+    status INTEGER,
+    ip TEXT
+);
+CREATE INDEX IF NOT EXISTS records_ts_idx ON records (ts);
+CREATE INDEX IF NOT EXISTS records_log_ts_idx ON records (log, ts);
+CREATE INDEX IF NOT EXISTS records_path_ts_idx ON records (path, ts);
+CREATE INDEX IF NOT EXISTS records_status_ts_idx ON records (status, ts);
+CREATE INDEX IF NOT EXISTS records_ip_ts_idx ON records (ip, ts);
+CREATE INDEX IF NOT EXISTS records_source_idx ON records (source_id);
+"""
+
+RECORD_INDEX = 'records_record_idx'
+
+def connect(db_file=WAREHOUSE_FILE):
+    connection = sqlite3.connect(db_file)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.executescript(SCHEMA)
+    if not connection.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (RECORD_INDEX,)).fetchone():
+        # Warehouses loaded before records were deduplicated hold copies.
+        with connection:
+            connection.execute(
+                'DELETE FROM records WHERE id NOT IN '
+                '(SELECT MIN(id) FROM records GROUP BY ts, pid, thread, level, message)'
+            )
+            connection.execute(f'CREATE UNIQUE INDEX {RECORD_INDEX} ON records (ts, pid, thread, level, message)')
+    return connection
+
+def request_fields(message):
+    """Return (path, status, ip) mentioned in a log message, each possibly None."""
+    first_line = message.partition('\n')[0]
+    match = REQUEST_PATTERN.search(first_line)
+    if match:
+        path, status = match.group(1), int(match.group(2))
+    else:
+        match = PATH_PATTERN.search(first_line)
+        path, status = (match.group(1) if match else None), None
+    match = IP_PATTERN.search(first_line)
+    return path, status, match.group(1) if match else None
+
+def _rows(source_id, log_name, batch):
+    for level, timestamp, module, pid, thread, message in batch.rows():
+        yield (source_id, log_name, level, timestamp, module, pid, thread, message, *request_fields(message))
+
+def ingest_file(connection, source_id, log_name, path, offset):
+    """Load ``path`` from byte ``offset``; return (new records loaded, offset reached)."""
+    compressed = is_compressed(path)
+    progress = [offset]
+    changes = connection.total_changes
+
+    opener = gzip.open if compressed else open
+    with opener(path, 'rb') as f:
+        f.seek(offset)
+        for batch in LogParser().batches(_complete_lines(f, compressed, progress)):
+            connection.executemany(
+                'INSERT OR IGNORE INTO records (source_id, log, level, ts, module, pid, thread, message, path, status, ip) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                _rows(source_id, log_name, batch)
+            )
+
+    # Copies of records already loaded from another log are ignored.
+    loaded = connection.total_changes - changes
+    return loaded, os.path.getsize(path) if compressed else progress[0]
+
+def ingest(db_file=WAREHOUSE_FILE, logs=WAREHOUSE_LOGS):
+    """Load new lines from every file of ``logs``; return the number of records loaded."""
+    connection = connect(db_file)
+    sources = {
+        row[0]: {'id': row[1], 'offset': row[2], 'fingerprint_length': row[3], 'fingerprint': row[4]}
+        for row in connection.execute(
+            'SELECT key, id, offset, fingerprint_length, fingerprint FROM sources WHERE key IS NOT NULL'
+        )
+    }
+    seen = set()
+    loaded = 0
+
+    for log_name in logs:
+        for path in log_files(log_name):
+            stat = path.stat()
+            key = f'{log_name}:{stat.st_dev}:{stat.st_ino}'
+            seen.add(key)
+            entry = sources.get(key)
+            offset = _resume_offset(path, stat, entry)
+            if entry and offset == stat.st_size == entry['offset']:
+                continue
+
+            # One transaction per file, so a crash never loads lines twice.
+            with connection:
+                if entry is None:
+                    source_id = connection.execute(
+                        'INSERT INTO sources (key, log, path, offset, fingerprint_length, fingerprint) '
+                        "VALUES (?, ?, ?, 0, 0, '')",
+                        (key, log_name, str(path))
+                    ).lastrowid
+                else:
+                    source_id = entry['id']
+                    if offset == 0:
+                        # Truncated or replaced: its old lines are in an archive now.
+                        connection.execute('DELETE FROM records WHERE source_id = ?', (source_id,))
+                count, end = ingest_file(connection, source_id, log_name, path, offset)
+                length = min(end, FINGERPRINT_BYTES)
+                connection.execute(
+                    'UPDATE sources SET path = ?, offset = ?, fingerprint_length = ?, fingerprint = ? WHERE id = ?',
+                    (str(path), end, length, fingerprint(path, length), source_id)
+                )
+            loaded += count
+
+    # Deleted files keep their rows but free their inode key.
+    with connection:
+        for key in set(sources) - seen:
+            connection.execute('UPDATE sources SET key = NULL WHERE key = ?', (key,))
+    connection.close()
+    return loaded
+
+def parse_time(value):
+    """Parse ``YYYY-MM-DD HH:MM[:SS]`` (local time) into epoch seconds."""
+    for time_format in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, time_format).timestamp()
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid time {value!r}; use YYYY-MM-DD HH:MM[:SS]")
+
+def _like_pattern(text):
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+def query(db_file=WAREHOUSE_FILE, since=None, until=None, log=None, level=None, path=None,
+          status=None, ip=None, contains=None, group_by=None, limit=50):
+    """Return matching records, or (value, count) rows when ``group_by`` is set."""
+    conditions, params = [], []
+    for clause, value in (
+        ('ts >= ?', parse_time(since) if since else None),
+        ('ts < ?', parse_time(until) if until else None),
+        ('log = ?', log),
+        ('level = ?', level.upper() if level else None),
+        ('path = ?', path),
+        ('status = ?', status),
+        ('ip = ?', ip),
+        ("message LIKE ? ESCAPE '\\'", _like_pattern(contains) if contains else None),
+    ):
+        if value is not None:
+            conditions.append(clause)
+            params.append(value)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+    connection = connect(db_file)
+    if group_by:
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Can't group by {group_by!r}")
+        column = "strftime('%Y-%m-%d %H:%M', ts, 'unixepoch', 'localtime')" if group_by == 'minute' else group_by
+        order = 'value' if group_by == 'minute' else 'count DESC'
+        rows = connection.execute(
+            f'SELECT {column} AS value, COUNT(*) AS count FROM records {where} '
+            f'GROUP BY value ORDER BY {order} LIMIT ?',
+            params + [limit]
+        ).fetchall()
+    else:
+        rows = connection.execute(
+            f'SELECT ts, log, level, module, message FROM records {where} ORDER BY ts LIMIT ?',
+            params + [limit]
+        ).fetchall()
+    connection.close()
+    return rows
+
+def print_query(rows, group_by=None):
+    if not rows:
+        print("No matching records.")
+        return
+    if group_by:
+        for value, count in rows:
+            print(f"  {value}: {count}")
+        return
+    for timestamp, log_name, level, module, message in rows:
+        first_line = message.partition('\n')[0]
+        print(f"{datetime.fromtimestamp(timestamp)} [{log_name}] {level} {module} {first_line[:200]}")
@@ -1,15 +1,34 @@
 #!/usr/bin/env python3
 """
 Log monitoring script for the TLNG Summit application.
-Usage: python monitor_logs.py [log_type]
-Log types: error, warning, info, django, security, all
+Usage: python monitor_logs.py [tail|watch|all] [log_type ...]
+Log types: error, warning, info, django, security
+
+``watch`` follows several logs at once and prints their lines interleaved
+by timestamp. Each file is polled with one stat() per round, backing off
+while the logs are quiet. A file renamed by RotatingFileHandler is read to
+its end before the new file is opened. One truncated in place by
+rotate_logs.sh is reread from the start, even if it has grown past the old
+position since, because its leading bytes no longer match.
 """
 
+import argparse
 import os
-import sys
+import re
 import time
+from collections import deque
 from pathlib import Path
 
+from log_analyzer import FINGERPRINT_BYTES
+from log_parser import LogParser
+
+LOG_TYPES = ['error', 'warning', 'info', 'django', 'security']
+WATCH_DEFAULT = ['error', 'warning', 'security', 'django']
+LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
+# Records also written to another watched log (summit errors go to both
+# error.log and warning.log) are printed once.
+DEDUPE_WINDOW = 1000
+
 def get_log_file(log_type):
     """Get the log file path for the given log type."""
     logs_dir = Path(__file__).parent / 'logs'
@@ -22,6 +41,35 @@ def get_log_file(log_type):
     }
     return log_files.get(log_type)
 
+def read_tail(path, lines=50, block_size=8192):
+    """Return the last ``lines`` lines of ``path``.
+
+    The file is read backwards in ``block_size`` blocks until enough lines
+    have been seen, so memory grows with the lines asked for, not the file.
+    """
+    if lines <= 0:
+        return []
+    blocks = []
+    newlines = 0
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        # One newline more than ``lines`` guarantees the first line is whole
+        # (the last one usually ends the file).
+        while position > 0 and newlines <= lines:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            block = f.read(size)
+            blocks.append(block)
+            newlines += block.count(b'\n')
+
+    data = b''.join(reversed(blocks))
+    if data.endswith(b'\n'):
+        data = data[:-1]
+    if not data:
+        return []
+    return [line.decode('utf-8', 'replace').rstrip('\r') for line in data.split(b'\n')[-lines:]]
+
 def tail_log(log_file, lines=50):
     """Display the last N lines of a log file."""
     if not log_file.exists():
@@ -29,35 +77,146 @@ def tail_log(log_file, lines=50):
         return
     
     print(f"\n=== Last {lines} lines of {log_file.name} ===")
-    with open(log_file, 'r') as f:
-        file_lines = f.readlines()
-        for line in file_lines[-lines:]:
-            print(line.rstrip())
+    for line in read_tail(log_file, lines):
+        print(line)
 
-def monitor_log(log_file):
-    """Monitor a log file in real-time."""
-    if not log_file.exists():
-        print(f"Waiting for log file {log_file} to be created...")
-        while not log_file.exists():
-            time.sleep(1)
-    
-    print(f"\n=== Monitoring {log_file.name} (Press Ctrl+C to stop) ===")
-    
-    with open(log_file, 'r') as f:
-        # Go to end of file
-        f.seek(0, 2)
-        
+class LogFollower:
+    """Follow one log file across rotation and truncation."""
+
+    def __init__(self, name, path, from_end=True):
+        self.name = name
+        self.path = path
+        self.from_end = from_end
+        self.file = None
+        self.inode = None
+        self.mtime = None
+        # Leading bytes of the file as last read, to spot one rewritten in place.
+        self.head = b''
+        self.partial = b''
+        # Timestamp and filter decision of the last record, for continuation lines.
+        self.last_timestamp = 0.0
+        self.last_shown = False
+
+    def _open(self):
+        try:
+            self.file = open(self.path, 'rb')
+        except FileNotFoundError:
+            # Whatever is written once it exists is new.
+            self.from_end = False
+            return False
+        stat = os.fstat(self.file.fileno())
+        self.inode, self.mtime = stat.st_ino, stat.st_mtime_ns
+        self.head = b''
+        if self.from_end:
+            # Only a file that existed when we started begins at its end;
+            # files created later, by rotation or otherwise, are read whole.
+            self.file.seek(0, 2)
+            self.from_end = False
+        return True
+
+    def _drain(self, final=False):
+        data = self.partial + self.file.read()
+        lines = data.split(b'\n')
+        self.partial = b'' if final else lines.pop()
+        if len(self.head) < FINGERPRINT_BYTES:
+            self.head = os.pread(self.file.fileno(), min(self.file.tell(), FINGERPRINT_BYTES), 0)
+        return [line.decode('utf-8', 'replace') for line in lines if line or not final]
+
+    def _rewritten(self, stat):
+        """Whether the file was truncated or replaced in place since the last read."""
+        if stat.st_size < self.file.tell():
+            return True
+        # Only a changed file can have a different start.
+        return stat.st_mtime_ns != self.mtime and os.pread(self.file.fileno(), len(self.head), 0) != self.head
+
+    def poll(self):
+        """Return the complete lines written since the last poll."""
+        if self.file is None and not self._open():
+            return []
         try:
-            while True:
-                line = f.readline()
-                if line:
-                    print(line.rstrip())
-                else:
-                    time.sleep(0.1)
-        except KeyboardInterrupt:
-            print(f"\nStopped monitoring {log_file.name}")
-
-def show_all_logs():
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            # Renamed away and not recreated yet; keep reading the old file.
+            return self._drain()
+
+        if stat.st_ino != self.inode:
+            # Renamed by RotatingFileHandler: finish the old file first.
+            lines = self._drain(final=True)
+            self.file.close()
+            self.file = None
+            if self._open():
+                lines += self._drain()
+            return lines
+
+        if self._rewritten(stat):
+            # Truncated in place by rotate_logs.sh, possibly refilled since.
+            self.file.seek(0)
+            self.partial = b''
+            self.head = b''
+        self.mtime = stat.st_mtime_ns
+        return self._drain()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+def follow_logs(log_types, min_level=None, pattern=None, interval=0.1, max_interval=1.0):
+    """Print new lines from several logs, interleaved by timestamp, until Ctrl+C."""
+    followers = [LogFollower(log_type, get_log_file(log_type)) for log_type in log_types]
+    parser = LogParser()
+    levels = set(LEVELS[LEVELS.index(min_level):]) if min_level else None
+    recent = deque(maxlen=DEDUPE_WINDOW)
+    recent_keys = set()
+    delay = interval
+    sequence = 0
+
+    print(f"\n=== Monitoring {', '.join(f'{t}.log' for t in log_types)} (Press Ctrl+C to stop) ===")
+    try:
+        while True:
+            records = []
+            for follower in followers:
+                record = None
+                for line in follower.poll():
+                    parsed = parser.parse_line(line)
+                    if parsed is None:
+                        if record is None:
+                            # Continues a record printed in an earlier round.
+                            record = [follower.last_timestamp, sequence, follower.name, follower.last_shown, []]
+                            records.append(record)
+                            sequence += 1
+                        record[4].append(line)
+                        continue
+
+                    level, timestamp, module, pid, thread, message = parsed
+                    shown = (levels is None or level in levels) and (pattern is None or pattern.search(line))
+                    key = line.split(' ', 1)[1]
+                    if shown and key in recent_keys:
+                        shown = False
+                    elif shown:
+                        if len(recent) == recent.maxlen:
+                            recent_keys.discard(recent[0])
+                        recent.append(key)
+                        recent_keys.add(key)
+                    follower.last_timestamp, follower.last_shown = timestamp, bool(shown)
+                    record = [timestamp, sequence, follower.name, bool(shown), [line]]
+                    records.append(record)
+                    sequence += 1
+
+            records.sort()
+            for timestamp, _, name, shown, lines in records:
+                if shown:
+                    for line in lines:
+                        print(f"[{name}] {line}")
+
+            delay = interval if records else min(delay * 2, max_interval)
+            time.sleep(delay)
+    except KeyboardInterrupt:
+        print("\nStopped monitoring")
+    finally:
+        for follower in followers:
+            follower.close()
+
+def show_all_logs(lines=20):
     """Show recent entries from all log files."""
     logs_dir = Path(__file__).parent / 'logs'
     log_types = ['error', 'warning', 'info', 'django', 'security']
@@ -65,41 +224,41 @@ def show_all_logs():
     for log_type in log_types:
         log_file = logs_dir / f'{log_type}.log'
         if log_file.exists():
-            tail_log(log_file, 20)
+            tail_log(log_file, lines)
         else:
             print(f"\n=== {log_type.upper()} LOG ===")
             print("No log file found.")
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python monitor_logs.py [command] [log_type]")
-        print("Commands:")
-        print("  tail [log_type] - Show last 50 lines")
-        print("  watch [log_type] - Monitor in real-time")
-        print("  all - Show recent entries from all logs")
-        print("\nLog types: error, warning, info, django, security")
-        sys.exit(1)
-    
-    command = sys.argv[1]
-    
-    if command == 'all':
-        show_all_logs()
-    elif command in ['tail', 'watch'] and len(sys.argv) >= 3:
-        log_type = sys.argv[2]
-        log_file = get_log_file(log_type)
-        
-        if not log_file:
-            print(f"Invalid log type: {log_type}")
-            print("Available types: error, warning, info, django, security")
-            sys.exit(1)
-        
-        if command == 'tail':
-            tail_log(log_file)
-        elif command == 'watch':
-            monitor_log(log_file)
+    parser = argparse.ArgumentParser(description='Monitor the TLNG Summit logs.')
+    parser.add_argument(
+        'command', choices=['tail', 'watch', 'all'],
+        help='tail: show the last lines of a log; watch: follow logs in real-time; all: recent entries from every log'
+    )
+    parser.add_argument(
+        'log_types', nargs='*', metavar='log_type',
+        help=f"{', '.join(LOG_TYPES)} (watch default: {' '.join(WATCH_DEFAULT)})"
+    )
+    parser.add_argument('-n', '--lines', type=int, help='tail/all: number of lines to show (default: 50 for tail, 20 for all)')
+    parser.add_argument('--level', type=str.upper, choices=LEVELS, help='watch: only records at or above this level')
+    parser.add_argument('--grep', help='watch: only records whose first line matches this regex')
+    args = parser.parse_args()
+    for log_type in args.log_types:
+        if log_type not in LOG_TYPES:
+            parser.error(f"Invalid log type: {log_type}. Available types: {', '.join(LOG_TYPES)}")
+
+    if args.command == 'all':
+        show_all_logs(args.lines or 20)
+    elif args.command == 'tail':
+        if len(args.log_types) != 1:
+            parser.error('tail takes exactly one log type')
+        tail_log(get_log_file(args.log_types[0]), args.lines or 50)
     else:
-        print("Invalid command or missing log type.")
-        print("Use: python monitor_logs.py [tail|watch|all] [log_type]")
+        try:
+            pattern = re.compile(args.grep) if args.grep else None
+        except re.error as e:
+            parser.error(f'invalid --grep pattern: {e}')
+        follow_logs(args.log_types or WATCH_DEFAULT, args.level, pattern)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -1,11 +1,68 @@
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.urls import path
+from .exports import (
+    REGISTRATION_EXPORT_FIELDS, NOMINATION_EXPORT_FIELDS, csv_response,
+    xlsx_response, export_filename, openpyxl
+)
+from .inventory import save_registration
 from .models import (
     SiteSettings, EventContent, Speaker, SponsorshipLevel, Sponsor,
     AwardCategory, Nomination, ExhibitionPackage, Exhibitor,
-    AboutSectionContent, SummitOrganizer, ConferenceRegistration
+    AboutSectionContent, SummitOrganizer, ConferenceRegistration, MediaJob,
+    OutboundEmail, TicketInventory, StoredFile
 )
 
 
+class ExportMixin:
+    """Streaming CSV/XLSX export as an action and as a changelist button.
+
+    The button exports everything matching the changelist's current filters
+    and search; the action exports the selected rows.
+    """
+    export_fields = ()
+    export_prefix = 'export'
+    change_list_template = 'admin/summit/export_change_list.html'
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        if openpyxl is None:
+            actions.pop('export_xlsx', None)
+        return actions
+
+    def _export(self, queryset, fmt):
+        if fmt == 'xlsx':
+            return xlsx_response(queryset, self.export_fields, export_filename(self.export_prefix, 'xlsx'))
+        return csv_response(queryset, self.export_fields, export_filename(self.export_prefix, 'csv'))
+
+    @admin.action(description='Export selected to CSV')
+    def export_csv(self, request, queryset):
+        return self._export(queryset, 'csv')
+
+    @admin.action(description='Export selected to Excel (XLSX)')
+    def export_xlsx(self, request, queryset):
+        return self._export(queryset, 'xlsx')
+
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return [
+            path('export/<str:fmt>/', self.admin_site.admin_view(self.export_view), name='%s_%s_export' % info),
+        ] + super().get_urls()
+
+    def export_view(self, request, fmt):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        if fmt not in ('csv', 'xlsx') or (fmt == 'xlsx' and openpyxl is None):
+            raise Http404
+        changelist = self.get_changelist_instance(request)
+        return self._export(changelist.get_queryset(request), fmt)
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {'export_xlsx': openpyxl is not None, **(extra_context or {})}
+        return super().changelist_view(request, extra_context)
+
+
 @admin.register(SiteSettings)
 class SiteSettingsAdmin(admin.ModelAdmin):
     list_display = ('site_name', 'contact_email', 'updated_at')
@@ -123,7 +180,10 @@ class AwardCategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Nomination)
-class NominationAdmin(admin.ModelAdmin):
+class NominationAdmin(ExportMixin, admin.ModelAdmin):
+    export_fields = NOMINATION_EXPORT_FIELDS
+    export_prefix = 'nominations'
+    actions = ['export_csv', 'export_xlsx']
     list_display = ('nominee_name', 'category', 'nominator_name', 'submitted_at', 'is_reviewed', 'is_approved')
     list_filter = ('category', 'is_reviewed', 'is_approved', 'submitted_at')
     search_fields = ('nominee_name', 'nominator_name', 'nominee_company')
@@ -172,7 +232,10 @@ class SummitOrganizerAdmin(admin.ModelAdmin):
 
 
 @admin.register(ConferenceRegistration)
-class ConferenceRegistrationAdmin(admin.ModelAdmin):
+class ConferenceRegistrationAdmin(ExportMixin, admin.ModelAdmin):
+    export_fields = REGISTRATION_EXPORT_FIELDS
+    export_prefix = 'registrations'
+    actions = ['export_csv', 'export_xlsx']
     list_display = ('full_name', 'email', 'company', 'ticket_type', 'payment_status', 'registration_date')
     list_filter = ('attendee_type', 'ticket_type', 'payment_status', 'is_confirmed')
     search_fields = ('first_name', 'last_name', 'email', 'company')
@@ -198,6 +261,27 @@ class ConferenceRegistrationAdmin(admin.ModelAdmin):
         return f"{obj.first_name} {obj.last_name}"
     full_name.short_description = 'Full Name'
 
+    def save_model(self, request, obj, form, change):
+        # The form's clean() already refused sold-out ticket types.
+        save_registration(obj, oversell=True)
+
+
+@admin.register(TicketInventory)
+class TicketInventoryAdmin(admin.ModelAdmin):
+    list_display = ('ticket_type', 'capacity', 'reserved', 'remaining', 'updated_at')
+    readonly_fields = ('reserved', 'updated_at')
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            # Never write back the counter read when the form was opened.
+            obj.save(update_fields=['ticket_type', 'capacity', 'updated_at'])
+            return
+        obj.reserved = ConferenceRegistration.objects.filter(
+            ticket_type=obj.ticket_type,
+            payment_status__in=ConferenceRegistration.SEAT_HOLDING_STATUSES,
+        ).count()
+        super().save_model(request, obj, form, change)
+
 
 @admin.register(Exhibitor)
 class ExhibitorAdmin(admin.ModelAdmin):
@@ -215,3 +299,26 @@ class ExhibitorAdmin(admin.ModelAdmin):
             'fields': ('is_approved',)
         }),
     )
+
+
+@admin.register(MediaJob)
+class MediaJobAdmin(admin.ModelAdmin):
+    list_display = ('file_name', 'model_label', 'status', 'attempts', 'run_after', 'updated_at')
+    list_filter = ('status', 'model_label')
+    search_fields = ('file_name',)
+    readonly_fields = ('model_label', 'field_name', 'file_name', 'attempts', 'claimed_at', 'last_error', 'created_at', 'updated_at')
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to_email', 'status', 'attempts', 'send_after', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('to_email', 'subject')
+    readonly_fields = ('attempts', 'claimed_at', 'sent_at', 'last_error', 'created_at')
+
+
+@admin.register(StoredFile)
+class StoredFileAdmin(admin.ModelAdmin):
+    list_display = ('name', 'size', 'ref_count', 'created_at', 'updated_at')
+    search_fields = ('name',)
+    readonly_fields = ('name', 'size', 'ref_count', 'created_at', 'updated_at')
@@ -0,0 +1,87 @@
+"""
+Async versions of the public pages, routed instead of ``summit.views`` when
+``SUMMIT_ASYNC_VIEWS`` is set (the ASGI deployment, see
+``tlng_summit_project/asgi.py``).
+
+Independent reads are started together with ``asyncio.gather`` and the
+worker's event loop stays free while they run, so a slow mobile client no
+longer pins a thread. Templates are rendered through ``sync_to_async``
+because the context processors and lazy model attributes touch the ORM.
+The form views stay synchronous; Django runs them in its thread executor.
+"""
+
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import render
+
+from . import conditional
+from .cache import (
+    get_site_settings, get_event_content, get_about_section_content, cache_public_page,
+    get_slot_availability
+)
+from .models import Speaker, Sponsor, SummitOrganizer
+
+logger = logging.getLogger('summit')
+
+arender = sync_to_async(render)
+
+
+async def _fetch(queryset):
+    return [obj async for obj in queryset]
+
+
+def _singletons():
+    return get_site_settings(), get_event_content(), get_about_section_content()
+
+
+@conditional.page_condition('home')
+@cache_public_page
+async def home(request):
+    try:
+        logger.info(f"Home page accessed from IP: {request.META.get('REMOTE_ADDR')}")
+
+        singletons, featured_speakers, sponsors, summit_organizers = await asyncio.gather(
+            sync_to_async(_singletons)(),
+            _fetch(Speaker.objects.all()),
+            _fetch(Sponsor.objects.filter(is_active=True)),
+            _fetch(SummitOrganizer.objects.filter(is_active=True)),
+        )
+        site_settings, event_content, about_section_content = singletons
+
+        context = {
+            'site_settings': site_settings,
+            'event_content': event_content,
+            'about_section_content': about_section_content,
+            'featured_speakers': featured_speakers,
+            'sponsors': sponsors,
+            'summit_organizers': summit_organizers,
+        }
+
+        logger.info(f"Home page loaded successfully with {len(featured_speakers)} speakers, {len(sponsors)} sponsors, {len(summit_organizers)} organizers")
+        return await arender(request, 'summit/home.html', context)
+
+    except Exception as e:
+        logger.error(f"Error loading home page: {str(e)}", exc_info=True)
+        raise
+
+
+@conditional.page_condition('speakers')
+@cache_public_page
+async def speakers(request):
+    context = {
+        'speakers': await _fetch(Speaker.objects.all()),
+    }
+    return await arender(request, 'summit/speakers.html', context)
+
+
+@conditional.page_condition('sponsorship')
+@cache_public_page
+async def sponsorship(request):
+    sponsorship_levels, exhibition_packages = await sync_to_async(get_slot_availability)()
+    context = {
+        'sponsorship_levels': sponsorship_levels,
+        'exhibition_packages': exhibition_packages,
+    }
+    return await arender(request, 'summit/sponsorship.html', context)
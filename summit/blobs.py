@@ -0,0 +1,152 @@
+"""
+Reference counting for content-addressed media (see ``summit.storage``).
+
+Every model file field in ``CONTENT_ADDRESSED_FIELDS`` is tracked. Saving a
+row that points at a blob adds a reference to its ``StoredFile`` row,
+replacing or deleting the file releases one. Blobs that drop to zero
+references are not deleted on the spot, because an upload of the same
+content may be about to reuse them; ``manage.py dedupe_media`` removes them
+after a grace period, recounts every reference from the database, and moves
+files uploaded before content addressing into the ``cas/`` tree.
+"""
+
+import logging
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .images import IMAGE_FIELDS, delete_derivatives
+from .models import Nomination, SiteSettings, StoredFile
+from .storage import CAS_PREFIX, content_storage, is_content_addressed
+
+logger = logging.getLogger('summit')
+
+CONTENT_ADDRESSED_FIELDS = {
+    **IMAGE_FIELDS,
+    SiteSettings: IMAGE_FIELDS[SiteSettings] + ('favicon',),
+    Nomination: ('supporting_documents',),
+}
+
+
+def file_names(instance):
+    """Return ``{field_name: stored name}`` for the tracked fields of ``instance``."""
+    return {
+        field_name: getattr(instance, field_name).name or ''
+        for field_name in CONTENT_ADDRESSED_FIELDS.get(type(instance), ())
+    }
+
+
+def add_reference(name):
+    if not is_content_addressed(name):
+        return
+    if StoredFile.objects.filter(name=name).update(ref_count=F('ref_count') + 1, updated_at=timezone.now()):
+        return
+    try:
+        with transaction.atomic():
+            StoredFile.objects.create(name=name, size=content_storage.size(name), ref_count=1)
+    except IntegrityError:
+        # Another request created the row first.
+        StoredFile.objects.filter(name=name).update(ref_count=F('ref_count') + 1, updated_at=timezone.now())
+    except OSError:
+        logger.warning(f"Referenced blob {name} is missing from storage")
+
+
+def release_reference(name):
+    if is_content_addressed(name):
+        StoredFile.objects.filter(name=name, ref_count__gt=0).update(
+            ref_count=F('ref_count') - 1, updated_at=timezone.now()
+        )
+
+
+def update_references(old_names, new_names):
+    """Move references from ``old_names`` to ``new_names`` (both field -> name)."""
+    for field_name, new_name in new_names.items():
+        old_name = old_names.get(field_name, '')
+        if old_name == new_name:
+            continue
+        add_reference(new_name)
+        release_reference(old_name)
+
+
+def delete_blob(name):
+    delete_derivatives(name, content_storage)
+    content_storage.delete(name)
+
+
+def _iter_blobs(directory=CAS_PREFIX.rstrip('/')):
+    try:
+        directories, files = content_storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for sub in directories:
+        yield from _iter_blobs(f'{directory}/{sub}')
+    for filename in files:
+        # Derivatives are cleaned up with their blob.
+        if '__w' not in filename:
+            yield f'{directory}/{filename}'
+
+
+def import_existing_files():
+    """Move files saved before content addressing into the ``cas/`` tree; return the file count."""
+    # Several rows may share a legacy file: copy it once, point every row at
+    # the copy, and only delete the original once no row references it.
+    moved = {}
+    missing = set()
+    for model, fields in CONTENT_ADDRESSED_FIELDS.items():
+        for field_name in fields:
+            rows = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            for pk, old_name in rows.exclude(**{f'{field_name}__startswith': CAS_PREFIX}).values_list('pk', field_name):
+                if old_name not in moved:
+                    if old_name in missing or not content_storage.exists(old_name):
+                        missing.add(old_name)
+                        logger.warning(f"Skipping missing file {old_name} on {model.__name__} {pk}")
+                        continue
+                    with content_storage.open(old_name, 'rb') as f:
+                        moved[old_name] = content_storage.save(old_name, f)
+                # update() skips the save signals; dedupe_media recounts afterwards.
+                model.objects.filter(pk=pk).update(**{field_name: moved[old_name]})
+
+    for old_name in moved:
+        delete_derivatives(old_name, content_storage)
+        content_storage.delete(old_name)
+    return len(moved)
+
+
+def recount_references():
+    """Rebuild every ``StoredFile`` row from the tracked fields; return the blob count."""
+    counts = {}
+    for model, fields in CONTENT_ADDRESSED_FIELDS.items():
+        for field_name in fields:
+            names = model.objects.filter(**{f'{field_name}__startswith': CAS_PREFIX}).values_list(field_name, flat=True)
+            for name in names:
+                counts[name] = counts.get(name, 0) + 1
+
+    for name in _iter_blobs():
+        counts.setdefault(name, 0)
+
+    now = timezone.now()
+    existing = dict(StoredFile.objects.values_list('name', 'ref_count'))
+    for name, count in counts.items():
+        if name not in existing:
+            size = content_storage.size(name) if content_storage.exists(name) else 0
+            StoredFile.objects.create(name=name, size=size, ref_count=count)
+        elif existing[name] != count:
+            StoredFile.objects.filter(name=name).update(ref_count=count, updated_at=now)
+    StoredFile.objects.exclude(name__in=counts).filter(ref_count__gt=0).update(ref_count=0, updated_at=now)
+    return len(counts)
+
+
+def collect_garbage(grace):
+    """Delete blobs unreferenced for longer than ``grace``; return (count, bytes)."""
+    cutoff = timezone.now() - grace
+    deleted = freed = 0
+    for stored in StoredFile.objects.filter(ref_count=0, updated_at__lt=cutoff):
+        # Re-check at delete time so a blob reused meanwhile is kept.
+        if StoredFile.objects.filter(pk=stored.pk, ref_count=0).delete()[0]:
+            delete_blob(stored.name)
+            deleted += 1
+            freed += stored.size
+            logger.info(f"Deleted unreferenced blob {stored.name}")
+    return deleted, freed
+
@@ -0,0 +1,217 @@
+"""
+Caching helpers for the summit app.
+
+The singleton content models (SiteSettings, EventContent and
+AboutSectionContent) are read on nearly every page but edited a few times a
+month, so each worker keeps them in process memory. A version number stored
+in the shared Django cache lets every Passenger worker notice an edit made in
+another process; see ``summit.signals`` for the invalidation hooks.
+
+The public pages (home, speakers, sponsorship) are identical for every
+anonymous visitor, so ``cache_public_page`` stores their rendered HTML under
+a page version that is bumped whenever a model feeding them changes.
+"""
+
+import threading
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import (
+    SiteSettings, EventContent, AboutSectionContent, Speaker,
+    SponsorshipLevel, Sponsor, SummitOrganizer, ExhibitionPackage, Exhibitor
+)
+
+SINGLETON_MODELS = (SiteSettings, EventContent, AboutSectionContent)
+
+# Models rendered by the cached public pages; saving any of them clears the pages.
+PAGE_MODELS = SINGLETON_MODELS + (
+    Speaker, SponsorshipLevel, Sponsor, SummitOrganizer, ExhibitionPackage,
+    Exhibitor
+)
+
+PAGE_VERSION_KEY = 'summit:page:version'
+PAGE_CHANGED_AT_KEY = 'summit:page:changed_at'
+
+_singletons = {}
+_singletons_lock = threading.Lock()
+
+
+def _singleton_version_key(model):
+    return f'summit:singleton:{model._meta.label_lower}:version'
+
+
+def _recheck_interval():
+    return getattr(settings, 'SUMMIT_SINGLETON_RECHECK_SECONDS', 5)
+
+
+def get_singleton(model):
+    """Return the single row of ``model`` (or None), served from memory."""
+    now = time.monotonic()
+    entry = _singletons.get(model)
+    if entry is not None and now < entry['recheck_at']:
+        return entry['instance']
+
+    version = cache.get(_singleton_version_key(model), 0)
+    if entry is not None and entry['version'] == version:
+        entry['recheck_at'] = now + _recheck_interval()
+        return entry['instance']
+
+    instance = model.objects.first()
+    with _singletons_lock:
+        _singletons[model] = {
+            'instance': instance,
+            'version': version,
+            'recheck_at': now + _recheck_interval(),
+        }
+    return instance
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def invalidate_singleton(model):
+    """Drop the local copy of ``model`` and tell other workers to, once the transaction commits."""
+    def invalidate():
+        with _singletons_lock:
+            _singletons.pop(model, None)
+        _bump(_singleton_version_key(model))
+
+    # Bumping before the commit lets another worker reload the old row under the new version.
+    transaction.on_commit(invalidate)
+
+
+def get_site_settings():
+    return get_singleton(SiteSettings)
+
+
+def get_event_content():
+    return get_singleton(EventContent)
+
+
+def get_about_section_content():
+    return get_singleton(AboutSectionContent)
+
+
+def get_page_version():
+    return cache.get(PAGE_VERSION_KEY, 0)
+
+
+def get_pages_changed_at():
+    """Return when page content last changed, including deletions."""
+    return cache.get(PAGE_CHANGED_AT_KEY)
+
+
+def invalidate_pages():
+    """Make every cached public page stale once the current transaction commits."""
+    def invalidate():
+        _bump(PAGE_VERSION_KEY)
+        cache.set(PAGE_CHANGED_AT_KEY, timezone.now(), None)
+
+    transaction.on_commit(invalidate)
+
+
+def _with_remaining(rows, limit_field):
+    for row in rows:
+        row.slots_remaining = max(getattr(row, limit_field) - row.slots_used, 0)
+    return rows
+
+
+def get_slot_availability():
+    """Return sponsorship levels and exhibition packages with used/remaining slots."""
+    key = f'summit:slots:{get_page_version()}'
+    availability = cache.get(key)
+    if availability is None:
+        levels = SponsorshipLevel.objects.annotate(
+            slots_used=Count('sponsor', filter=Q(sponsor__is_active=True))
+        )
+        packages = ExhibitionPackage.objects.annotate(
+            slots_used=Count('exhibitor', filter=Q(exhibitor__is_approved=True))
+        )
+        availability = (
+            _with_remaining(list(levels), 'max_sponsors'),
+            _with_remaining(list(packages), 'max_exhibitors'),
+        )
+        cache.set(key, availability, None)
+    return availability
+
+
+def _page_cache_timeout():
+    return getattr(settings, 'SUMMIT_PAGE_CACHE_TIMEOUT', 0)
+
+
+def _is_cacheable_request(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if request.user.is_authenticated:
+        return False
+    # Flash messages are per visitor; a page carrying them is rendered fresh.
+    return not len(get_messages(request))
+
+
+def _is_cacheable_response(request, response):
+    if request.method != 'GET' or response.status_code != 200:
+        return False
+    if response.streaming or response.cookies:
+        return False
+    # A page that handed out a CSRF token is tied to this visitor's cookie.
+    return not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+
+
+def _page_cache_key(request, version):
+    # The cached views read no query parameters, so ?utm_source=... and other
+    # cache-busting strings share the entry for the bare path.
+    return f'summit:page:{version}:{request.path}'
+
+
+def cache_public_page(view_func):
+    """Serve anonymous GETs of ``view_func`` from the shared cache."""
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _async_view(request, *args, **kwargs):
+            timeout = _page_cache_timeout()
+            # The user and message checks may load the session from the database.
+            if not timeout or not await sync_to_async(_is_cacheable_request)(request):
+                return await view_func(request, *args, **kwargs)
+
+            key = _page_cache_key(request, await cache.aget(PAGE_VERSION_KEY, 0))
+            cached = await cache.aget(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            response = await view_func(request, *args, **kwargs)
+            if _is_cacheable_response(request, response):
+                await cache.aset(key, (response.content, response['Content-Type']), timeout)
+            return response
+        return _async_view
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        timeout = _page_cache_timeout()
+        if not timeout or not _is_cacheable_request(request):
+            return view_func(request, *args, **kwargs)
+
+        key = _page_cache_key(request, get_page_version())
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = view_func(request, *args, **kwargs)
+        if _is_cacheable_response(request, response):
+            cache.set(key, (response.content, response['Content-Type']), timeout)
+        return response
+    return _wrapped_view
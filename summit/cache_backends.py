@@ -0,0 +1,320 @@
+"""
+Cache backends for shared cPanel hosting.
+
+``SQLiteCache`` is a shared cache for every worker on the host, kept in a
+single SQLite file in WAL mode, so a lookup is one indexed read rather than
+a file open per key as with ``FileBasedCache``.
+
+``TieredCache`` puts a bounded in-process LRU in front of another cache
+alias. Local entries live for at most ``LOCAL_TIMEOUT`` seconds, which
+bounds how long a worker can serve a value after another worker changed
+it. Version keys (``summit:...:version``) skip the local tier entirely,
+because a stale version would keep serving data another worker has already
+invalidated. Per-tier hit and miss counters are available from ``stats()``.
+
+Example::
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'summit.cache_backends.TieredCache',
+            'OPTIONS': {'SHARED': 'shared', 'LOCAL_MAX_ENTRIES': 2000, 'LOCAL_TIMEOUT': 5},
+        },
+        'shared': {
+            'BACKEND': 'summit.cache_backends.SQLiteCache',
+            'LOCATION': BASE_DIR / 'cache' / 'cache.sqlite3',
+        },
+    }
+"""
+
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+logger = logging.getLogger('summit')
+
+_MISSING = object()
+
+
+class SQLiteCache(BaseCache):
+    """Shared cache stored in one SQLite database file."""
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+    # How many writes between checks of the entry count.
+    cull_check_interval = 64
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = str(location)
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+    @property
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            os.makedirs(os.path.dirname(self._path) or '.', exist_ok=True)
+            db = sqlite3.connect(self._path, timeout=5, isolation_level=None, check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS cache '
+                '(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)'
+            )
+            db.execute('CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)')
+            self._local.db = db
+        return db
+
+    def _get_raw(self, key):
+        row = self._db.execute('SELECT value, expires FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return _MISSING
+        value, expires = row
+        if expires is not None and expires <= time.time():
+            return _MISSING
+        return value
+
+    def _write(self, sql, key, value, timeout):
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        cursor = self._db.execute(sql, (key, pickled, self.get_backend_timeout(timeout)))
+        self._maybe_cull()
+        return cursor.rowcount
+
+    def _maybe_cull(self):
+        with self._writes_lock:
+            self._writes += 1
+            if self._writes % self.cull_check_interval:
+                return
+        db = self._db
+        (count,) = db.execute('SELECT COUNT(*) FROM cache').fetchone()
+        if count <= self._max_entries:
+            return
+        db.execute('DELETE FROM cache WHERE expires <= ?', (time.time(),))
+        (count,) = db.execute('SELECT COUNT(*) FROM cache').fetchone()
+        if count > self._max_entries:
+            if self._cull_frequency == 0:
+                db.execute('DELETE FROM cache')
+            else:
+                db.execute(
+                    'DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache ORDER BY rowid LIMIT ?)',
+                    (count // self._cull_frequency,)
+                )
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        value = self._get_raw(key)
+        return default if value is _MISSING else pickle.loads(value)
+
+    def get_many(self, keys, version=None):
+        made = {self.make_and_validate_key(key, version=version): key for key in keys}
+        if not made:
+            return {}
+        placeholders = ', '.join('?' * len(made))
+        rows = self._db.execute(
+            f'SELECT key, value, expires FROM cache WHERE key IN ({placeholders})', list(made)
+        ).fetchall()
+        now = time.time()
+        return {
+            made[key]: pickle.loads(value)
+            for key, value, expires in rows
+            if expires is None or expires > now
+        }
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._write('INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)', key, value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        db = self._db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            db.execute('DELETE FROM cache WHERE key = ? AND expires <= ?', (key, time.time()))
+            added = self._write(
+                'INSERT OR IGNORE INTO cache (key, value, expires) VALUES (?, ?, ?)', key, value, timeout
+            )
+        finally:
+            db.execute('COMMIT')
+        return bool(added)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._db.execute(
+            'UPDATE cache SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (self.get_backend_timeout(timeout), key, time.time())
+        )
+        return bool(cursor.rowcount)
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        db = self._db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            value = self._get_raw(key)
+            if value is _MISSING:
+                raise ValueError("Key '%s' not found" % key)
+            new_value = pickle.loads(value) + delta
+            db.execute(
+                'UPDATE cache SET value = ? WHERE key = ?',
+                (pickle.dumps(new_value, self.pickle_protocol), key)
+            )
+        finally:
+            db.execute('COMMIT')
+        return new_value
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._get_raw(key) is not _MISSING
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return bool(self._db.execute('DELETE FROM cache WHERE key = ?', (key,)).rowcount)
+
+    def clear(self):
+        self._db.execute('DELETE FROM cache')
+
+    def close(self, **kwargs):
+        # Connections are kept per thread for the life of the worker.
+        pass
+
+
+class TieredCache(BaseCache):
+    """Bounded in-process LRU with TTL in front of a shared cache alias."""
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+    # Keys always read from the shared tier so invalidation is seen at once.
+    shared_only_suffixes = (':version',)
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared_alias = options.get('SHARED', 'shared')
+        self._local_max_entries = options.get('LOCAL_MAX_ENTRIES', 1000)
+        self._local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    def _local_get(self, made_key):
+        with self._lock:
+            entry = self._local.get(made_key)
+            if entry is None:
+                return _MISSING
+            pickled, expires = entry
+            if expires <= time.monotonic():
+                del self._local[made_key]
+                return _MISSING
+            self._local.move_to_end(made_key)
+        return pickled
+
+    def _shared_only(self, key):
+        return key.endswith(self.shared_only_suffixes)
+
+    def _local_set(self, made_key, value, timeout=DEFAULT_TIMEOUT):
+        backend_timeout = self.get_backend_timeout(timeout)
+        ttl = self._local_timeout
+        if backend_timeout is not None:
+            ttl = min(ttl, backend_timeout - time.time())
+        if ttl <= 0:
+            self._local_delete(made_key)
+            return
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        with self._lock:
+            self._local[made_key] = (pickled, time.monotonic() + ttl)
+            self._local.move_to_end(made_key)
+            while len(self._local) > self._local_max_entries:
+                self._local.popitem(last=False)
+
+    def _local_delete(self, made_key):
+        with self._lock:
+            self._local.pop(made_key, None)
+
+    def get(self, key, default=None, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        shared_only = self._shared_only(key)
+        if not shared_only:
+            pickled = self._local_get(made_key)
+            if pickled is not _MISSING:
+                self._stats['local_hits'] += 1
+                return pickle.loads(pickled)
+            self._stats['local_misses'] += 1
+
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self._stats['shared_misses'] += 1
+            return default
+        self._stats['shared_hits'] += 1
+        if not shared_only:
+            self._local_set(made_key, value)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        self.shared.set(key, value, self._shared_timeout(timeout), version=version)
+        if self._shared_only(key):
+            self._local_delete(made_key)
+        else:
+            self._local_set(made_key, value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        added = self.shared.add(key, value, self._shared_timeout(timeout), version=version)
+        if added and not self._shared_only(key):
+            self._local_set(made_key, value, timeout)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        self._local_delete(made_key)
+        return self.shared.touch(key, self._shared_timeout(timeout), version=version)
+
+    def incr(self, key, delta=1, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        try:
+            value = self.shared.incr(key, delta, version=version)
+        except ValueError:
+            self._local_delete(made_key)
+            raise
+        # Counters are version keys for other caches; keep them authoritative.
+        self._local_delete(made_key)
+        return value
+
+    def has_key(self, key, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        if self._local_get(made_key) is not _MISSING:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def delete(self, key, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        self._local_delete(made_key)
+        return self.shared.delete(key, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+        self.shared.clear()
+
+    def _shared_timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def stats(self):
+        """Return per-tier hit/miss counts and hit rates for this process."""
+        stats = dict(self._stats)
+        for tier in ('local', 'shared'):
+            hits, misses = stats.get(f'{tier}_hits', 0), stats.get(f'{tier}_misses', 0)
+            stats[f'{tier}_hit_rate'] = hits / (hits + misses) if hits + misses else 0.0
+        with self._lock:
+            stats['local_entries'] = len(self._local)
+        return stats
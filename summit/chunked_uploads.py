@@ -0,0 +1,200 @@
+"""
+Resumable chunked uploads for nomination supporting documents.
+
+A client creates an upload with the file name and total size, then sends
+the file as a series of PATCH requests, each carrying the byte offset it
+starts at. Every accepted chunk is stored as its own part file under
+``SUMMIT_CHUNKED_UPLOAD_DIR/<upload id>/``, published before the offset is
+advanced with a conditional UPDATE under the row's lock, so a retried or
+duplicated chunk is refused with the current offset instead of being
+written twice. After a dropped connection
+the client asks for the offset and continues from there instead of
+restarting at zero.
+
+The first chunk is checked against the signature for the file's
+extension, and when the last byte arrives the parts are concatenated into
+one file and hashed. The nomination form then attaches the result by
+upload id.
+``manage.py cleanup_uploads`` removes uploads that were abandoned.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ChunkedUpload
+from .uploads import DOCUMENT_SIGNATURES, SNIFF_BYTES, matches_signature, max_document_size
+
+logger = logging.getLogger('summit')
+
+READ_SIZE = 64 * 2 ** 10
+
+
+class UploadError(Exception):
+    """Raised when an upload request can't be accepted; carries an HTTP status."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def upload_root():
+    return Path(getattr(settings, 'SUMMIT_CHUNKED_UPLOAD_DIR', Path(settings.BASE_DIR) / 'tmp' / 'uploads'))
+
+
+def max_chunk_size():
+    return getattr(settings, 'SUMMIT_UPLOAD_CHUNK_SIZE', 1024 * 1024)
+
+
+def upload_dir(upload):
+    return upload_root() / str(upload.pk)
+
+
+def _part_path(upload, offset):
+    return upload_dir(upload) / f'{offset:012d}.part'
+
+
+def _assembled_path(upload):
+    return upload_dir(upload) / 'assembled'
+
+
+def create_upload(file_name, size):
+    """Register a new upload of ``size`` bytes and return it."""
+    file_name = os.path.basename(file_name or '')
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension not in DOCUMENT_SIGNATURES:
+        raise UploadError('Unsupported file type.', status=415)
+    if size <= 0:
+        raise UploadError('The file is empty.')
+    if size > max_document_size():
+        raise UploadError('The file is too large.', status=413)
+    upload = ChunkedUpload.objects.create(file_name=file_name, size=size)
+    upload_dir(upload).mkdir(parents=True, exist_ok=True)
+    logger.info(f"Chunked upload {upload.pk} started: {file_name} ({size} bytes)")
+    return upload
+
+
+def append_chunk(upload, offset, stream):
+    """Store the chunk read from ``stream`` at ``offset``; return the new offset."""
+    if upload.status != 'uploading':
+        raise UploadError('This upload is already complete.', status=409)
+    if offset != upload.offset:
+        raise UploadError('Offset mismatch.', status=409)
+
+    temp_path = upload_dir(upload) / f'{offset:012d}.{uuid.uuid4().hex}.tmp'
+    head = b'' if offset == 0 else None
+    received = 0
+    try:
+        with open(temp_path, 'wb') as part:
+            while True:
+                data = stream.read(READ_SIZE)
+                if not data:
+                    break
+                received += len(data)
+                if received > max_chunk_size() or offset + received > upload.size:
+                    raise UploadError('The chunk is too large.', status=413)
+                if head is not None and len(head) < SNIFF_BYTES:
+                    head += data[:SNIFF_BYTES]
+                part.write(data)
+        if not received:
+            raise UploadError('The chunk is empty.')
+        if head is not None and not matches_signature(os.path.splitext(upload.file_name)[1].lower(), head):
+            raise UploadError('The file content does not match its extension.', status=415)
+
+        _publish_part(upload, offset, received, temp_path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+    upload.offset = offset + received
+    if upload.offset == upload.size:
+        assemble(upload)
+    return upload.offset
+
+
+def _publish_part(upload, offset, received, temp_path):
+    """Move the part into place, then advance the offset past it.
+
+    The part is published first so an advanced offset always has its part
+    on disk. Touching the row takes its lock (a write lock on SQLite) up
+    front, so a duplicate chunk for the same offset waits, then finds the
+    offset moved and never overwrites a published part.
+    """
+    current = ChunkedUpload.objects.filter(pk=upload.pk, status='uploading', offset=offset)
+    with transaction.atomic():
+        if not current.update(updated_at=timezone.now()):
+            raise UploadError('Offset mismatch.', status=409)
+        part_path = _part_path(upload, offset)
+        os.replace(temp_path, part_path)
+        if not current.update(offset=F('offset') + received, updated_at=timezone.now()):
+            part_path.unlink()
+            raise UploadError('Offset mismatch.', status=409)
+
+
+def assemble(upload):
+    """Concatenate the parts of a fully received upload and verify the result."""
+    directory = upload_dir(upload)
+    parts = sorted(directory.glob('*.part'))
+    digest = hashlib.sha256()
+    with open(_assembled_path(upload), 'wb') as assembled:
+        for path in parts:
+            with open(path, 'rb') as part:
+                for data in iter(lambda: part.read(READ_SIZE), b''):
+                    digest.update(data)
+                    assembled.write(data)
+    if _assembled_path(upload).stat().st_size != upload.size:
+        raise UploadError('The assembled file is incomplete.', status=409)
+    for path in parts:
+        path.unlink()
+
+    upload.sha256 = digest.hexdigest()
+    upload.status = 'complete'
+    upload.save(update_fields=['sha256', 'status', 'updated_at'])
+    logger.info(f"Chunked upload {upload.pk} complete: {upload.file_name} sha256 {upload.sha256}")
+
+
+def attach_upload(upload, field_file):
+    """Save a completed upload into ``field_file`` (without saving its instance)."""
+    claimed = ChunkedUpload.objects.filter(pk=upload.pk, status='complete').update(status='attached')
+    if not claimed:
+        raise UploadError('This upload is not available.', status=409)
+    with open(_assembled_path(upload), 'rb') as f:
+        content = File(f, name=upload.file_name)
+        content.sha256 = upload.sha256
+        field_file.save(upload.file_name, content, save=False)
+    transaction.on_commit(lambda: discard_upload_files(upload))
+
+
+def discard_upload_files(upload):
+    shutil.rmtree(upload_dir(upload), ignore_errors=True)
+
+
+def cleanup_uploads(max_age):
+    """Delete unattached uploads idle for longer than ``max_age``; return the count."""
+    cutoff = timezone.now() - max_age
+    stale = ChunkedUpload.objects.filter(updated_at__lt=cutoff).exclude(status='attached')
+    removed = 0
+    for upload in stale:
+        discard_upload_files(upload)
+        upload.delete()
+        removed += 1
+    # Attached uploads only need their row for a while; their files are already gone.
+    ChunkedUpload.objects.filter(status='attached', updated_at__lt=cutoff).delete()
+
+    # Directories left behind by rows that no longer exist.
+    known = {str(pk) for pk in ChunkedUpload.objects.values_list('pk', flat=True)}
+    if upload_root().exists():
+        for directory in upload_root().iterdir():
+            if directory.is_dir() and directory.name not in known and directory.stat().st_mtime < cutoff.timestamp():
+                shutil.rmtree(directory, ignore_errors=True)
+                removed += 1
+    return removed
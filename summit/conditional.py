@@ -0,0 +1,149 @@
+"""
+Conditional GET validators for the public pages.
+
+Each page's ETag and Last-Modified are built from the newest ``updated_at``
+and the row count of every queryset the page renders. The aggregates for a
+page are fetched in one UNION ALL query, without loading any rows, and the
+result is kept in the shared cache until the page version is bumped by
+``summit.signals``. ``SUMMIT_BUILD_ID`` is mixed into every ETag, so a
+deploy that only changed templates or static files does not answer 304 with
+the old markup, and signed-in visitors get no validators at all.
+"""
+
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db.models import Count, Max, Value
+from django.views.decorators.http import condition
+
+from .cache import get_page_version, get_pages_changed_at
+from .models import (
+    SiteSettings, EventContent, AboutSectionContent, Speaker,
+    SponsorshipLevel, Sponsor, SummitOrganizer, ExhibitionPackage, Exhibitor
+)
+
+
+def _home_sources():
+    return [
+        ('site_settings', SiteSettings.objects.all()),
+        ('event_content', EventContent.objects.all()),
+        ('about_section_content', AboutSectionContent.objects.all()),
+        ('speakers', Speaker.objects.all()),
+        ('sponsorship_levels', SponsorshipLevel.objects.all()),
+        ('sponsors', Sponsor.objects.filter(is_active=True)),
+        ('summit_organizers', SummitOrganizer.objects.filter(is_active=True)),
+    ]
+
+
+def _speakers_sources():
+    return [
+        ('site_settings', SiteSettings.objects.all()),
+        ('speakers', Speaker.objects.all()),
+    ]
+
+
+def _sponsorship_sources():
+    return [
+        ('site_settings', SiteSettings.objects.all()),
+        ('sponsorship_levels', SponsorshipLevel.objects.all()),
+        ('exhibition_packages', ExhibitionPackage.objects.all()),
+        # Slot counts on the page move with these.
+        ('sponsors', Sponsor.objects.filter(is_active=True)),
+        ('exhibitors', Exhibitor.objects.filter(is_approved=True)),
+    ]
+
+
+PAGE_SOURCES = {
+    'home': _home_sources,
+    'speakers': _speakers_sources,
+    'sponsorship': _sponsorship_sources,
+}
+
+
+def _build_id():
+    return getattr(settings, 'SUMMIT_BUILD_ID', '')
+
+
+def _aggregate(label, queryset):
+    return (
+        queryset.order_by()
+        .annotate(source=Value(label))
+        .values('source')
+        .annotate(latest=Max('updated_at'), total=Count('pk'))
+        .values_list('source', 'latest', 'total')
+    )
+
+
+def _query_stamp(page):
+    """Return (last_modified, etag) for ``page`` straight from the database."""
+    sources = PAGE_SOURCES[page]()
+    first, *rest = [_aggregate(label, queryset) for label, queryset in sources]
+    rows = sorted(first.union(*rest, all=True)) if rest else list(first)
+
+    timestamps = [latest for _, latest, _ in rows if latest is not None]
+    changed_at = get_pages_changed_at()
+    if changed_at is not None:
+        timestamps.append(changed_at)
+    last_modified = max(timestamps) if timestamps else None
+
+    fingerprint = ';'.join(
+        f'{source}:{latest.isoformat() if latest else "-"}:{total}'
+        for source, latest, total in rows
+    )
+    etag = hashlib.md5(f'{_build_id()}|{page}|{fingerprint}'.encode('utf-8')).hexdigest()
+    return last_modified, etag
+
+
+def get_page_stamp(request, page):
+    """Return the cached (last_modified, etag) pair for ``page``."""
+    stamps = getattr(request, '_summit_page_stamps', None)
+    if stamps is None:
+        stamps = request._summit_page_stamps = {}
+    if page in stamps:
+        return stamps[page]
+
+    # Pages for signed-in users or carrying flash messages are per visitor
+    # and must not answer 304.
+    if request.user.is_authenticated or len(get_messages(request)):
+        stamp = (None, None)
+    else:
+        key = f'summit:stamp:{_build_id()}:{get_page_version()}:{page}'
+        stamp = cache.get(key)
+        if stamp is None:
+            stamp = _query_stamp(page)
+            cache.set(key, stamp, None)
+    stamps[page] = stamp
+    return stamp
+
+
+def _page_validators(page):
+    def etag(request, *args, **kwargs):
+        return get_page_stamp(request, page)[1]
+
+    def last_modified(request, *args, **kwargs):
+        return get_page_stamp(request, page)[0]
+
+    return etag, last_modified
+
+
+def page_condition(page):
+    """Django's ``condition`` for ``page``, usable on sync and async views."""
+    etag, last_modified = _page_validators(page)
+
+    def decorator(view_func):
+        view = condition(etag_func=etag, last_modified_func=last_modified)(view_func)
+        if not iscoroutinefunction(view_func):
+            return view
+
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            # condition() calls the validators synchronously, so load the
+            # stamp off the event loop first; the validators then hit the memo.
+            await sync_to_async(get_page_stamp)(request, page)
+            return await view(request, *args, **kwargs)
+        return _wrapped_view
+    return decorator
@@ -1,8 +1,8 @@
-from .models import SiteSettings
+from .cache import get_site_settings
 
 def site_settings(request):
     """Make site settings available globally in templates"""
-    settings = SiteSettings.objects.first()
+    settings = get_site_settings()
     return {
         'site_settings': settings
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,147 @@
+"""
+MySQL backend with a small per-process connection pool.
+
+Use with ``CONN_MAX_AGE = 0``: Django then releases the connection at the
+end of every request and this backend parks it in the worker's pool instead
+of closing it, so the next request (in any thread) skips the TCP/TLS and
+authentication handshake. Idle connections are pinged before reuse once
+they have sat longer than ``PING_AFTER`` seconds and are recycled after
+``RECYCLE`` seconds. Configure with an extra ``POOL`` key in the database
+settings::
+
+    'POOL': {'SIZE': 4, 'RECYCLE': 3600, 'PING_AFTER': 30}
+"""
+
+import logging
+import threading
+import time
+from collections import Counter, deque
+
+from django.db.backends.mysql import base as mysql_base
+
+logger = logging.getLogger('summit')
+
+Database = mysql_base.Database
+
+# Log a stats line after this many checkouts.
+STATS_LOG_INTERVAL = 1000
+
+
+class ConnectionPool:
+    """Bounded LIFO stack of idle DB-API connections."""
+
+    def __init__(self, size=4, recycle=3600, ping_after=30):
+        self.size = size
+        self.recycle = recycle
+        self.ping_after = ping_after
+        self.stats = Counter()
+        self._idle = deque()
+        self._created_at = {}
+        self._lock = threading.Lock()
+
+    def discard(self, connection, reason):
+        """Close ``connection`` for good, counting it under ``reason``."""
+        self.stats[reason] += 1
+        self._created_at.pop(id(connection), None)
+        try:
+            connection.close()
+        except Database.Error:
+            pass
+
+    def _healthy(self, connection, idle_since):
+        now = time.monotonic()
+        if now - self._created_at.get(id(connection), now) > self.recycle:
+            self.discard(connection, 'recycled')
+            return False
+        if now - idle_since > self.ping_after:
+            self.stats['pings'] += 1
+            try:
+                connection.ping(False)
+            except Database.Error:
+                self.discard(connection, 'failed_health_checks')
+                return False
+        return True
+
+    def acquire(self, connect):
+        """Return an idle healthy connection, or a new one from ``connect()``."""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                connection, idle_since = self._idle.pop()
+            if self._healthy(connection, idle_since):
+                self._count('reused')
+                return connection
+
+        connection = connect()
+        self._created_at[id(connection)] = time.monotonic()
+        self._count('new_connects')
+        return connection
+
+    def release(self, connection):
+        """Park ``connection`` for reuse, closing it if the pool is full."""
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((connection, time.monotonic()))
+                self.stats['returned'] += 1
+                return
+        self.discard(connection, 'overflow_closed')
+
+    def _count(self, key):
+        self.stats[key] += 1
+        checkouts = self.stats['reused'] + self.stats['new_connects']
+        if checkouts % STATS_LOG_INTERVAL == 0:
+            logger.info(f"DB pool stats: {self.snapshot()}")
+
+    def snapshot(self):
+        with self._lock:
+            idle = len(self._idle)
+        return {'idle': idle, **self.stats}
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict):
+    with _pools_lock:
+        if alias not in _pools:
+            options = settings_dict.get('POOL', {})
+            _pools[alias] = ConnectionPool(
+                size=options.get('SIZE', 4),
+                recycle=options.get('RECYCLE', 3600),
+                ping_after=options.get('PING_AFTER', 30),
+            )
+        return _pools[alias]
+
+
+def pool_stats():
+    """Return reuse/connect counters for every pool in this process."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.snapshot() for alias, pool in pools.items()}
+
+
+class DatabaseWrapper(mysql_base.DatabaseWrapper):
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        parent = super().get_new_connection
+        return self.pool.acquire(lambda: parent(conn_params))
+
+    def _close(self):
+        if self.connection is None:
+            return
+        if self.errors_occurred and not self.is_usable():
+            # Don't hand a broken connection to the next request.
+            self.pool.discard(self.connection, 'discarded_after_error')
+            return
+        try:
+            self.connection.rollback()
+        except Database.Error:
+            self.pool.discard(self.connection, 'discarded_after_error')
+            return
+        self.pool.release(self.connection)
@@ -1,8 +1,13 @@
 from django import forms
-from .models import Nomination, AwardCategory, ConferenceRegistration
+from .idempotency import new_submission_token, unsign_submission_token
+from .inventory import remaining_tickets
+from .models import Nomination, AwardCategory, ConferenceRegistration, ChunkedUpload
 
 
 class NominationForm(forms.ModelForm):
+    # Set by the page script when the document was sent through the chunked upload API.
+    document_upload = forms.UUIDField(required=False, widget=forms.HiddenInput)
+
     class Meta:
         model = Nomination
         fields = [
@@ -50,13 +55,31 @@ class NominationForm(forms.ModelForm):
             })
         }
     
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, upload_errors=None, **kwargs):
         super().__init__(*args, **kwargs)
+        self.upload_errors = upload_errors or {}
         self.fields['category'].queryset = AwardCategory.objects.filter(is_active=True)
         self.fields['category'].empty_label = "Select an award category"
 
+    def clean_supporting_documents(self):
+        # A rejected upload never reaches request.FILES; report why.
+        if 'supporting_documents' in self.upload_errors:
+            raise forms.ValidationError(self.upload_errors['supporting_documents'])
+        return self.cleaned_data['supporting_documents']
+
+    def clean_document_upload(self):
+        upload_id = self.cleaned_data['document_upload']
+        if not upload_id:
+            return None
+        upload = ChunkedUpload.objects.filter(pk=upload_id, status='complete').first()
+        if upload is None:
+            raise forms.ValidationError('The uploaded document could not be found. Please upload it again.')
+        return upload
+
 
 class ConferenceRegistrationForm(forms.ModelForm):
+    submission_token = forms.CharField(widget=forms.HiddenInput)
+
     class Meta:
         model = ConferenceRegistration
         fields = [
@@ -115,4 +138,35 @@ class ConferenceRegistrationForm(forms.ModelForm):
                 'class': 'form-control',
                 'placeholder': 'How did you hear about this event? (optional)'
             })
-        }
\ No newline at end of file
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.is_bound:
+            self.initial['submission_token'] = new_submission_token()
+        remaining = remaining_tickets()
+        self.fields['ticket_type'].choices = [
+            (value, f"{label} (sold out)" if remaining.get(value) == 0 else label)
+            for value, label in self.fields['ticket_type'].choices
+        ]
+
+    def clean_email(self):
+        return self.cleaned_data['email'].strip().lower()
+
+    def clean(self):
+        cleaned_data = super().clean()
+        # Registering again after a reservation expired reuses that row, which
+        # still holds the (email, ticket_type) pair.
+        lapsed = ConferenceRegistration.objects.filter(
+            email=cleaned_data.get('email'), ticket_type=cleaned_data.get('ticket_type'), payment_status='expired'
+        ).first()
+        if lapsed is not None and self.instance._state.adding:
+            lapsed.reactivate()
+            self.instance = lapsed
+        return cleaned_data
+
+    def clean_submission_token(self):
+        key = unsign_submission_token(self.cleaned_data['submission_token'])
+        if key is None:
+            raise forms.ValidationError('This form has expired. Please submit it again.')
+        return key
@@ -0,0 +1,45 @@
+"""
+One-time submission tokens for the public forms.
+
+Each rendered form carries a signed random token. The first POST with a
+token stores its result (the new row's primary key) in the database and the
+cache; a repeat of that POST from a double-click or a mobile retry is
+answered from the cache with the original result instead of a second
+insert.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+SALT = 'summit.submission-token'
+
+
+def _max_age():
+    return getattr(settings, 'SUMMIT_SUBMISSION_TOKEN_MAX_AGE', 24 * 60 * 60)
+
+
+def new_submission_token():
+    return signing.dumps(uuid.uuid4().hex, salt=SALT)
+
+
+def unsign_submission_token(token):
+    """Return the key inside ``token``, or None if it is forged or expired."""
+    try:
+        return signing.loads(token, salt=SALT, max_age=_max_age())
+    except signing.BadSignature:
+        return None
+
+
+def _cache_key(scope, key):
+    return f'summit:idem:{scope}:{key}'
+
+
+def remember_result(scope, key, pk):
+    cache.set(_cache_key(scope, key), pk, _max_age())
+
+
+def recall_result(scope, key):
+    return cache.get(_cache_key(scope, key))
@@ -0,0 +1,197 @@
+"""
+Responsive image derivatives.
+
+Every uploaded image listed in ``IMAGE_FIELDS`` gets resized copies at the
+widths in ``DERIVATIVE_WIDTHS``, encoded as AVIF and WebP when this Pillow
+build supports them plus a JPEG (or PNG, for images with transparency)
+fallback. Derivatives are stored next to the original as
+``<name>__w<width>.<ext>`` and a manifest of what exists is kept in the
+cache for the ``srcset`` template tags in ``summit_images``. An empty
+manifest is only cached for ``SUMMIT_IMAGE_MISS_TIMEOUT`` seconds, and the
+media worker drops a manifest when it finishes the image's job.
+"""
+
+import logging
+import os
+import posixpath
+import re
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+from .models import (
+    SiteSettings, AboutSectionContent, Speaker, Sponsor, SummitOrganizer, Exhibitor
+)
+
+logger = logging.getLogger('summit')
+
+IMAGE_FIELDS = {
+    SiteSettings: ('primary_organizer_logo', 'site_logo', 'hero_background_image'),
+    AboutSectionContent: ('about_image',),
+    Speaker: ('photo',),
+    Sponsor: ('logo',),
+    SummitOrganizer: ('logo',),
+    Exhibitor: ('logo',),
+}
+
+DERIVATIVE_WIDTHS = (80, 160, 320, 640, 1280, 1920)
+
+# Preferred order for <source> elements; the browser picks the first it supports.
+MODERN_FORMATS = [fmt for fmt in ('avif', 'webp') if features.check(fmt)]
+
+SAVE_OPTIONS = {
+    'avif': {'quality': 55},
+    'webp': {'quality': 78, 'method': 4},
+    'jpeg': {'quality': 82, 'optimize': True, 'progressive': True},
+    'png': {'optimize': True},
+}
+
+# Ordered by preference: smallest encodings first.
+CONTENT_TYPES = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+}
+
+_EXTENSIONS = {'jpeg': 'jpg'}
+
+
+def derivative_name(name, width, fmt):
+    root, _ = os.path.splitext(name)
+    return f'{root}__w{width}.{_EXTENSIONS.get(fmt, fmt)}'
+
+
+def _manifest_key(name):
+    return f'summit:img:{name}'
+
+
+def _has_alpha(image):
+    return image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+
+
+def _fallback_format(image):
+    return 'png' if _has_alpha(image) else 'jpeg'
+
+
+def _target_widths(original_width):
+    widths = [width for width in DERIVATIVE_WIDTHS if width < original_width]
+    # Include the full width (capped) so large viewports are not upscaled.
+    widths.append(min(original_width, DERIVATIVE_WIDTHS[-1]))
+    return widths
+
+
+def _encode(image, fmt):
+    if fmt == 'jpeg' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, format=fmt.upper(), **SAVE_OPTIONS[fmt])
+    return buffer.getvalue()
+
+
+def _is_current(storage, name, original_mtime):
+    if not storage.exists(name):
+        return False
+    if original_mtime is None:
+        return True
+    try:
+        return storage.get_modified_time(name) >= original_mtime
+    except NotImplementedError:
+        return True
+
+
+def generate_derivatives(name, storage):
+    """Create any missing or stale derivatives of ``name`` and return the manifest."""
+    try:
+        original_mtime = storage.get_modified_time(name)
+    except NotImplementedError:
+        original_mtime = None
+    with storage.open(name, 'rb') as f:
+        original = Image.open(f)
+        original.load()
+    original = ImageOps.exif_transpose(original)
+    if original.mode not in ('RGB', 'RGBA'):
+        original = original.convert('RGBA' if _has_alpha(original) else 'RGB')
+
+    manifest = []
+    for fmt in MODERN_FORMATS + [_fallback_format(original)]:
+        for width in _target_widths(original.width):
+            variant = derivative_name(name, width, fmt)
+            if not _is_current(storage, variant, original_mtime):
+                if storage.exists(variant):
+                    storage.delete(variant)
+                height = max(1, round(original.height * width / original.width))
+                resized = original.resize((width, height), Image.LANCZOS)
+                saved = storage.save(variant, ContentFile(_encode(resized, fmt)))
+                if saved != variant:
+                    # Storage refused to overwrite a concurrent copy; keep that one.
+                    storage.delete(saved)
+            manifest.append((fmt, width, variant))
+
+    cache.set(_manifest_key(name), manifest, None)
+    logger.info(f"Generated {len(manifest)} image derivatives for {name}")
+    return manifest
+
+
+def get_derivatives(field_file):
+    """Return the (format, width, name) derivatives that exist for ``field_file``."""
+    if not field_file:
+        return []
+    key = _manifest_key(field_file.name)
+    manifest = cache.get(key)
+    if manifest is None:
+        manifest = _scan_derivatives(field_file.name, field_file.storage)
+        # Derivatives may still be on their way; look again soon.
+        timeout = None if manifest else getattr(settings, 'SUMMIT_IMAGE_MISS_TIMEOUT', 60)
+        cache.set(key, manifest, timeout)
+    return manifest
+
+
+def forget_derivatives(name):
+    """Drop the cached manifest of ``name`` so the next lookup rescans storage."""
+    cache.delete(_manifest_key(name))
+
+
+def delete_derivatives(name, storage):
+    """Remove every derivative of ``name`` and its cached manifest."""
+    for _, _, variant in _scan_derivatives(name, storage):
+        storage.delete(variant)
+    forget_derivatives(name)
+
+
+def _scan_derivatives(name, storage):
+    directory, filename = posixpath.split(name)
+    root, _ = os.path.splitext(filename)
+    pattern = re.compile(rf'^{re.escape(root)}__w(\d+)\.(avif|webp|jpg|png)$')
+    extensions = {_EXTENSIONS.get(fmt, fmt): fmt for fmt in CONTENT_TYPES}
+    try:
+        _, files = storage.listdir(directory)
+    except (OSError, NotImplementedError):
+        return []
+    manifest = []
+    for name in files:
+        match = pattern.match(name)
+        if match:
+            manifest.append((extensions[match.group(2)], int(match.group(1)), posixpath.join(directory, name)))
+    preference = list(CONTENT_TYPES)
+    return sorted(manifest, key=lambda entry: (preference.index(entry[0]), entry[1]))
+
+
+def image_files(instance):
+    """Yield (field_name, field_file) for every uploaded image on ``instance``."""
+    for field_name in IMAGE_FIELDS.get(type(instance), ()):
+        field_file = getattr(instance, field_name)
+        if field_file:
+            yield field_name, field_file
+
+
+def process_instance_images(instance):
+    """Generate derivatives for every image field of ``instance`` in this process."""
+    for field_name, field_file in image_files(instance):
+        try:
+            generate_derivatives(field_file.name, field_file.storage)
+        except (OSError, Image.DecompressionBombError) as e:
+            logger.warning(f"Could not generate derivatives for {field_file.name}: {str(e)}")
@@ -0,0 +1,152 @@
+"""
+Ticket inventory for conference registrations.
+
+Each limited ticket type has a ``TicketInventory`` row whose ``reserved``
+counter is moved with a single conditional UPDATE
+(``reserved = reserved + 1 WHERE reserved < capacity``). The database checks
+and bumps the counter in one statement, so concurrent registrations only
+contend on that one row for the rest of their transaction, never on the
+registrations table, and can't oversell. Ticket types without a row are
+unlimited.
+
+Registrations are saved through ``save_registration``, which moves the seat
+in the same transaction as the save; ``ConferenceRegistration.clean()``
+reports a sold-out ticket type as a form error before that. Pending and paid
+registrations hold a seat. Unpaid reservations older than
+``SUMMIT_RESERVATION_TTL_HOURS`` are marked expired by ``manage.py
+expire_reservations``, which hands their seats back; the row is kept, and
+registering again for the same ticket type reactivates it.
+"""
+
+import logging
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import ConferenceRegistration, TicketInventory
+
+logger = logging.getLogger('summit')
+
+REMAINING_KEY = 'summit:inventory:remaining'
+
+
+class SoldOut(Exception):
+    """Raised when a ticket type has no seats left."""
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def invalidate_remaining():
+    """Drop the cached remaining-capacity map once the current transaction commits."""
+    transaction.on_commit(lambda: cache.delete(REMAINING_KEY))
+
+
+def remaining_tickets():
+    """Return ``{ticket_type: seats_left}`` for limited ticket types."""
+    remaining = cache.get(REMAINING_KEY)
+    if remaining is None:
+        remaining = {
+            ticket_type: max(capacity - reserved, 0)
+            for ticket_type, capacity, reserved in TicketInventory.objects.values_list(
+                'ticket_type', 'capacity', 'reserved'
+            )
+        }
+        cache.set(REMAINING_KEY, remaining, _setting('SUMMIT_INVENTORY_CACHE_SECONDS', 30))
+    return remaining
+
+
+def reserve_ticket(ticket_type, oversell=False):
+    """Take one seat of ``ticket_type`` or raise ``SoldOut``.
+
+    With ``oversell`` the seat is taken even past capacity; for staff edits
+    that passed validation and then lost a race for the last seat.
+    """
+    updated = TicketInventory.objects.filter(
+        ticket_type=ticket_type, reserved__lt=F('capacity')
+    ).update(reserved=F('reserved') + 1)
+    if not updated:
+        if not TicketInventory.objects.filter(ticket_type=ticket_type).exists():
+            return
+        if not oversell:
+            cache.set(REMAINING_KEY, {**remaining_tickets(), ticket_type: 0},
+                      _setting('SUMMIT_INVENTORY_CACHE_SECONDS', 30))
+            raise SoldOut(ticket_type)
+        TicketInventory.objects.filter(ticket_type=ticket_type).update(reserved=F('reserved') + 1)
+        logger.warning(f"Ticket inventory for {ticket_type} oversold by a staff edit")
+    invalidate_remaining()
+
+
+def release_tickets(ticket_type, count=1):
+    """Hand ``count`` seats of ``ticket_type`` back to the inventory."""
+    if count <= 0:
+        return
+    updated = TicketInventory.objects.filter(
+        ticket_type=ticket_type, reserved__gte=count
+    ).update(reserved=F('reserved') - count)
+    if updated:
+        invalidate_remaining()
+
+
+def save_registration(registration, oversell=False):
+    """Save ``registration`` and move its seat in the ticket inventory.
+
+    Raises ``SoldOut``, with nothing saved, when the registration needs a
+    seat and none is left (see ``reserve_ticket`` for ``oversell``).
+    """
+    with transaction.atomic():
+        held = registration.held_seat(for_update=True)
+        wanted = registration.ticket_type if registration.holds_seat else None
+        if wanted != held:
+            if wanted:
+                reserve_ticket(wanted, oversell)
+            if held:
+                release_tickets(held)
+        registration.save()
+    return registration
+
+
+def expire_reservations(batch_size=500):
+    """Expire stale unpaid registrations and release their seats; return the count."""
+    cutoff = timezone.now() - timedelta(hours=_setting('SUMMIT_RESERVATION_TTL_HOURS', 72))
+    stale = ConferenceRegistration.objects.filter(payment_status='pending', registration_date__lt=cutoff)
+    total = 0
+    while True:
+        pks = list(stale.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            break
+        with transaction.atomic():
+            # Lock and re-check the status so a payment recorded meanwhile keeps its seat.
+            rows = list(ConferenceRegistration.objects.select_for_update().filter(
+                pk__in=pks, payment_status='pending'
+            ).values_list('pk', 'email', 'ticket_type'))
+            ConferenceRegistration.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(payment_status='expired')
+            for ticket_type, count in Counter(ticket_type for _, _, ticket_type in rows).items():
+                release_tickets(ticket_type, count)
+        for _, email, ticket_type in rows:
+            logger.info(f"Expired unpaid {ticket_type} reservation for {email}")
+        total += len(rows)
+    return total
+
+
+def reconcile_inventory():
+    """Recount ``reserved`` from the registrations table for every inventory row."""
+    held = dict(
+        ConferenceRegistration.objects.filter(payment_status__in=ConferenceRegistration.SEAT_HOLDING_STATUSES)
+        .values_list('ticket_type')
+        .annotate(count=Count('pk'))
+    )
+    with transaction.atomic():
+        for inventory in TicketInventory.objects.select_for_update():
+            actual = held.get(inventory.ticket_type, 0)
+            if inventory.reserved != actual:
+                logger.warning(f"Ticket inventory for {inventory.ticket_type} was {inventory.reserved}, recounted {actual}")
+                TicketInventory.objects.filter(pk=inventory.pk).update(reserved=actual)
+        invalidate_remaining()
+    return held
@@ -0,0 +1,133 @@
+"""
+Transactional email outbox.
+
+Views call ``queue_email`` inside the same transaction as the row the email
+is about, so a confirmation is queued if and only if the registration or
+nomination is committed. ``manage.py send_outbox`` delivers pending rows in
+batches over a single backend connection, paced by a rate limit, and
+retries failures with exponential backoff.
+"""
+
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger('summit')
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def queue_email(to_email, subject, template_name, context):
+    """Render ``template_name`` and store it in the outbox for ``to_email``."""
+    body = render_to_string(template_name, context)
+    return OutboundEmail.objects.create(to_email=to_email, subject=subject, body=body)
+
+
+def reclaim_stale_emails():
+    """Count emails left in ``sending`` by a stopped worker as a failed attempt."""
+    stale_before = timezone.now() - timedelta(seconds=_setting('SUMMIT_OUTBOX_CLAIM_TIMEOUT', 600))
+    stale = list(OutboundEmail.objects.filter(status='sending', claimed_at__lt=stale_before))
+    for email in stale:
+        _fail(email, 'The worker sending this email stopped before it finished.')
+    return len(stale)
+
+
+def claim_emails(limit):
+    """Mark up to ``limit`` due emails as sending and return them."""
+    reclaim_stale_emails()
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = OutboundEmail.objects.filter(status='pending', send_after__lte=now).order_by('send_after')
+        if connection.features.has_select_for_update:
+            queryset = queryset.select_for_update(
+                skip_locked=connection.features.has_select_for_update_skip_locked
+            )
+        emails = list(queryset[:limit])
+        OutboundEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+            status='sending', claimed_at=now, attempts=F('attempts') + 1
+        )
+    for email in emails:
+        email.status = 'sending'
+        email.claimed_at = now
+        email.attempts += 1
+    return emails
+
+
+def _fail(email, error):
+    # Matching the claim time leaves the row alone if another worker has reclaimed it.
+    claimed = OutboundEmail.objects.filter(pk=email.pk, status='sending', claimed_at=email.claimed_at)
+    max_attempts = _setting('SUMMIT_OUTBOX_MAX_ATTEMPTS', 5)
+    if email.attempts >= max_attempts:
+        if claimed.update(status='failed', claimed_at=None, last_error=str(error)):
+            logger.error(f"Giving up on email {email.pk} to {email.to_email}: {str(error)}")
+        return
+    delay = _setting('SUMMIT_OUTBOX_BACKOFF', 60) * 2 ** (email.attempts - 1)
+    if claimed.update(
+        status='pending', claimed_at=None, last_error=str(error),
+        send_after=timezone.now() + timedelta(seconds=delay),
+    ):
+        logger.warning(f"Email {email.pk} to {email.to_email} failed (attempt {email.attempts}), retrying in {delay}s: {str(error)}")
+
+
+def send_batch(limit, rate=None):
+    """Deliver one batch of queued emails over a single connection.
+
+    ``rate`` caps deliveries per second. Returns (sent, failed).
+    """
+    emails = claim_emails(limit)
+    if not emails:
+        return 0, 0
+
+    interval = 1.0 / rate if rate else 0
+    sent = failed = 0
+    backend = get_connection()
+    try:
+        backend.open()
+    except Exception as e:
+        return _fail_all(emails, e)
+    try:
+        for index, email in enumerate(emails):
+            started = time.monotonic()
+            message = EmailMessage(email.subject, email.body, settings.DEFAULT_FROM_EMAIL, [email.to_email], connection=backend)
+            try:
+                message.send()
+            except Exception as e:
+                _fail(email, e)
+                failed += 1
+                # The connection may be unusable after an SMTP error.
+                backend.close()
+                try:
+                    backend.open()
+                except Exception as e:
+                    _, unsent = _fail_all(emails[index + 1:], e)
+                    return sent, failed + unsent
+            else:
+                OutboundEmail.objects.filter(pk=email.pk).update(
+                    status='sent', sent_at=timezone.now(), claimed_at=None, last_error=''
+                )
+                sent += 1
+            elapsed = time.monotonic() - started
+            if interval > elapsed:
+                time.sleep(interval - elapsed)
+    finally:
+        backend.close()
+    return sent, failed
+
+
+def _fail_all(emails, error):
+    """Hand claimed emails back when the mail server can't be reached."""
+    logger.error(f"Could not connect to the mail server: {str(error)}")
+    for email in emails:
+        _fail(email, error)
+    return 0, len(emails)
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from summit.chunked_uploads import cleanup_uploads
+
+
+class Command(BaseCommand):
+    help = 'Delete chunked uploads that were abandoned before being attached'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age-hours',
+            type=float,
+            default=24,
+            help='Remove uploads idle for longer than this (default: 24)'
+        )
+
+    def handle(self, *args, **options):
+        removed = cleanup_uploads(timedelta(hours=options['max_age_hours']))
+        self.stdout.write(self.style.SUCCESS(f'Removed {removed} abandoned upload(s)'))
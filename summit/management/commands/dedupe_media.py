@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from summit.blobs import collect_garbage, import_existing_files, recount_references
+
+
+class Command(BaseCommand):
+    help = 'Move uploads into content-addressed storage, recount references and delete unused blobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours',
+            type=float,
+            default=24,
+            help='Keep unreferenced blobs at least this long (default: 24)'
+        )
+        parser.add_argument(
+            '--no-import',
+            action='store_true',
+            help='Skip moving files uploaded before content addressing'
+        )
+
+    def handle(self, *args, **options):
+        if not options['no_import']:
+            moved = import_existing_files()
+            self.stdout.write(f'Moved {moved} file(s) into content-addressed storage')
+
+        blobs = recount_references()
+        self.stdout.write(f'Recounted references for {blobs} blob(s)')
+
+        deleted, freed = collect_garbage(timedelta(hours=options['grace_hours']))
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} unreferenced blob(s), freed {filesizeformat(freed)}'
+        ))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from summit.inventory import expire_reservations, reconcile_inventory
+
+
+class Command(BaseCommand):
+    help = 'Expire unpaid ticket reservations past their TTL and release their seats'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Registrations expired per transaction (default: 500)'
+        )
+        parser.add_argument(
+            '--reconcile',
+            action='store_true',
+            help='Also recount reserved seats from the registrations table'
+        )
+
+    def handle(self, *args, **options):
+        expired = expire_reservations(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Expired {expired} unpaid reservation(s)'))
+
+        if options['reconcile']:
+            held = reconcile_inventory()
+            for ticket_type, count in sorted(held.items()):
+                self.stdout.write(f'{ticket_type}: {count} seat(s) held')
+            self.stdout.write(self.style.SUCCESS('Ticket inventory reconciled'))
@@ -0,0 +1,69 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from summit.exports import (
+    REGISTRATION_EXPORT_FIELDS, NOMINATION_EXPORT_FIELDS, iter_rows, write_xlsx,
+    export_filename, openpyxl
+)
+from summit.models import ConferenceRegistration, Nomination
+
+EXPORTS = {
+    'registrations': (ConferenceRegistration, REGISTRATION_EXPORT_FIELDS),
+    'nominations': (Nomination, NOMINATION_EXPORT_FIELDS),
+}
+
+
+class Command(BaseCommand):
+    help = 'Export conference registrations or nominations to CSV or XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=sorted(EXPORTS), help='What to export')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'xlsx'],
+            default='csv',
+            help='Output format (default: csv)'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Output file name (default: <model>_<timestamp>.<format>)'
+        )
+        parser.add_argument(
+            '--filter',
+            action='append',
+            default=[],
+            metavar='FIELD=VALUE',
+            help='Queryset filter, e.g. --filter payment_status=paid (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        model, fields = EXPORTS[options['model']]
+        filters = {}
+        for item in options['filter']:
+            if '=' not in item:
+                raise CommandError(f'Invalid filter "{item}", expected FIELD=VALUE')
+            key, value = item.split('=', 1)
+            filters[key] = value
+        queryset = model.objects.filter(**filters)
+
+        fmt = options['format']
+        output_file = options['output'] or export_filename(options['model'], fmt)
+        count = 0
+        if fmt == 'xlsx':
+            if openpyxl is None:
+                raise CommandError('XLSX export requires openpyxl (pip install openpyxl)')
+            with open(output_file, 'wb') as f:
+                write_xlsx(queryset, fields, f)
+            count = queryset.count()
+        else:
+            with open(output_file, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                for row in iter_rows(queryset, fields):
+                    writer.writerow(row)
+                    count += 1
+            count -= 1  # header
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully exported {count} {options["model"]} to {output_file}')
+        )
@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from summit.models import ConferenceRegistration, TicketInventory
+
+# Kept row first: paid, then pending, then the rest.
+STATUS_RANK = {'paid': 0, 'pending': 1, 'failed': 2, 'expired': 3}
+# Details filled in on the kept row when it left them blank.
+MERGED_FIELDS = (
+    'first_name', 'last_name', 'phone', 'company', 'job_title', 'dietary_requirements',
+    'special_needs', 'how_did_you_hear',
+)
+# Columns that exist before migration 0009, which this command must run ahead of.
+FIELDS = ('id', 'email', 'ticket_type', 'payment_status', 'is_confirmed', 'registration_date') + MERGED_FIELDS
+
+
+def _rank(row):
+    status = STATUS_RANK.get(row['payment_status'], len(STATUS_RANK))
+    return status, not row['is_confirmed'], row['registration_date'], row['id']
+
+
+def duplicate_groups():
+    """Return the registrations sharing an (email, ticket_type) pair, kept row first."""
+    groups = {}
+    for row in ConferenceRegistration.objects.order_by('pk').values(*FIELDS):
+        groups.setdefault((row['email'].strip().lower(), row['ticket_type']), []).append(row)
+    return {key: sorted(rows, key=_rank) for key, rows in groups.items() if len(rows) > 1}
+
+
+class Command(BaseCommand):
+    help = 'Merge registrations that share an email and ticket type, before migration 0009'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the merges without changing anything'
+        )
+
+    def handle(self, *args, **options):
+        # Before 0010 there is no inventory whose seats the deleted rows hold.
+        has_inventory = TicketInventory._meta.db_table in connection.introspection.table_names()
+        merged = 0
+        for (email, ticket_type), (kept, *duplicates) in duplicate_groups().items():
+            merging = ', '.join(f"#{row['id']} ({row['payment_status']})" for row in duplicates)
+            self.stdout.write(
+                f"{email} / {ticket_type}: keeping #{kept['id']} ({kept['payment_status']}), merging {merging}"
+            )
+            if options['dry_run']:
+                continue
+
+            updates = {'email': email, 'is_confirmed': any(row['is_confirmed'] for row in [kept, *duplicates])}
+            for field in MERGED_FIELDS:
+                if not kept[field]:
+                    updates[field] = next((row[field] for row in duplicates if row[field]), kept[field])
+            with transaction.atomic():
+                rows = ConferenceRegistration.objects.filter(pk__in=[row['id'] for row in duplicates])
+                if has_inventory:
+                    # post_delete hands the seats of the merged rows back.
+                    rows.only('id', 'ticket_type', 'payment_status').delete()
+                else:
+                    rows._raw_delete(rows.db)
+                ConferenceRegistration.objects.filter(pk=kept['id']).update(**updates)
+            merged += len(duplicates)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS('Dry run: nothing changed'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Merged {merged} duplicate registration(s)'))
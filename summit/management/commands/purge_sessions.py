@@ -0,0 +1,48 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Delete expired sessions in small batches to avoid long table locks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Sessions deleted per statement (default: 1000)'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.1,
+            help='Seconds to pause between batches (default: 0.1)'
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            default=0,
+            help='Stop after this many batches, 0 for no limit (default: 0)'
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        expired = Session.objects.filter(expire_date__lt=now)
+        deleted = batches = 0
+        while True:
+            keys = list(expired.values_list('session_key', flat=True)[:options['batch_size']])
+            if not keys:
+                break
+            count, _ = Session.objects.filter(session_key__in=keys).delete()
+            deleted += count
+            batches += 1
+            if options['max_batches'] and batches >= options['max_batches']:
+                break
+            time.sleep(options['sleep'])
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Deleted {deleted} expired session(s) in {batches} batch(es)')
+        )
@@ -0,0 +1,60 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from summit.media_queue import run_batch
+
+
+class Command(BaseCommand):
+    help = 'Process queued image derivative jobs in a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=min(2, os.cpu_count() or 1),
+            help='Number of worker processes (default: 2 or the CPU count, if lower)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20,
+            help='Jobs claimed per batch (default: 20)'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5,
+            help='Seconds to wait when the queue is empty (default: 5)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue and exit instead of polling (for cron)'
+        )
+
+    def handle(self, *args, **options):
+        # Spawned workers import Django afresh instead of inheriting DB sockets.
+        context = multiprocessing.get_context('spawn')
+        processed = 0
+        with ProcessPoolExecutor(max_workers=options['processes'], mp_context=context, initializer=django.setup) as executor:
+            try:
+                while True:
+                    close_old_connections()
+                    claimed = run_batch(executor, options['batch_size'])
+                    processed += claimed
+                    if claimed:
+                        self.stdout.write(f'Processed {claimed} media job(s)')
+                        continue
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+            except KeyboardInterrupt:
+                self.stdout.write('Stopping media worker')
+
+        self.stdout.write(self.style.SUCCESS(f'Media worker finished after {processed} job(s)'))
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from summit.mail import send_batch
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbound emails in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Emails sent per connection (default: 50)'
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=5,
+            help='Maximum emails per second, 0 for unlimited (default: 5)'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=10,
+            help='Seconds to wait when the outbox is empty (default: 10)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the outbox and exit instead of polling (for cron)'
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        try:
+            while True:
+                close_old_connections()
+                sent, failed = send_batch(options['batch_size'], options['rate'])
+                total_sent += sent
+                total_failed += failed
+                if sent or failed:
+                    self.stdout.write(f'Sent {sent} email(s), {failed} failed')
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping outbox sender')
+
+        self.stdout.write(self.style.SUCCESS(f'Outbox sender finished: {total_sent} sent, {total_failed} failed'))
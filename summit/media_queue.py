@@ -0,0 +1,125 @@
+"""
+Persistent job queue for image derivatives.
+
+Admin saves only insert a ``MediaJob`` row (in the same transaction as the
+upload), so they return immediately. ``manage.py run_media_worker`` claims
+due jobs, renders them in a process pool and retries failures with
+exponential backoff. Rendering is idempotent: derivatives that are already
+up to date are left alone, so a job can safely run more than once.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .cache import invalidate_pages
+from .images import forget_derivatives, generate_derivatives, image_files
+from .models import MediaJob
+
+logger = logging.getLogger('summit')
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue_instance_images(instance):
+    """Queue derivative generation for every image on ``instance``."""
+    model_label = instance._meta.label_lower
+    for field_name, field_file in image_files(instance):
+        job, created = MediaJob.objects.get_or_create(
+            file_name=field_file.name,
+            defaults={'model_label': model_label, 'field_name': field_name},
+        )
+        if created:
+            continue
+        # A blob deleted by dedupe_media and uploaded again gets the same name
+        # but no derivatives, so a finished job is rerun for a newer file.
+        if job.status == 'failed' or (job.status == 'done' and _modified_since(field_file, job.updated_at)):
+            MediaJob.objects.filter(pk=job.pk).update(
+                status='pending', attempts=0, run_after=timezone.now(), last_error=''
+            )
+
+
+def _modified_since(field_file, moment):
+    try:
+        return field_file.storage.get_modified_time(field_file.name) > moment
+    except (OSError, NotImplementedError):
+        return False
+
+
+def claim_jobs(limit):
+    """Mark up to ``limit`` due jobs as running and return them."""
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=_setting('SUMMIT_MEDIA_JOB_TIMEOUT', 600))
+    due = Q(status='pending', run_after__lte=now) | Q(status='running', claimed_at__lt=stale_before)
+    with transaction.atomic():
+        queryset = MediaJob.objects.filter(due).order_by('run_after')
+        if connection.features.has_select_for_update:
+            queryset = queryset.select_for_update(
+                skip_locked=connection.features.has_select_for_update_skip_locked
+            )
+        jobs = list(queryset[:limit])
+        MediaJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status='running', claimed_at=now, attempts=F('attempts') + 1
+        )
+    for job in jobs:
+        job.attempts += 1
+    return jobs
+
+
+def render_job(model_label, field_name, file_name):
+    """Generate derivatives for one job; runs inside a pool worker process."""
+    storage = apps.get_model(model_label)._meta.get_field(field_name).storage
+    return len(generate_derivatives(file_name, storage))
+
+
+def complete_job(job):
+    MediaJob.objects.filter(pk=job.pk).update(
+        status='done', claimed_at=None, last_error='', updated_at=timezone.now()
+    )
+    # The pool process may not share this process's cache, and a page
+    # rendered meanwhile may have cached an empty or stale manifest.
+    forget_derivatives(job.file_name)
+
+
+def fail_job(job, error):
+    """Schedule a retry with exponential backoff, or give up after the last attempt."""
+    max_attempts = _setting('SUMMIT_MEDIA_JOB_MAX_ATTEMPTS', 5)
+    if isinstance(error, FileNotFoundError) or job.attempts >= max_attempts:
+        logger.error(f"Media job for {job.file_name} failed permanently: {str(error)}")
+        MediaJob.objects.filter(pk=job.pk).update(status='failed', claimed_at=None, last_error=str(error))
+        return
+    delay = _setting('SUMMIT_MEDIA_JOB_BACKOFF', 30) * 2 ** (job.attempts - 1)
+    logger.warning(f"Media job for {job.file_name} failed (attempt {job.attempts}), retrying in {delay}s: {str(error)}")
+    MediaJob.objects.filter(pk=job.pk).update(
+        status='pending', claimed_at=None, last_error=str(error),
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def run_batch(executor, limit):
+    """Claim and process one batch of jobs; return how many were claimed."""
+    jobs = claim_jobs(limit)
+    futures = {
+        executor.submit(render_job, job.model_label, job.field_name, job.file_name): job
+        for job in jobs
+    }
+    completed = 0
+    for future, job in futures.items():
+        try:
+            future.result()
+        except Exception as e:
+            fail_job(job, e)
+        else:
+            complete_job(job)
+            completed += 1
+    if completed:
+        # Cached pages rendered before the derivatives existed lack srcsets.
+        invalidate_pages()
+    return len(jobs)
@@ -0,0 +1,88 @@
+"""
+Query inspection middleware for debug and staging.
+
+Records every SQL statement a request executes, groups statements by shape
+(the parameterised SQL with ``IN`` lists collapsed), flags shapes repeated
+often enough to look like an N+1 pattern and enforces a per-URL-name query
+budget from ``SUMMIT_QUERY_BUDGETS``. It is listed in ``MIDDLEWARE``
+everywhere but only runs when ``SUMMIT_QUERY_INSPECTOR`` is on.
+"""
+
+import logging
+import re
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('summit')
+
+_IN_LIST_RE = re.compile(r'\bIN \((?:%s, )*%s\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a view runs more queries than its budget."""
+
+
+def query_shape(sql):
+    """Collapse ``sql`` to a shape shared by queries differing only in parameters."""
+    sql = _WHITESPACE_RE.sub(' ', sql).strip()
+    return _IN_LIST_RE.sub('IN (...)', sql)
+
+
+class QueryRecorder:
+    """Execute wrapper that counts queries by shape."""
+
+    def __init__(self):
+        self.shapes = Counter()
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        self.shapes[query_shape(sql)] += 1
+        return execute(sql, params, many, context)
+
+    def repeated(self, threshold):
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+class QueryInspectorMiddleware:
+    """Report per-view query counts, N+1 suspects and budget overruns."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SUMMIT_QUERY_INSPECTOR', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.budgets = getattr(settings, 'SUMMIT_QUERY_BUDGETS', {})
+        self.strict = getattr(settings, 'SUMMIT_QUERY_BUDGET_STRICT', False)
+        self.n_plus_one_threshold = getattr(settings, 'SUMMIT_N_PLUS_ONE_THRESHOLD', 3)
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        url_name = match.url_name if match else None
+        self.report(request, url_name, recorder)
+        response['X-Query-Count'] = str(recorder.total)
+        return response
+
+    def report(self, request, url_name, recorder):
+        view = url_name or request.path
+        logger.debug(f"Query report for {view}: {recorder.total} queries, {len(recorder.shapes)} distinct shapes")
+
+        for shape, count in recorder.repeated(self.n_plus_one_threshold):
+            logger.warning(f"Possible N+1 in {view}: {count}x {shape[:200]}")
+
+        budget = self.budgets.get(url_name)
+        if budget is not None and recorder.total > budget:
+            message = f"Query budget exceeded for {view}: {recorder.total} queries (budget {budget})"
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:46
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('summit', '0005_speaker_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(help_text='e.g. summit.speaker', max_length=100)),
+                ('field_name', models.CharField(max_length=100)),
+                ('file_name', models.CharField(max_length=255, unique=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['run_after'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='summit_mediajob_queue_idx')],
+            },
+        ),
+    ]
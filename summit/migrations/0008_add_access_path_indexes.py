@@ -0,0 +1,57 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('summit', '0007_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='awardcategory',
+            index=models.Index(fields=['is_active', 'order', 'name'], name='summit_category_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conferenceregistration',
+            index=models.Index(fields=['-registration_date'], name='summit_reg_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conferenceregistration',
+            index=models.Index(fields=['payment_status', '-registration_date'], name='summit_reg_payment_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conferenceregistration',
+            index=models.Index(fields=['ticket_type', '-registration_date'], name='summit_reg_ticket_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nomination',
+            index=models.Index(fields=['-submitted_at'], name='summit_nomination_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nomination',
+            index=models.Index(fields=['category', '-submitted_at'], name='summit_nomination_cat_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nomination',
+            index=models.Index(fields=['is_reviewed', '-submitted_at'], name='summit_nomination_review_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nomination',
+            index=models.Index(fields=['is_approved', '-submitted_at'], name='summit_nomination_approve_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='speaker',
+            index=models.Index(fields=['order', 'name'], name='summit_speaker_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sponsor',
+            index=models.Index(fields=['is_active', 'level', 'name'], name='summit_sponsor_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='summitorganizer',
+            index=models.Index(fields=['is_active', 'order', 'name'], name='summit_organizer_active_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:52
+
+from django.db import migrations, models
+
+
+def normalize_registration_emails(apps, schema_editor):
+    """Lower-case emails, refusing to migrate while (email, ticket_type) has duplicates.
+
+    Duplicates may include paid registrations, so they are left to
+    ``manage.py merge_registrations`` rather than deleted here. This runs
+    before any schema change, so a refused migration can simply be rerun.
+    """
+    ConferenceRegistration = apps.get_model('summit', 'ConferenceRegistration')
+    groups = {}
+    rows = ConferenceRegistration.objects.order_by('pk').values_list('pk', 'email', 'ticket_type', 'payment_status')
+    for pk, email, ticket_type, payment_status in rows:
+        groups.setdefault((email.strip().lower(), ticket_type), []).append(f'#{pk} ({payment_status})')
+    duplicates = [
+        f"  {email} / {ticket_type}: {', '.join(registrations)}"
+        for (email, ticket_type), registrations in groups.items() if len(registrations) > 1
+    ]
+    if duplicates:
+        raise RuntimeError(
+            'Duplicate registrations must be merged before the unique constraint can be added; '
+            'run `python manage.py merge_registrations --dry-run` to review the merge, then without '
+            '--dry-run to apply it:\n' + '\n'.join(duplicates)
+        )
+    for pk, email in ConferenceRegistration.objects.values_list('pk', 'email'):
+        if email != email.strip().lower():
+            ConferenceRegistration.objects.filter(pk=pk).update(email=email.strip().lower())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('summit', '0008_add_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_registration_emails, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='conferenceregistration',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.AddConstraint(
+            model_name='conferenceregistration',
+            constraint=models.UniqueConstraint(fields=('email', 'ticket_type'), name='summit_unique_registration', violation_error_message='You are already registered for this ticket type.'),
+        ),
+    ]
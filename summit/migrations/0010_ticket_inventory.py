@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('summit', '0009_registration_idempotency'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketInventory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticket_type', models.CharField(choices=[('regular', 'Regular Ticket'), ('vip', 'VIP Ticket'), ('exhibitor', 'Exhibitor Pass')], max_length=20, unique=True)),
+                ('capacity', models.PositiveIntegerField()),
+                ('reserved', models.PositiveIntegerField(default=0, help_text='Pending and paid registrations holding a seat')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Ticket Inventory',
+                'verbose_name_plural': 'Ticket Inventory',
+                'ordering': ['ticket_type'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='conferenceregistration',
+            name='payment_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('paid', 'Paid'), ('failed', 'Failed'), ('expired', 'Expired')], default='pending', max_length=20),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('summit', '0010_ticket_inventory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exhibitor',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:01
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('summit', '0011_exhibitor_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='nomination',
+            name='supporting_documents',
+            field=models.FileField(blank=True, null=True, upload_to='nominations/', validators=[django.core.validators.FileExtensionValidator(['pdf', 'doc', 'docx', 'jpg', 'jpeg', 'png'])]),
+        ),
+    ]
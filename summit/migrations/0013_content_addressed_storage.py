@@ -0,0 +1,80 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:03
+
+import django.core.validators
+import summit.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('summit', '0012_nomination_document_types'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='aboutsectioncontent',
+            name='about_image',
+            field=models.ImageField(blank=True, help_text='Image for the about section after hero', null=True, storage=summit.storage.ContentAddressedStorage(), upload_to='about_section/'),
+        ),
+        migrations.AlterField(
+            model_name='exhibitor',
+            name='logo',
+            field=models.ImageField(storage=summit.storage.ContentAddressedStorage(), upload_to='exhibitors/'),
+        ),
+        migrations.AlterField(
+            model_name='nomination',
+            name='supporting_documents',
+            field=models.FileField(blank=True, null=True, storage=summit.storage.ContentAddressedStorage(), upload_to='nominations/', validators=[django.core.validators.FileExtensionValidator(['pdf', 'doc', 'docx', 'jpg', 'jpeg', 'png'])]),
+        ),
+        migrations.AlterField(
+            model_name='sitesettings',
+            name='favicon',
+            field=models.ImageField(blank=True, help_text='Favicon (.ico, .png)', null=True, storage=summit.storage.ContentAddressedStorage(), upload_to='site_assets/'),
+        ),
+        migrations.AlterField(
+            model_name='sitesettings',
+            name='hero_background_image',
+            field=models.ImageField(blank=True, help_text='Hero section background image', null=True, storage=summit.storage.ContentAddressedStorage(), upload_to='hero_images/'),
+        ),
+        migrations.AlterField(
+            model_name='sitesettings',
+            name='primary_organizer_logo',
+            field=models.ImageField(blank=True, help_text='Primary organizer logo (appears first in navigation)', null=True, storage=summit.storage.ContentAddressedStorage(), upload_to='site_assets/'),
+        ),
+        migrations.AlterField(
+            model_name='sitesettings',
+            name='site_logo',
+            field=models.ImageField(blank=True, help_text='Main summit logo (appears second in navigation)', null=True, storage=summit.storage.ContentAddressedStorage(), upload_to='site_assets/'),
+        ),
+        migrations.AlterField(
+            model_name='speaker',
+            name='photo',
+            field=models.ImageField(blank=True, null=True, storage=summit.storage.ContentAddressedStorage(), upload_to='speakers/'),
+        ),
+        migrations.AlterField(
+            model_name='sponsor',
+            name='logo',
+            field=models.ImageField(storage=summit.storage.ContentAddressedStorage(), upload_to='sponsors/'),
+        ),
+        migrations.AlterField(
+            model_name='summitorganizer',
+            name='logo',
+            field=models.ImageField(storage=summit.storage.ContentAddressedStorage(), upload_to='organizers/'),
+        ),
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Path of the content-addressed blob', max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['ref_count', 'updated_at'], name='summit_storedfile_gc_idx')],
+            },
+        ),
+    ]
@@ -1,14 +1,20 @@
-from django.db import models
+import uuid
+
+from django.db import models, transaction
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from django.core.validators import FileExtensionValidator
+
+from .storage import content_storage
+from .uploads import DOCUMENT_EXTENSIONS
 
 
 class SiteSettings(models.Model):
     site_name = models.CharField(max_length=200, default="Nigeria Transport and Logistics Summit and Awards")
-    primary_organizer_logo = models.ImageField(upload_to='site_assets/', blank=True, null=True, help_text="Primary organizer logo (appears first in navigation)")
-    site_logo = models.ImageField(upload_to='site_assets/', blank=True, null=True, help_text="Main summit logo (appears second in navigation)")
-    favicon = models.ImageField(upload_to='site_assets/', blank=True, null=True, help_text="Favicon (.ico, .png)")
-    hero_background_image = models.ImageField(upload_to='hero_images/', blank=True, null=True, help_text="Hero section background image")
+    primary_organizer_logo = models.ImageField(storage=content_storage, upload_to='site_assets/', blank=True, null=True, help_text="Primary organizer logo (appears first in navigation)")
+    site_logo = models.ImageField(storage=content_storage, upload_to='site_assets/', blank=True, null=True, help_text="Main summit logo (appears second in navigation)")
+    favicon = models.ImageField(storage=content_storage, upload_to='site_assets/', blank=True, null=True, help_text="Favicon (.ico, .png)")
+    hero_background_image = models.ImageField(storage=content_storage, upload_to='hero_images/', blank=True, null=True, help_text="Hero section background image")
     contact_email = models.EmailField(default="info@tlngsummit.com")
     contact_phone = models.CharField(max_length=20, default="+234 xxx xxx xxxx")
     social_facebook = models.URLField(blank=True)
@@ -79,15 +85,19 @@ class Speaker(models.Model):
     title = models.CharField(max_length=300)
     company = models.CharField(max_length=200, blank=True)
     bio = models.TextField()
-    photo = models.ImageField(upload_to='speakers/', blank=True, null=True)
+    photo = models.ImageField(storage=content_storage, upload_to='speakers/', blank=True, null=True)
     linkedin_url = models.URLField(blank=True)
     twitter_url = models.URLField(blank=True)
     is_featured = models.BooleanField(default=False)
     order = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['order', 'name']
+        indexes = [
+            models.Index(fields=['order', 'name'], name='summit_speaker_order_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.title}"
@@ -107,6 +117,7 @@ class SponsorshipLevel(models.Model):
     benefits = models.TextField(help_text="List benefits, one per line")
     max_sponsors = models.PositiveIntegerField(default=10)
     order = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['order']
@@ -118,18 +129,52 @@ class SponsorshipLevel(models.Model):
 class Sponsor(models.Model):
     name = models.CharField(max_length=200)
     level = models.ForeignKey(SponsorshipLevel, on_delete=models.CASCADE)
-    logo = models.ImageField(upload_to='sponsors/')
+    logo = models.ImageField(storage=content_storage, upload_to='sponsors/')
     website = models.URLField(blank=True)
     description = models.TextField(blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['level__order', 'name']
+        indexes = [
+            models.Index(fields=['is_active', 'level', 'name'], name='summit_sponsor_active_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.level.get_name_display()})"
 
+    def takes_slot(self):
+        """Whether saving makes this sponsor newly take a slot at its level."""
+        if not self.is_active or not self.level_id:
+            return False
+        if self._state.adding:
+            return True
+        saved = Sponsor.objects.filter(pk=self.pk).values('level_id', 'is_active').first()
+        return saved is None or not saved['is_active'] or saved['level_id'] != self.level_id
+
+    def check_slots(self, lock=False):
+        # Sponsors already holding a slot keep it, even if the level is over its cap.
+        if not self.takes_slot():
+            return
+        levels = SponsorshipLevel.objects.filter(pk=self.level_id)
+        if lock:
+            levels = levels.select_for_update()
+        level = levels.get()
+        taken = Sponsor.objects.filter(level_id=self.level_id, is_active=True).exclude(pk=self.pk).count()
+        if taken >= level.max_sponsors:
+            raise ValidationError({'level': f"All {level.max_sponsors} {level.get_name_display()} sponsorship slots are taken."})
+
+    def clean(self):
+        self.check_slots()
+
+    def save(self, *args, **kwargs):
+        # Count and save under the level's lock so two concurrent saves can't both take the last slot.
+        with transaction.atomic():
+            self.check_slots(lock=True)
+            return super().save(*args, **kwargs)
+
 
 class AwardCategory(models.Model):
     name = models.CharField(max_length=200)
@@ -142,6 +187,9 @@ class AwardCategory(models.Model):
     class Meta:
         ordering = ['order', 'name']
         verbose_name_plural = "Award Categories"
+        indexes = [
+            models.Index(fields=['is_active', 'order', 'name'], name='summit_category_active_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -155,20 +203,29 @@ class Nomination(models.Model):
     nominator_email = models.EmailField()
     nominator_phone = models.CharField(max_length=20, blank=True)
     nomination_reason = models.TextField()
-    supporting_documents = models.FileField(upload_to='nominations/', blank=True, null=True)
+    supporting_documents = models.FileField(
+        storage=content_storage, upload_to='nominations/', blank=True, null=True,
+        validators=[FileExtensionValidator(DOCUMENT_EXTENSIONS)]
+    )
     submitted_at = models.DateTimeField(auto_now_add=True)
     is_reviewed = models.BooleanField(default=False)
     is_approved = models.BooleanField(default=False)
 
     class Meta:
         ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['-submitted_at'], name='summit_nomination_recent_idx'),
+            models.Index(fields=['category', '-submitted_at'], name='summit_nomination_cat_idx'),
+            models.Index(fields=['is_reviewed', '-submitted_at'], name='summit_nomination_review_idx'),
+            models.Index(fields=['is_approved', '-submitted_at'], name='summit_nomination_approve_idx'),
+        ]
 
     def __str__(self):
         return f"{self.nominee_name} - {self.category.name}"
 
 
 class AboutSectionContent(models.Model):
-    about_image = models.ImageField(upload_to='about_section/', blank=True, null=True, help_text="Image for the about section after hero")
+    about_image = models.ImageField(storage=content_storage, upload_to='about_section/', blank=True, null=True, help_text="Image for the about section after hero")
     image_alt_text = models.CharField(max_length=200, default="Transport and Logistics", help_text="Alt text for the about section image")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -188,17 +245,21 @@ class AboutSectionContent(models.Model):
 
 class SummitOrganizer(models.Model):
     name = models.CharField(max_length=200)
-    logo = models.ImageField(upload_to='organizers/')
+    logo = models.ImageField(storage=content_storage, upload_to='organizers/')
     website = models.URLField(blank=True)
     description = models.TextField(blank=True, help_text="Brief description of the organization")
     order = models.PositiveIntegerField(default=0, help_text="Display order")
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['order', 'name']
         verbose_name = "Summit Organizer"
         verbose_name_plural = "Summit Organizers"
+        indexes = [
+            models.Index(fields=['is_active', 'order', 'name'], name='summit_organizer_active_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -235,16 +296,82 @@ class ConferenceRegistration(models.Model):
         ('pending', 'Pending'),
         ('paid', 'Paid'),
         ('failed', 'Failed'),
+        ('expired', 'Expired'),
     ])
+    idempotency_key = models.CharField(max_length=64, unique=True, blank=True, null=True, editable=False)
 
     class Meta:
         ordering = ['-registration_date']
         verbose_name = "Conference Registration"
         verbose_name_plural = "Conference Registrations"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['email', 'ticket_type'],
+                name='summit_unique_registration',
+                violation_error_message='You are already registered for this ticket type.',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['-registration_date'], name='summit_reg_recent_idx'),
+            models.Index(fields=['payment_status', '-registration_date'], name='summit_reg_payment_idx'),
+            models.Index(fields=['ticket_type', '-registration_date'], name='summit_reg_ticket_idx'),
+        ]
+
+    # Payment states that hold a seat in the ticket inventory
+    SEAT_HOLDING_STATUSES = ('pending', 'paid')
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.email}"
 
+    @property
+    def holds_seat(self):
+        return self.payment_status in self.SEAT_HOLDING_STATUSES
+
+    def reactivate(self):
+        """Turn an expired reservation back into a fresh pending one."""
+        self.payment_status = 'pending'
+        self.is_confirmed = False
+        self.registration_date = timezone.now()
+
+    def held_seat(self, for_update=False):
+        """Return the ticket type whose seat the saved row holds, or None."""
+        if self._state.adding:
+            return None
+        rows = type(self).objects.filter(pk=self.pk)
+        if for_update:
+            rows = rows.select_for_update()
+        row = rows.values('ticket_type', 'payment_status').first()
+        if row and row['payment_status'] in self.SEAT_HOLDING_STATUSES:
+            return row['ticket_type']
+        return None
+
+    def clean(self):
+        super().clean()
+        takes_seat = self.holds_seat and self.held_seat() != self.ticket_type
+        if takes_seat and TicketInventory.objects.filter(
+            ticket_type=self.ticket_type, reserved__gte=models.F('capacity')
+        ).exists():
+            raise ValidationError({'ticket_type': 'Sorry, this ticket type is sold out.'})
+
+
+class TicketInventory(models.Model):
+    ticket_type = models.CharField(max_length=20, choices=ConferenceRegistration.TICKET_TYPES, unique=True)
+    capacity = models.PositiveIntegerField()
+    reserved = models.PositiveIntegerField(default=0, help_text="Pending and paid registrations holding a seat")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['ticket_type']
+        verbose_name = "Ticket Inventory"
+        verbose_name_plural = "Ticket Inventory"
+
+    def __str__(self):
+        return f"{self.get_ticket_type_display()}: {self.reserved}/{self.capacity}"
+
+    @property
+    def remaining(self):
+        return max(self.capacity - self.reserved, 0)
+
 
 class ExhibitionPackage(models.Model):
     PACKAGE_TYPES = [
@@ -260,6 +387,7 @@ class ExhibitionPackage(models.Model):
     features = models.TextField(help_text="List features, one per line")
     max_exhibitors = models.PositiveIntegerField(default=50)
     order = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['order']
@@ -272,16 +400,149 @@ class Exhibitor(models.Model):
     name = models.CharField(max_length=200)
     package = models.ForeignKey(ExhibitionPackage, on_delete=models.CASCADE)
     company_description = models.TextField()
-    logo = models.ImageField(upload_to='exhibitors/')
+    logo = models.ImageField(storage=content_storage, upload_to='exhibitors/')
     website = models.URLField(blank=True)
     contact_person = models.CharField(max_length=200)
     contact_email = models.EmailField()
     contact_phone = models.CharField(max_length=20)
     is_approved = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
 
     def __str__(self):
         return f"{self.name} ({self.package.get_name_display()})"
+
+    def takes_slot(self):
+        """Whether saving makes this exhibitor newly take a space in its package."""
+        if not self.is_approved or not self.package_id:
+            return False
+        if self._state.adding:
+            return True
+        saved = Exhibitor.objects.filter(pk=self.pk).values('package_id', 'is_approved').first()
+        return saved is None or not saved['is_approved'] or saved['package_id'] != self.package_id
+
+    def check_slots(self, lock=False):
+        # Exhibitors already holding a space keep it, even if the package is over its cap.
+        if not self.takes_slot():
+            return
+        packages = ExhibitionPackage.objects.filter(pk=self.package_id)
+        if lock:
+            packages = packages.select_for_update()
+        package = packages.get()
+        taken = Exhibitor.objects.filter(package_id=self.package_id, is_approved=True).exclude(pk=self.pk).count()
+        if taken >= package.max_exhibitors:
+            raise ValidationError({'package': f"All {package.max_exhibitors} {package.get_name_display()} spaces are taken."})
+
+    def clean(self):
+        self.check_slots()
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            self.check_slots(lock=True)
+            return super().save(*args, **kwargs)
+
+
+class MediaJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    model_label = models.CharField(max_length=100, help_text="e.g. summit.speaker")
+    field_name = models.CharField(max_length=100)
+    file_name = models.CharField(max_length=255, unique=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['run_after']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='summit_mediajob_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.file_name} ({self.get_status_display()})"
+
+
+class OutboundEmail(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    send_after = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['send_after']
+        verbose_name = "Outbound Email"
+        verbose_name_plural = "Outbound Emails"
+        indexes = [
+            models.Index(fields=['status', 'send_after'], name='summit_outbox_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.get_status_display()})"
+
+
+class StoredFile(models.Model):
+    name = models.CharField(max_length=255, unique=True, help_text="Path of the content-addressed blob")
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['ref_count', 'updated_at'], name='summit_storedfile_gc_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
+class ChunkedUpload(models.Model):
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('complete', 'Complete'),
+        ('attached', 'Attached'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    file_name = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField(help_text="Declared total size in bytes")
+    offset = models.PositiveBigIntegerField(default=0, help_text="Bytes received so far")
+    sha256 = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='summit_upload_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.file_name} ({self.offset}/{self.size}, {self.get_status_display()})"
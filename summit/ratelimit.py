@@ -0,0 +1,120 @@
+"""
+Cache-backed rate limiting for the public form POSTs and upload chunks.
+
+Each (endpoint, client IP) and (endpoint, submitted email) pair gets a
+sliding-window counter: the hit count of the current fixed window plus the
+previous window's count weighted by how much of it still overlaps the
+sliding window. Counters live in the shared cache, so every worker sees the
+same totals, and a rejection costs a few cache round trips and no database
+work. The IP check runs before the request body is parsed, so a flood of
+uploads from one address is turned away before Django spools the files;
+that only holds if CSRF is checked inside the limiter, so form views are
+wrapped ``csrf_exempt`` outside ``rate_limit`` and ``csrf_protect`` inside.
+
+Limits come from ``SUMMIT_RATE_LIMITS``::
+
+    SUMMIT_RATE_LIMITS = {
+        'nominations': {'ip': (20, 3600), 'email': (10, 3600)},
+        'upload_chunks': {'ip': (600, 3600)},
+    }
+
+A rejected request gets a 429 with ``Retry-After``: the HTML page for the
+forms, or a JSON error for views limited with ``json_response=True`` such as
+the chunked-upload API. Rejections are logged to the ``summit`` logger as ``Rate limit exceeded``
+lines that ``log_analyzer.py ratelimit`` summarises.
+"""
+
+import hashlib
+import logging
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.shortcuts import render
+
+logger = logging.getLogger('summit')
+
+# Log the first rejection of a window and then every this many.
+LOG_EVERY = 100
+
+
+def _limits(scope):
+    return getattr(settings, 'SUMMIT_RATE_LIMITS', {}).get(scope, {})
+
+
+def _counter_key(scope, kind, ident, window):
+    digest = hashlib.md5(ident.encode('utf-8')).hexdigest()
+    return f'summit:rl:{scope}:{kind}:{digest}:{window}'
+
+
+def _incr(key, timeout):
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # The key expired between add() and incr().
+        cache.set(key, 1, timeout)
+        return 1
+
+
+def hit(scope, kind, ident, limit, period):
+    """Count a request for ``ident``; return seconds to wait, or 0 if allowed."""
+    now = time.time()
+    window, elapsed = divmod(now, period)
+    window = int(window)
+    key = _counter_key(scope, kind, ident, window)
+
+    current = _incr(key, period * 2)
+    previous = cache.get(_counter_key(scope, kind, ident, window - 1), 0)
+    estimated = previous * (period - elapsed) / period + current
+    if estimated <= limit:
+        return 0
+
+    rejected = _incr(f'{key}:rejected', period * 2)
+    if rejected == 1 or rejected % LOG_EVERY == 0:
+        logger.warning(
+            f"Rate limit exceeded: scope={scope} key={kind}:{ident} "
+            f"rejected={rejected} window={window} limit={limit}/{period}s"
+        )
+    return max(int(period - elapsed), 1)
+
+
+def _rejected(request, retry_after, json_response):
+    if json_response:
+        response = JsonResponse(
+            {'error': f'Too many requests. Try again in {retry_after} seconds.', 'retry_after': retry_after},
+            status=429,
+        )
+    else:
+        response = render(
+            request, 'summit/rate_limited.html', {'retry_after_minutes': (retry_after + 59) // 60}, status=429
+        )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def rate_limit(scope, email_field=None, methods=('POST',), json_response=False):
+    """Limit ``methods`` requests to the decorated view per client IP and per ``email_field``."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            limits = _limits(scope)
+            if request.method not in methods or not limits:
+                return view_func(request, *args, **kwargs)
+
+            if 'ip' in limits:
+                retry_after = hit(scope, 'ip', request.META.get('REMOTE_ADDR', ''), *limits['ip'])
+                if retry_after:
+                    return _rejected(request, retry_after, json_response)
+
+            email = request.POST.get(email_field, '').strip().lower() if email_field else ''
+            if email and 'email' in limits:
+                retry_after = hit(scope, 'email', email, *limits['email'])
+                if retry_after:
+                    return _rejected(request, retry_after, json_response)
+
+            return view_func(request, *args, **kwargs)
+        return _wrapped_view
+    return decorator
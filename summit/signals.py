@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.db.models.signals import pre_save, post_save, post_delete
+
+from .blobs import CONTENT_ADDRESSED_FIELDS, file_names, release_reference, update_references
+from .cache import SINGLETON_MODELS, PAGE_MODELS, invalidate_singleton, invalidate_pages
+from .images import IMAGE_FIELDS, process_instance_images
+from .inventory import invalidate_remaining, release_tickets
+from .media_queue import enqueue_instance_images
+from .models import ConferenceRegistration, TicketInventory
+
+
+def generate_image_derivatives(sender, instance, **kwargs):
+    """Build responsive variants of the instance's uploaded images."""
+    if getattr(settings, 'SUMMIT_MEDIA_ASYNC', False):
+        enqueue_instance_images(instance)
+    else:
+        process_instance_images(instance)
+
+
+def invalidate_singleton_cache(sender, **kwargs):
+    """Drop the cached singleton row whenever it is saved or deleted."""
+    invalidate_singleton(sender)
+
+
+def invalidate_page_cache(sender, **kwargs):
+    """Make cached public pages stale when a model they render changes."""
+    invalidate_pages()
+
+
+def release_ticket_reservation(sender, instance, **kwargs):
+    if instance.holds_seat:
+        release_tickets(instance.ticket_type)
+
+
+def invalidate_inventory_cache(sender, **kwargs):
+    invalidate_remaining()
+
+
+def remember_file_names(sender, instance, raw=False, **kwargs):
+    """Note which blobs the row pointed at before this save."""
+    instance._summit_file_names = {}
+    if raw or instance._state.adding:
+        return
+    fields = CONTENT_ADDRESSED_FIELDS[sender]
+    row = sender.objects.filter(pk=instance.pk).values(*fields).first()
+    if row:
+        instance._summit_file_names = {field: name or '' for field, name in row.items()}
+
+
+def count_file_references(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    update_references(getattr(instance, '_summit_file_names', {}), file_names(instance))
+
+
+def release_file_references(sender, instance, **kwargs):
+    for name in file_names(instance).values():
+        release_reference(name)
+
+
+# Derivatives are connected first so pages re-rendered after the save see them.
+for model in IMAGE_FIELDS:
+    post_save.connect(generate_image_derivatives, sender=model, dispatch_uid=f'images_save_{model.__name__}')
+
+for model in SINGLETON_MODELS:
+    post_save.connect(invalidate_singleton_cache, sender=model, dispatch_uid=f'singleton_save_{model.__name__}')
+    post_delete.connect(invalidate_singleton_cache, sender=model, dispatch_uid=f'singleton_delete_{model.__name__}')
+
+for model in PAGE_MODELS:
+    post_save.connect(invalidate_page_cache, sender=model, dispatch_uid=f'page_save_{model.__name__}')
+    post_delete.connect(invalidate_page_cache, sender=model, dispatch_uid=f'page_delete_{model.__name__}')
+
+post_delete.connect(release_ticket_reservation, sender=ConferenceRegistration, dispatch_uid='inventory_registration_delete')
+post_save.connect(invalidate_inventory_cache, sender=TicketInventory, dispatch_uid='inventory_save')
+post_delete.connect(invalidate_inventory_cache, sender=TicketInventory, dispatch_uid='inventory_delete')
+
+for model in CONTENT_ADDRESSED_FIELDS:
+    pre_save.connect(remember_file_names, sender=model, dispatch_uid=f'blobs_pre_save_{model.__name__}')
+    post_save.connect(count_file_references, sender=model, dispatch_uid=f'blobs_save_{model.__name__}')
+    post_delete.connect(release_file_references, sender=model, dispatch_uid=f'blobs_delete_{model.__name__}')
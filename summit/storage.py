@@ -0,0 +1,64 @@
+"""
+Content-addressed file storage for uploaded media.
+
+``ContentAddressedStorage`` ignores the ``upload_to`` directory and stores
+each upload under the SHA-256 of its bytes,
+``cas/<aa>/<bb>/<sha256><ext>``. Uploading a logo or PDF that is already
+stored returns the existing name without writing anything, so sponsors,
+exhibitors and organizers sharing a logo (or nominators resubmitting the
+same report) share one file, and its image derivatives are generated once.
+
+Names already inside the ``cas/`` tree (image derivatives, which are named
+after their blob) are written as given, and files saved before this storage
+was introduced keep working because reads go through FileSystemStorage.
+References are counted by ``summit.blobs``.
+"""
+
+import hashlib
+import os
+import posixpath
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+CAS_PREFIX = 'cas/'
+
+
+def is_content_addressed(name):
+    return bool(name) and name.startswith(CAS_PREFIX)
+
+
+def content_name(digest, extension):
+    return posixpath.join(CAS_PREFIX.rstrip('/'), digest[:2], digest[2:4], f'{digest}{extension.lower()}')
+
+
+def content_digest(content):
+    """Return the SHA-256 of ``content``, reusing one computed during upload."""
+    digest = getattr(content, 'sha256', None)
+    if digest:
+        return digest
+    sha256 = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        sha256.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return sha256.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names uploads after their content hash."""
+
+    def _save(self, name, content):
+        if is_content_addressed(name):
+            return super()._save(name, content)
+        _, extension = os.path.splitext(name)
+        name = content_name(content_digest(content), extension)
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
+
+
+content_storage = ContentAddressedStorage()
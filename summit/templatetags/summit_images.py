@@ -0,0 +1,44 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from ..images import CONTENT_TYPES, get_derivatives
+
+register = template.Library()
+
+
+def _srcset(field_file, fmt):
+    storage = field_file.storage
+    return ', '.join(
+        f'{storage.url(name)} {width}w'
+        for entry_fmt, width, name in get_derivatives(field_file)
+        if entry_fmt == fmt
+    )
+
+
+@register.simple_tag
+def srcset(field_file, fmt='webp'):
+    """Return a ``srcset`` value listing the ``fmt`` derivatives of an image."""
+    if not field_file:
+        return ''
+    return _srcset(field_file, fmt)
+
+
+@register.simple_tag
+def responsive_image(field_file, alt='', sizes='100vw', **attrs):
+    """Render a <picture> with per-format sources falling back to the original."""
+    if not field_file:
+        return ''
+    formats = []
+    for fmt, _, _ in get_derivatives(field_file):
+        if fmt not in formats:
+            formats.append(fmt)
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((CONTENT_TYPES[fmt], _srcset(field_file, fmt), sizes) for fmt in formats)
+    )
+    attrs = {'loading': 'lazy', 'decoding': 'async', **attrs}
+    extra = format_html_join('', ' {}="{}"', ((key.replace('_', '-'), value) for key, value in attrs.items()))
+    return format_html(
+        '<picture>{}<img src="{}" alt="{}"{}></picture>',
+        sources, field_file.url, alt, extra
+    )
@@ -1,3 +1,1454 @@
-from django.test import TestCase
+import gzip
+import hashlib
+import io
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from io import BytesIO
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.core.exceptions import ValidationError
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.models import Session
+from django.template import Context, Template
+from django.test import (
+    AsyncRequestFactory, Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+)
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+
+import log_analyzer
+import log_warehouse
+from log_parser import LogParser, parse_lines
+from monitor_logs import LogFollower, follow_logs, read_tail
+
+from . import async_views
+from .blobs import collect_garbage, import_existing_files, recount_references
+from .cache import SINGLETON_MODELS, get_page_version, get_site_settings, invalidate_singleton
+from .exports import REGISTRATION_EXPORT_FIELDS, escape_formula, iter_rows
+from .idempotency import new_submission_token
+from .images import MODERN_FORMATS, derivative_name, generate_derivatives, get_derivatives
+from .inventory import SoldOut, expire_reservations, save_registration
+from .mail import send_batch
+from .ratelimit import hit
+from .media_queue import run_batch
+from .middleware import QueryBudgetExceeded, query_shape
+from .models import (
+    AwardCategory, ChunkedUpload, ConferenceRegistration, EventContent, ExhibitionPackage, Exhibitor,
+    MediaJob, Nomination, OutboundEmail, SiteSettings, Speaker, Sponsor, SponsorshipLevel, StoredFile,
+    SummitOrganizer, TicketInventory
+)
+from .storage import content_storage
+from .uploads import DocumentUploadHandler
+
+try:
+    import pymysql
+except ImportError:
+    pymysql = None
+else:
+    pymysql.install_as_MySQLdb()
+    from .db.backends.mysql_pool import base as pool_base
+
+INSPECTED_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'summit.middleware.QueryInspectorMiddleware',
+]
+
+
+@override_settings(
+    MIDDLEWARE=INSPECTED_MIDDLEWARE, SUMMIT_QUERY_INSPECTOR=True, SUMMIT_QUERY_BUDGET_STRICT=True,
+    SUMMIT_PAGE_CACHE_TIMEOUT=0,
+)
+class QueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        SiteSettings.objects.create()
+        EventContent.objects.create(event_date=timezone.now(), venue='Eko Hotel, Lagos')
+        level = SponsorshipLevel.objects.create(name='gold', price=1000, benefits='Logo')
+        for i in range(5):
+            Speaker.objects.create(name=f'Speaker {i}', title='Director', bio='Bio')
+            Sponsor.objects.create(name=f'Sponsor {i}', level=level, logo='sponsors/logo.png')
+
+    def setUp(self):
+        # Start every test cold so budgets cover the worst case.
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            for model in SINGLETON_MODELS:
+                invalidate_singleton(model)
+
+    def test_public_pages_stay_within_budget(self):
+        for url in ('/', '/speakers/', '/sponsorship/', '/nomination/', '/register/'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    @override_settings(SUMMIT_QUERY_BUDGETS={'home': 1})
+    def test_budget_overrun_fails_in_strict_mode(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get('/')
+
+    @override_settings(SUMMIT_QUERY_INSPECTOR=False, SUMMIT_QUERY_BUDGETS={'home': 1})
+    def test_inspector_is_off_without_its_setting(self):
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Query-Count', response)
+
+    def test_query_shape_collapses_in_lists(self):
+        self.assertEqual(
+            query_shape('SELECT * FROM t\n WHERE id IN (%s, %s, %s)'),
+            query_shape('SELECT * FROM t WHERE id IN (%s)'),
+        )
+
+
+class SessionStrategyTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def register_round_trip(self):
+        """GET the form, POST it and follow the redirect, returning the SQL run."""
+        form = {
+            'first_name': 'Ada', 'last_name': 'Obi', 'email': 'ada@example.com', 'phone': '08000000000',
+            'attendee_type': 'individual', 'ticket_type': 'regular',
+            'submission_token': new_submission_token(),
+        }
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/register/')
+            response = self.client.post('/register/', form, follow=True)
+        self.assertRedirects(response, '/registration-success/')
+        self.assertEqual(ConferenceRegistration.objects.count(), 1)
+        return [query['sql'] for query in queries]
+
+    @override_settings(
+        SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+        MESSAGE_STORAGE='django.contrib.messages.storage.cookie.CookieStorage',
+    )
+    def test_hybrid_strategy_keeps_anonymous_visitors_out_of_the_session_table(self):
+        queries = self.register_round_trip()
+        self.assertFalse([sql for sql in queries if 'django_session' in sql])
+        self.assertFalse(Session.objects.exists())
+
+    @override_settings(
+        SESSION_ENGINE='django.contrib.sessions.backends.db',
+        MESSAGE_STORAGE='django.contrib.messages.storage.session.SessionStorage',
+    )
+    def test_db_strategy_writes_a_session_for_the_flash_message(self):
+        queries = self.register_round_trip()
+        self.assertTrue([sql for sql in queries if 'django_session' in sql])
+
+    def test_purge_sessions_deletes_expired_rows_in_batches(self):
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key=f'expired{i}', session_data='', expire_date=now - timedelta(days=1))
+        Session.objects.create(session_key='live', session_data='', expire_date=now + timedelta(days=1))
+        out = io.StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('purge_sessions', batch_size=2, sleep=0, stdout=out)
+        deletes = [query for query in queries if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 3)
+        self.assertIn('Deleted 5 expired session(s) in 3 batch(es)', out.getvalue())
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live'])
+
+    def test_purge_sessions_stops_after_max_batches(self):
+        expired = timezone.now() - timedelta(days=1)
+        for i in range(5):
+            Session.objects.create(session_key=f'expired{i}', session_data='', expire_date=expired)
+        call_command('purge_sessions', batch_size=2, sleep=0, max_batches=1, stdout=io.StringIO())
+        self.assertEqual(Session.objects.count(), 3)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN output is parsed in SQLite format')
+class IndexUsageTests(TestCase):
+    """Public and admin querysets must be served by an index, not a table scan."""
+
+    def assertNoFullScan(self, queryset):
+        plan = queryset.explain()
+        for line in plan.splitlines():
+            self.assertNotRegex(line, r'\bSCAN \w+$', f'Full table scan in plan:\n{plan}')
+
+    def assertIndexSearch(self, queryset):
+        """A filtered query must seek into an index, not scan one or the table."""
+        plan = queryset.explain()
+        table = queryset.model._meta.db_table
+        self.assertRegex(plan, rf'\bSEARCH {table}\b', f'No index search in plan:\n{plan}')
+        self.assertNotRegex(plan, rf'\bSCAN {table}\b', f'Scan in plan:\n{plan}')
+
+    def filter_as_mysql(self, queryset, **filters):
+        """Filter booleans as ``col IN (value)``, which seeks like MySQL's ``col = value``.
+
+        SQLite renders ``filter(flag=False)`` as ``WHERE NOT flag``, which no
+        index can seek into; MySQL, which production runs, gets ``flag = false``.
+        """
+        return queryset.filter(**{f'{name}__in': [value] for name, value in filters.items()})
+
+    def admin_queryset(self, model):
+        model_admin = admin.site._registry[model]
+        request = RequestFactory().get('/')
+        queryset = model_admin.get_queryset(request)
+        return queryset.order_by(*(model_admin.get_ordering(request) or model._meta.ordering))
+
+    def test_public_querysets_use_indexes(self):
+        self.assertNoFullScan(Speaker.objects.all())
+        for queryset in (
+            self.filter_as_mysql(Sponsor.objects.all(), is_active=True),
+            self.filter_as_mysql(SummitOrganizer.objects.all(), is_active=True),
+            self.filter_as_mysql(AwardCategory.objects.all(), is_active=True),
+        ):
+            with self.subTest(model=queryset.model.__name__):
+                self.assertIndexSearch(queryset)
+
+    def test_admin_changelists_use_indexes(self):
+        registrations = self.admin_queryset(ConferenceRegistration)
+        nominations = self.admin_queryset(Nomination)
+        for queryset in (registrations, nominations):
+            with self.subTest(query=str(queryset.query)):
+                self.assertNoFullScan(queryset[:100])
+        for queryset in (
+            registrations.filter(payment_status='paid'),
+            registrations.filter(ticket_type='vip'),
+            nominations.filter(category_id=1),
+            self.filter_as_mysql(nominations, is_reviewed=False),
+            self.filter_as_mysql(nominations, is_approved=True),
+        ):
+            with self.subTest(query=str(queryset.query)):
+                self.assertIndexSearch(queryset[:100])
+
+
+def make_registration(email='ada@example.com', ticket_type='vip', **kwargs):
+    fields = {'first_name': 'Ada', 'last_name': 'Obi', 'phone': '08000000000', **kwargs}
+    return ConferenceRegistration(email=email, ticket_type=ticket_type, **fields)
+
+
+class InventoryTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.inventory = TicketInventory.objects.create(ticket_type='vip', capacity=1)
+
+    def reserved(self):
+        self.inventory.refresh_from_db()
+        return self.inventory.reserved
+
+    def test_save_registration_takes_and_releases_seats(self):
+        registration = save_registration(make_registration())
+        self.assertEqual(self.reserved(), 1)
+        registration.payment_status = 'failed'
+        save_registration(registration)
+        self.assertEqual(self.reserved(), 0)
+        registration.payment_status = 'paid'
+        save_registration(registration)
+        self.assertEqual(self.reserved(), 1)
+        registration.delete()
+        self.assertEqual(self.reserved(), 0)
+
+    def test_sold_out_saves_nothing(self):
+        save_registration(make_registration())
+        with self.assertRaises(SoldOut):
+            save_registration(make_registration(email='bola@example.com'))
+        self.assertEqual(ConferenceRegistration.objects.count(), 1)
+        self.assertEqual(self.reserved(), 1)
+
+    def test_plain_saves_do_not_raise(self):
+        save_registration(make_registration())
+        ConferenceRegistration.objects.create(
+            first_name='Bola', last_name='Ade', email='bola@example.com', phone='1', ticket_type='vip'
+        )
+        self.assertEqual(self.reserved(), 1)
+
+    def test_clean_reports_sold_out(self):
+        save_registration(make_registration())
+        with self.assertRaises(ValidationError) as raised:
+            make_registration(email='bola@example.com').full_clean()
+        self.assertIn('ticket_type', raised.exception.message_dict)
+
+    def test_admin_add_of_sold_out_ticket_is_a_form_error(self):
+        save_registration(make_registration())
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client.force_login(user)
+        response = self.client.post('/admin/summit/conferenceregistration/add/', {
+            'first_name': 'Bola', 'last_name': 'Ade', 'email': 'bola@example.com', 'phone': '1',
+            'attendee_type': 'individual', 'ticket_type': 'vip', 'payment_status': 'pending',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Sorry, this ticket type is sold out.')
+        self.assertEqual(self.reserved(), 1)
+
+    def test_expired_reservations_release_their_seat(self):
+        registration = save_registration(make_registration())
+        ConferenceRegistration.objects.filter(pk=registration.pk).update(
+            registration_date=timezone.now() - timedelta(days=30)
+        )
+        self.assertEqual(expire_reservations(), 1)
+        self.assertEqual(self.reserved(), 0)
+        registration.refresh_from_db()
+        self.assertEqual(registration.payment_status, 'expired')
+        self.assertEqual(expire_reservations(), 0)
+        self.assertEqual(self.reserved(), 0)
+
+    def test_registering_again_reactivates_an_expired_reservation(self):
+        registration = save_registration(make_registration())
+        ConferenceRegistration.objects.filter(pk=registration.pk).update(
+            payment_status='expired', registration_date=timezone.now() - timedelta(days=30)
+        )
+        TicketInventory.objects.update(reserved=0)
+        response = self.client.post('/register/', {
+            'first_name': 'Ada', 'last_name': 'Okafor', 'email': 'ADA@example.com', 'phone': '08000000001',
+            'attendee_type': 'individual', 'ticket_type': 'vip', 'submission_token': new_submission_token(),
+        })
+        self.assertRedirects(response, '/registration-success/')
+        registration = ConferenceRegistration.objects.get()
+        self.assertEqual((registration.payment_status, registration.last_name), ('pending', 'Okafor'))
+        self.assertGreater(registration.registration_date, timezone.now() - timedelta(minutes=1))
+        self.assertEqual(self.reserved(), 1)
+
+    def test_paid_reservations_are_not_expired(self):
+        registration = save_registration(make_registration(payment_status='paid'))
+        ConferenceRegistration.objects.filter(pk=registration.pk).update(
+            registration_date=timezone.now() - timedelta(days=30)
+        )
+        self.assertEqual(expire_reservations(), 0)
+        self.assertEqual(self.reserved(), 1)
+
+
+class RegistrationIdempotencyTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def post(self, token, **data):
+        form = {
+            'first_name': 'Ada', 'last_name': 'Obi', 'email': 'Ada@Example.com', 'phone': '08000000000',
+            'attendee_type': 'individual', 'ticket_type': 'regular', 'submission_token': token,
+        }
+        form.update(data)
+        return self.client.post('/register/', form)
+
+    def assertDuplicate(self, response):
+        self.assertRedirects(response, '/registration-success/')
+        self.assertEqual(ConferenceRegistration.objects.count(), 1)
+        messages = [str(message) for message in response.wsgi_request._messages]
+        self.assertIn('We already have your registration. We will contact you with further details.', messages)
+
+    def test_double_post_creates_one_registration(self):
+        token = new_submission_token()
+        self.assertRedirects(self.post(token), '/registration-success/')
+        self.assertDuplicate(self.post(token))
+        self.assertEqual(ConferenceRegistration.objects.get().email, 'ada@example.com')
+
+    def test_resubmission_after_cached_result_expired(self):
+        token = new_submission_token()
+        self.post(token)
+        cache.clear()
+        self.assertDuplicate(self.post(token))
+
+    def test_resubmission_with_a_new_token(self):
+        self.post(new_submission_token())
+        self.assertDuplicate(self.post(new_submission_token(), email='ada@example.com '))
+
+    def test_merge_registrations_keeps_the_paid_row(self):
+        inventory = TicketInventory.objects.create(ticket_type='regular', capacity=10)
+        paid = save_registration(make_registration('Ada@Example.com', 'regular', payment_status='paid'))
+        save_registration(make_registration('ada@example.com', 'regular', company='Obi Freight', is_confirmed=True))
+        save_registration(make_registration('ben@example.com', 'regular'))
+        out = io.StringIO()
+        call_command('merge_registrations', '--dry-run', stdout=out)
+        self.assertIn(f'ada@example.com / regular: keeping #{paid.pk} (paid)', out.getvalue())
+        self.assertEqual(ConferenceRegistration.objects.count(), 3)
+
+        call_command('merge_registrations', stdout=io.StringIO())
+        merged = ConferenceRegistration.objects.get(ticket_type='regular', email='ada@example.com')
+        self.assertEqual(merged.pk, paid.pk)
+        self.assertEqual((merged.payment_status, merged.company, merged.is_confirmed), ('paid', 'Obi Freight', True))
+        self.assertEqual(ConferenceRegistration.objects.count(), 2)
+        inventory.refresh_from_db()
+        self.assertEqual(inventory.reserved, 2)
+
+    def test_concurrent_insert_is_answered_as_duplicate(self):
+        ConferenceRegistration.objects.create(
+            first_name='Ada', last_name='Obi', email='ada@example.com', phone='1', ticket_type='regular'
+        )
+        # The other request commits after this one passed validation.
+        with mock.patch.object(ConferenceRegistration, 'validate_constraints'):
+            self.assertDuplicate(self.post(new_submission_token()))
+
+
+class RateLimitTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def hit_at(self, now, limit=3):
+        with mock.patch('time.time', return_value=now):
+            return hit('tests', 'ip', '192.0.2.1', limit, 100)
+
+    def test_sliding_window_weights_the_previous_window(self):
+        self.assertEqual([self.hit_at(1000) for _ in range(3)], [0, 0, 0])
+        with self.assertLogs('summit', 'WARNING') as logs:
+            self.assertEqual(self.hit_at(1000), 100)
+        self.assertIn('Rate limit exceeded: scope=tests key=ip:192.0.2.1', logs.output[0])
+        # Half of the previous window's 4 hits still count.
+        self.assertEqual(self.hit_at(1150), 0)
+        with self.assertLogs('summit', 'WARNING'):
+            self.assertEqual(self.hit_at(1150), 50)
+        self.assertEqual(self.hit_at(1290), 0)
+
+    @override_settings(SUMMIT_RATE_LIMITS={'registration': {'ip': (1, 3600)}})
+    def test_registration_limit_runs_before_csrf(self):
+        client = Client(enforce_csrf_checks=True)
+        self.assertEqual(client.post('/register/', {'email': 'ada@example.com'}).status_code, 403)
+        with self.assertLogs('summit', 'WARNING'):
+            response = client.post('/register/', {'email': 'ada@example.com'})
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(response['Retry-After'])
+
+    @override_settings(SUMMIT_RATE_LIMITS={'upload_chunks': {'ip': (1, 3600)}})
+    def test_upload_chunks_are_limited(self):
+        url = '/uploads/00000000-0000-0000-0000-000000000000/'
+        self.assertEqual(self.client.patch(url, b'x').status_code, 404)
+        with self.assertLogs('summit', 'WARNING'):
+            response = self.client.patch(url, b'x')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json()['retry_after'], int(response['Retry-After']))
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    @override_settings(SUMMIT_RATE_LIMITS={'uploads': {'ip': (1, 3600)}})
+    def test_upload_create_rejection_is_json(self):
+        payload = {'file_name': 'cv.pdf', 'size': 10}
+        self.client.post('/uploads/', payload, content_type='application/json')
+        with self.assertLogs('summit', 'WARNING'):
+            response = self.client.post('/uploads/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Too many requests', response.json()['error'])
+        self.assertTrue(response['Retry-After'])
+
+
+class CacheInvalidationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_version_moves_only_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            Speaker.objects.create(name='Ada Obi', title='Director', bio='Bio')
+            self.assertEqual(get_page_version(), 0)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(get_page_version(), 1)
+
+    @override_settings(SUMMIT_PAGE_CACHE_TIMEOUT=600)
+    def test_query_strings_share_the_cached_page(self):
+        SiteSettings.objects.create()
+        self.client.get('/speakers/')
+        Speaker.objects.create(name='Ada Obi', title='Director', bio='Bio')
+        # Without the on_commit callbacks the page version stays put.
+        response = self.client.get('/speakers/?utm_source=newsletter')
+        self.assertNotContains(response, 'Ada Obi')
+
+    def test_singleton_is_reloaded_after_commit(self):
+        settings_row = SiteSettings.objects.create(site_name='Before')
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_singleton(SiteSettings)
+        self.assertEqual(get_site_settings().site_name, 'Before')
+        with self.captureOnCommitCallbacks(execute=True):
+            settings_row.site_name = 'After'
+            settings_row.save()
+        self.assertEqual(get_site_settings().site_name, 'After')
+
+
+@override_settings(SUMMIT_OUTBOX_MAX_ATTEMPTS=2, SUMMIT_OUTBOX_BACKOFF=60)
+class OutboxTests(TestCase):
+
+    def queue(self, **kwargs):
+        return OutboundEmail.objects.create(to_email='ada@example.com', subject='Hello', body='Body', **kwargs)
+
+    def test_sends_due_emails(self):
+        email = self.queue()
+        self.queue(send_after=timezone.now() + timedelta(hours=1))
+        self.assertEqual(send_batch(10), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('sent', 1))
+
+    def test_send_failure_backs_off(self):
+        email = self.queue()
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('Connection reset')):
+            self.assertEqual(send_batch(10), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'pending')
+        self.assertGreater(email.send_after, timezone.now())
+        self.assertEqual(email.last_error, 'Connection reset')
+
+    def test_unreachable_server_releases_the_batch(self):
+        emails = [self.queue(), self.queue()]
+        backend = mock.Mock()
+        backend.open.side_effect = OSError('Connection refused')
+        with mock.patch('summit.mail.get_connection', return_value=backend):
+            self.assertEqual(send_batch(10), (0, 2))
+        for email in emails:
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), ('pending', 1))
+
+    def test_stale_claims_count_towards_max_attempts(self):
+        long_ago = timezone.now() - timedelta(hours=1)
+        retried = self.queue(status='sending', attempts=1, claimed_at=long_ago)
+        abandoned = self.queue(status='sending', attempts=2, claimed_at=long_ago)
+        self.assertEqual(send_batch(10), (0, 0))
+        retried.refresh_from_db()
+        abandoned.refresh_from_db()
+        self.assertEqual((retried.status, retried.attempts), ('pending', 1))
+        self.assertGreater(retried.send_after, timezone.now())
+        self.assertEqual((abandoned.status, abandoned.attempts), ('failed', 2))
+
+
+def png_upload(name='photo.png', color='red', size=(400, 300)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class MediaTestCase(TestCase):
+    """Runs each test against an empty MEDIA_ROOT."""
+
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+@override_settings(SUMMIT_MEDIA_ASYNC=True)
+class MediaQueueTests(MediaTestCase):
+
+    def run_jobs(self):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return run_batch(executor, 10)
+
+    def test_save_queues_a_job_that_builds_derivatives(self):
+        speaker = Speaker.objects.create(name='Ada Obi', title='Director', bio='Bio', photo=png_upload())
+        job = MediaJob.objects.get()
+        self.assertEqual((job.file_name, job.status), (speaker.photo.name, 'pending'))
+        self.assertEqual(self.run_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertTrue(get_derivatives(speaker.photo))
+
+    def test_saving_again_leaves_finished_jobs_alone(self):
+        speaker = Speaker.objects.create(name='Ada Obi', title='Director', bio='Bio', photo=png_upload())
+        self.run_jobs()
+        speaker.bio = 'New bio'
+        speaker.save()
+        self.assertEqual(MediaJob.objects.get().status, 'done')
+
+    def test_reuploaded_blob_is_rendered_again(self):
+        speaker = Speaker.objects.create(name='Ada Obi', title='Director', bio='Bio', photo=png_upload())
+        self.run_jobs()
+        name = speaker.photo.name
+        speaker.delete()
+        self.assertEqual(collect_garbage(timedelta(0))[0], 1)
+        self.assertFalse(StoredFile.objects.exists())
+        self.assertEqual(get_derivatives(Speaker(photo=name).photo), [])
+
+        speaker = Speaker.objects.create(name='Ada Obi', title='Director', bio='Bio', photo=png_upload())
+        self.assertEqual(speaker.photo.name, name)
+        self.assertEqual(MediaJob.objects.get().status, 'pending')
+        self.run_jobs()
+        self.assertTrue(get_derivatives(speaker.photo))
+
+    def test_failed_jobs_are_retried_on_save(self):
+        speaker = Speaker.objects.create(name='Ada Obi', title='Director', bio='Bio', photo=png_upload())
+        MediaJob.objects.update(status='failed', attempts=5)
+        speaker.save()
+        job = MediaJob.objects.get()
+        self.assertEqual((job.status, job.attempts), ('pending', 0))
+
+    def test_finished_job_replaces_a_manifest_cached_before_it_ran(self):
+        speaker = Speaker.objects.create(name='Ada Obi', title='Director', bio='Bio', photo=png_upload())
+        self.assertEqual(get_derivatives(speaker.photo), [])
+        # As in a pool process whose cache writes this process never sees.
+        with mock.patch('django.core.cache.backends.locmem.LocMemCache.set'):
+            self.run_jobs()
+        self.assertTrue(get_derivatives(speaker.photo))
+
+    @override_settings(SUMMIT_IMAGE_MISS_TIMEOUT=60)
+    def test_empty_manifest_expires(self):
+        speaker = Speaker.objects.create(name='Ada Obi', title='Director', bio='Bio', photo=png_upload())
+        self.assertEqual(get_derivatives(speaker.photo), [])
+        with mock.patch('summit.images.cache.set'):
+            generate_derivatives(speaker.photo.name, speaker.photo.storage)
+        self.assertEqual(get_derivatives(speaker.photo), [])
+        with mock.patch('time.time', return_value=time.time() + 120):
+            self.assertTrue(get_derivatives(speaker.photo))
+
+
+# Derivatives are only built when a test asks for them.
+@override_settings(SUMMIT_MEDIA_ASYNC=True)
+class ImageTagTests(MediaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.speaker = Speaker.objects.create(name='Ada Obi', title='Director', bio='Bio', photo=png_upload())
+
+    def render(self, source):
+        return Template('{% load summit_images %}' + source).render(Context({'speaker': self.speaker}))
+
+    @skipUnless('webp' in MODERN_FORMATS, 'Pillow was built without WebP')
+    def test_tags_render_the_cached_manifest(self):
+        photo = self.speaker.photo
+        generate_derivatives(photo.name, photo.storage)
+        webp = ', '.join(
+            f'{photo.storage.url(derivative_name(photo.name, width, "webp"))} {width}w'
+            for width in (80, 160, 320, 400)
+        )
+        self.assertEqual(self.render('{% srcset speaker.photo %}'), webp)
+        html = self.render('{% responsive_image speaker.photo alt=speaker.name sizes="50vw" class="rounded" %}')
+        self.assertTrue(html.startswith('<picture>'))
+        for fmt in MODERN_FORMATS + ['jpeg']:
+            with self.subTest(fmt=fmt):
+                self.assertIn(f'<source type="image/{fmt}" srcset="', html)
+        self.assertIn(f'<source type="image/webp" srcset="{webp}" sizes="50vw">', html)
+        self.assertIn(
+            f'<img src="{photo.url}" alt="Ada Obi" loading="lazy" decoding="async" class="rounded"></picture>', html
+        )
+
+    def test_tags_fall_back_to_the_original_without_derivatives(self):
+        self.assertEqual(get_derivatives(self.speaker.photo), [])
+        self.assertEqual(self.render('{% srcset speaker.photo %}'), '')
+        self.assertEqual(
+            self.render('{% responsive_image speaker.photo alt="Ada Obi" %}'),
+            f'<picture><img src="{self.speaker.photo.url}" alt="Ada Obi" loading="lazy" decoding="async"></picture>',
+        )
+        self.speaker.photo = None
+        self.assertEqual(self.render('{% responsive_image speaker.photo %}'), '')
+
+
+@override_settings(SUMMIT_DOCUMENT_MAX_SIZE=200 * 1024)
+class DocumentUploadTests(MediaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.category = AwardCategory.objects.create(name='Logistics Company of the Year', description='D', criteria='C')
+
+    def post(self, document):
+        return self.client.post('/nomination/', {
+            'category': self.category.pk, 'nominee_name': 'Ada Obi', 'nominator_name': 'Bola Ade',
+            'nominator_email': 'bola@example.com', 'nomination_reason': 'Reason',
+            'supporting_documents': document,
+        })
+
+    def test_valid_document_is_stored_under_its_hash(self):
+        content = b'%PDF-1.4\n' + b'x' * 100000
+        response = self.post(SimpleUploadedFile('report.pdf', content, content_type='application/pdf'))
+        self.assertRedirects(response, '/nomination/')
+        name = Nomination.objects.get().supporting_documents.name
+        self.assertIn(hashlib.sha256(content).hexdigest(), name)
+
+    def test_content_must_match_the_extension(self):
+        response = self.post(SimpleUploadedFile('report.pdf', b'MZ\x90\x00' * 100, content_type='application/pdf'))
+        self.assertContains(response, 'The file content does not match its .pdf extension.')
+        self.assertFalse(Nomination.objects.exists())
+
+    def test_oversize_document_stops_the_upload(self):
+        content = b'%PDF-1.4\n' + b'x' * 300 * 1024
+        with mock.patch('django.http.multipartparser.exhaust') as exhaust:
+            response = self.post(SimpleUploadedFile('report.pdf', content, content_type='application/pdf'))
+        self.assertContains(response, 'The file is larger than 200')
+        self.assertFalse(Nomination.objects.exists())
+        # The rest of the body is left unread.
+        exhaust.assert_not_called()
+
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=1024)
+    def test_body_too_large_for_any_document_is_refused_unread(self):
+        content = b'%PDF-1.4\n' + b'x' * 300 * 1024
+        with mock.patch.object(DocumentUploadHandler, 'receive_data_chunk') as receive:
+            response = self.post(SimpleUploadedFile('report.pdf', content, content_type='application/pdf'))
+        self.assertEqual(response.status_code, 413)
+        receive.assert_not_called()
+
+
+class ExportTests(TestCase):
+
+    def test_rows_are_read_in_pages_by_primary_key(self):
+        for i in range(5):
+            make_registration(email=f'guest{i}@example.com', ticket_type='regular').save()
+        queryset = ConferenceRegistration.objects.order_by('-registration_date')
+        with self.assertNumQueries(3):
+            rows = list(iter_rows(queryset, [('email', 'Email'), ('ticket_type', 'Ticket Type')], chunk_size=2))
+        self.assertEqual(rows[0], ('Email', 'Ticket Type'))
+        self.assertEqual([row[0] for row in rows[1:]], [f'guest{i}@example.com' for i in range(5)])
+        self.assertEqual(rows[1][1], 'Regular Ticket')
+
+    def test_formula_cells_are_quoted(self):
+        make_registration(first_name='=HYPERLINK("http://evil.example")', phone='+2348000000000').save()
+        header, row = iter_rows(ConferenceRegistration.objects.all(), REGISTRATION_EXPORT_FIELDS)
+        values = dict(zip(header, row))
+        self.assertEqual(values['First Name'], '\'=HYPERLINK("http://evil.example")')
+        self.assertEqual(values['Phone'], '+2348000000000')
+        self.assertEqual(values['Last Name'], 'Obi')
+
+    def test_sign_prefixes_are_quoted_unless_the_value_is_a_number(self):
+        for value, expected in (
+            ('+234 (0) 803-000-0000', '+234 (0) 803-000-0000'),
+            ('-42', '-42'),
+            ('+cmd|" /C calc"!A0', '\'+cmd|" /C calc"!A0'),
+            ('-2+3+HYPERLINK("http://evil.example")', '\'-2+3+HYPERLINK("http://evil.example")'),
+            ('@SUM(A1:A2)', "'@SUM(A1:A2)"),
+            ('\t=1', "'\t=1"),
+            (42, 42),
+        ):
+            with self.subTest(value=value):
+                self.assertEqual(escape_formula(value), expected)
+
+
+@override_settings(SUMMIT_UPLOAD_CHUNK_SIZE=1024)
+class ChunkedUploadTests(MediaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        upload_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, upload_dir)
+        settings_override = override_settings(SUMMIT_CHUNKED_UPLOAD_DIR=Path(upload_dir))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.content = b'%PDF-1.4\n' + bytes(range(256)) * 10
+
+    def create(self):
+        response = self.client.post(
+            '/uploads/', {'file_name': 'report.pdf', 'size': len(self.content)}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        return f"/uploads/{response.json()['id']}/"
+
+    def send(self, url, offset, data):
+        return self.client.patch(
+            url, data, content_type='application/offset+octet-stream', headers={'Upload-Offset': str(offset)}
+        )
+
+    def test_chunks_are_assembled_and_hashed(self):
+        url = self.create()
+        for offset in range(0, len(self.content), 1024):
+            response = self.send(url, offset, self.content[offset:offset + 1024])
+            self.assertEqual(response.status_code, 200)
+        state = self.client.get(url).json()
+        self.assertEqual((state['offset'], state['status']), (len(self.content), 'complete'))
+        upload = ChunkedUpload.objects.get()
+        self.assertEqual(upload.sha256, hashlib.sha256(self.content).hexdigest())
+
+    def test_duplicate_chunk_is_refused_without_touching_the_part(self):
+        url = self.create()
+        self.send(url, 0, self.content[:1024])
+        response = self.send(url, 0, b'%PDF-1.4\n' + b'x' * 1000)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 1024)
+        self.send(url, 1024, self.content[1024:2048])
+        self.send(url, 2048, self.content[2048:])
+        upload = ChunkedUpload.objects.get()
+        self.assertEqual(upload.sha256, hashlib.sha256(self.content).hexdigest())
+
+    def test_offset_only_moves_once_the_part_is_published(self):
+        url = self.create()
+        with mock.patch('summit.chunked_uploads.os.replace', side_effect=OSError('Disk full')):
+            with self.assertRaises(OSError):
+                self.send(url, 0, self.content[:1024])
+        self.assertEqual(self.client.get(url).json()['offset'], 0)
+        self.assertEqual(self.send(url, 0, self.content[:1024]).status_code, 200)
+
+    def test_first_chunk_must_match_the_extension(self):
+        url = self.create()
+        response = self.send(url, 0, b'MZ' + b'x' * 1022)
+        self.assertEqual(response.status_code, 415)
+        self.assertEqual(response.json()['offset'], 0)
+
+
+class ContentAddressedStorageTests(MediaTestCase):
+
+    def speaker(self, photo):
+        return Speaker.objects.create(name='Ada Obi', title='Director', bio='Bio', photo=photo)
+
+    def test_identical_uploads_share_one_counted_blob(self):
+        first = self.speaker(png_upload('a.png'))
+        second = self.speaker(png_upload('b.png'))
+        self.assertEqual(first.photo.name, second.photo.name)
+        self.assertTrue(first.photo.name.startswith('cas/'))
+        self.assertEqual(StoredFile.objects.get().ref_count, 2)
+
+        second.photo = png_upload('c.png', color='blue')
+        second.save()
+        self.assertEqual(StoredFile.objects.get(name=first.photo.name).ref_count, 1)
+        self.assertEqual(StoredFile.objects.get(name=second.photo.name).ref_count, 1)
+
+    def test_garbage_collection_waits_for_the_grace_period(self):
+        speaker = self.speaker(png_upload())
+        name = speaker.photo.name
+        speaker.delete()
+        self.assertEqual(collect_garbage(timedelta(hours=1)), (0, 0))
+        self.assertTrue(content_storage.exists(name))
+        deleted, freed = collect_garbage(timedelta(0))
+        self.assertEqual(deleted, 1)
+        self.assertGreater(freed, 0)
+        self.assertFalse(content_storage.exists(name))
+
+    def test_legacy_file_shared_by_several_rows_is_moved_once(self):
+        legacy = FileSystemStorage().save('speakers/legacy.png', png_upload('legacy.png'))
+        self.assertEqual(legacy, 'speakers/legacy.png')
+        speakers = [self.speaker(legacy), self.speaker(legacy)]
+        self.assertEqual(import_existing_files(), 1)
+        names = {Speaker.objects.get(pk=speaker.pk).photo.name for speaker in speakers}
+        self.assertEqual(len(names), 1)
+        new_name = names.pop()
+        self.assertTrue(new_name.startswith('cas/'))
+        self.assertTrue(content_storage.exists(new_name))
+        self.assertFalse(content_storage.exists(legacy))
+        recount_references()
+        self.assertEqual(StoredFile.objects.get(name=new_name).ref_count, 2)
+
+
+class SlotLimitTests(TestCase):
+
+    def setUp(self):
+        self.level = SponsorshipLevel.objects.create(name='gold', price=1000, benefits='Logo', max_sponsors=1)
+        self.package = ExhibitionPackage.objects.create(
+            name='corner', price=500, space_size='3m x 3m', features='Power', max_exhibitors=1
+        )
+
+    def sponsor(self, name, **kwargs):
+        return Sponsor(name=name, level=self.level, logo='sponsors/logo.png', **kwargs)
+
+    def exhibitor(self, name, **kwargs):
+        kwargs.setdefault('package', self.package)
+        return Exhibitor(
+            name=name, company_description='D', logo='exhibitors/logo.png',
+            contact_person='Ada', contact_email='ada@example.com', contact_phone='1', **kwargs
+        )
+
+    def test_full_sponsorship_level_refuses_another_active_sponsor(self):
+        first = self.sponsor('First')
+        first.save()
+        with self.assertRaises(ValidationError) as raised:
+            self.sponsor('Second').full_clean()
+        self.assertIn('level', raised.exception.message_dict)
+        with self.assertRaises(ValidationError):
+            self.sponsor('Second').save()
+        self.sponsor('Inactive', is_active=False).save()
+        # Saving the sponsor holding the slot doesn't count it twice.
+        first.name = 'First Renamed'
+        first.save()
+        self.assertEqual(Sponsor.objects.filter(is_active=True).count(), 1)
+
+    def test_full_package_refuses_another_approved_exhibitor(self):
+        self.exhibitor('First', is_approved=True).save()
+        self.exhibitor('Pending').save()
+        pending = Exhibitor.objects.get(name='Pending')
+        pending.is_approved = True
+        with self.assertRaises(ValidationError):
+            pending.save()
+        self.assertEqual(Exhibitor.objects.filter(is_approved=True).count(), 1)
+
+    def test_rows_holding_a_slot_save_when_over_the_cap(self):
+        first, second = self.sponsor('First'), self.exhibitor('First', is_approved=True)
+        first.save()
+        second.save()
+        # Caps were not enforced before, so existing data may already exceed them.
+        Sponsor.objects.bulk_create([self.sponsor('Over cap')])
+        Exhibitor.objects.bulk_create([self.exhibitor('Over cap', is_approved=True)])
+        for row in (first, second, Sponsor.objects.get(name='Over cap'), Exhibitor.objects.get(name='Over cap')):
+            with self.subTest(row=row.name):
+                row.full_clean()
+                row.save()
+        other = SponsorshipLevel.objects.create(name='silver', price=500, benefits='Logo', max_sponsors=1)
+        first.level = other
+        first.save()
+        first.level = self.level
+        with self.assertRaises(ValidationError):
+            first.save()
+
+    def get_sponsorship_page(self):
+        """Fetch /sponsorship/ cold, returning the response and its query count."""
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            for model in SINGLETON_MODELS:
+                invalidate_singleton(model)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/sponsorship/')
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_sponsorship_page_shows_remaining_slots_and_sold_out(self):
+        SiteSettings.objects.create()
+        silver = SponsorshipLevel.objects.create(name='silver', price=500, benefits='Logo', max_sponsors=3)
+        self.sponsor('Gold Sponsor').save()
+        Sponsor(name='Silver Sponsor', level=silver, logo='sponsors/logo.png').save()
+        response, _ = self.get_sponsorship_page()
+        self.assertContains(response, '2 of 3 slots remaining')
+        self.assertContains(response, 'Available slots: 1 of 1')
+        self.assertContains(response, 'Sold Out', count=1)
+        self.exhibitor('Corner Exhibitor', is_approved=True).save()
+        response, _ = self.get_sponsorship_page()
+        self.assertNotContains(response, 'Available slots')
+        self.assertContains(response, 'Sold Out', count=2)
+
+    def test_sponsorship_page_queries_do_not_grow_with_tiers(self):
+        SiteSettings.objects.create()
+        self.sponsor('Gold Sponsor').save()
+        _, baseline = self.get_sponsorship_page()
+        for name in ('silver', 'bronze'):
+            level = SponsorshipLevel.objects.create(name=name, price=500, benefits='Logo', max_sponsors=3)
+            Sponsor(name=f'{name} sponsor', level=level, logo='sponsors/logo.png').save()
+        for name in ('standard', 'premium', 'island'):
+            package = ExhibitionPackage.objects.create(
+                name=name, price=500, space_size='3m x 3m', features='Power', max_exhibitors=2
+            )
+            self.exhibitor(f'{name} exhibitor', is_approved=True, package=package).save()
+        response, queries = self.get_sponsorship_page()
+        self.assertContains(response, 'Available slots: 1 of 2', count=3)
+        self.assertEqual(queries, baseline)
+
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        SiteSettings.objects.create()
+
+    def test_public_pages_answer_304_until_content_changes(self):
+        for url in ('/', '/speakers/', '/sponsorship/'):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+        etag = self.client.get('/speakers/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Speaker.objects.create(name='Ada Obi', title='Director', bio='Bio')
+        self.assertEqual(self.client.get('/speakers/', headers={'If-None-Match': etag}).status_code, 200)
+
+    def test_new_build_changes_the_etag(self):
+        with self.settings(SUMMIT_BUILD_ID='release-1'):
+            etag = self.client.get('/speakers/')['ETag']
+        with self.settings(SUMMIT_BUILD_ID='release-2'):
+            response = self.client.get('/speakers/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_signed_in_users_get_no_validators(self):
+        etag = self.client.get('/speakers/')['ETag']
+        self.client.force_login(get_user_model().objects.create_user('staff', password='x'))
+        response = self.client.get('/speakers/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+
+@override_settings(SUMMIT_PAGE_CACHE_TIMEOUT=600)
+class AsyncViewTests(TestCase):
+    # summit.urls picks the view module at import, so the async views are called directly.
+
+    def setUp(self):
+        cache.clear()
+        SiteSettings.objects.create()
+        level = SponsorshipLevel.objects.create(name='gold', price=1000, benefits='Logo')
+        Speaker.objects.create(name='Ada Obi', title='Director', bio='Bio')
+        Sponsor.objects.create(name='Acme', level=level, logo='sponsors/logo.png')
+
+    def request(self, path, **headers):
+        request = AsyncRequestFactory().get(path, headers=headers)
+        request.user = AnonymousUser()
+        return request
+
+    async def test_public_pages_render_with_an_etag_and_answer_304(self):
+        for path, view in (
+            ('/', async_views.home),
+            ('/speakers/', async_views.speakers),
+            ('/sponsorship/', async_views.sponsorship),
+        ):
+            with self.subTest(path=path):
+                response = await view(self.request(path))
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('ETag', response)
+                revalidated = await view(self.request(path, **{'If-None-Match': response['ETag']}))
+                self.assertEqual(revalidated.status_code, 304)
+
+    async def test_second_request_is_served_from_the_page_cache(self):
+        with mock.patch.object(async_views, 'arender', wraps=async_views.arender) as arender:
+            first = await async_views.speakers(self.request('/speakers/'))
+            second = await async_views.speakers(self.request('/speakers/'))
+        self.assertEqual(arender.call_count, 1)
+        self.assertContains(first, 'Ada Obi')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+
+class FakeConnection:
+    """Stands in for a PyMySQL connection in the pool tests."""
+
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.closed = False
+        self.pings = 0
+
+    def ping(self, reconnect):
+        self.pings += 1
+        if not self.alive:
+            raise pool_base.Database.OperationalError('MySQL server has gone away')
+
+    def close(self):
+        self.closed = True
+
+
+@skipUnless(pymysql, 'The MySQL pool backend needs PyMySQL')
+class ConnectionPoolTests(SimpleTestCase):
+
+    def pool(self, **kwargs):
+        return pool_base.ConnectionPool(**{'size': 2, 'recycle': 3600, 'ping_after': 30, **kwargs})
+
+    def test_idle_connections_are_reused_last_in_first_out(self):
+        pool = self.pool()
+        first, second = FakeConnection(), FakeConnection()
+        connections = iter([first, second])
+        self.assertIs(pool.acquire(lambda: next(connections)), first)
+        self.assertIs(pool.acquire(lambda: next(connections)), second)
+        pool.release(first)
+        pool.release(second)
+        self.assertIs(pool.acquire(FakeConnection), second)
+        self.assertIs(pool.acquire(FakeConnection), first)
+        self.assertEqual((pool.stats['new_connects'], pool.stats['reused']), (2, 2))
+
+    def test_old_connections_are_recycled(self):
+        pool = self.pool(recycle=60)
+        old = pool.acquire(FakeConnection)
+        pool.release(old)
+        with mock.patch('time.monotonic', return_value=time.monotonic() + 120):
+            fresh = pool.acquire(FakeConnection)
+        self.assertIsNot(fresh, old)
+        self.assertTrue(old.closed)
+        self.assertEqual(pool.stats['recycled'], 1)
+
+    def test_failed_ping_replaces_the_connection(self):
+        pool = self.pool(ping_after=0)
+        dead = pool.acquire(lambda: FakeConnection(alive=False))
+        pool.release(dead)
+        fresh = pool.acquire(FakeConnection)
+        self.assertIsNot(fresh, dead)
+        self.assertEqual(dead.pings, 1)
+        self.assertTrue(dead.closed)
+        self.assertEqual(pool.stats['failed_health_checks'], 1)
+
+    def test_healthy_idle_connection_is_pinged_and_kept(self):
+        pool = self.pool(ping_after=0)
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+        self.assertIs(pool.acquire(FakeConnection), connection)
+        self.assertEqual(connection.pings, 1)
+
+    def test_releases_beyond_the_pool_size_are_closed(self):
+        pool = self.pool(size=1)
+        first, second = pool.acquire(FakeConnection), pool.acquire(FakeConnection)
+        pool.release(first)
+        pool.release(second)
+        self.assertFalse(first.closed)
+        self.assertTrue(second.closed)
+        self.assertEqual(pool.snapshot()['idle'], 1)
+        self.assertEqual(pool.stats['overflow_closed'], 1)
+
+
+class CacheBackendTests(SimpleTestCase):
+
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        settings_override = override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'tiered': {
+                'BACKEND': 'summit.cache_backends.TieredCache',
+                'OPTIONS': {'SHARED': 'shared', 'LOCAL_MAX_ENTRIES': 2, 'LOCAL_TIMEOUT': 60},
+            },
+            'shared': {
+                'BACKEND': 'summit.cache_backends.SQLiteCache',
+                'LOCATION': str(Path(cache_dir) / 'cache.sqlite3'),
+            },
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.shared, self.tiered = caches['shared'], caches['tiered']
+
+    def test_shared_cache_get_set_add_and_incr(self):
+        self.assertIsNone(self.shared.get('missing'))
+        self.shared.set('greeting', {'text': 'hello'})
+        self.assertEqual(self.shared.get('greeting'), {'text': 'hello'})
+        self.assertFalse(self.shared.add('greeting', 'other'))
+        self.assertTrue(self.shared.add('counter', 1))
+        self.assertEqual(self.shared.incr('counter', 2), 3)
+        self.assertEqual(self.shared.get_many(['greeting', 'counter', 'missing']), {
+            'greeting': {'text': 'hello'}, 'counter': 3,
+        })
+        with self.assertRaises(ValueError):
+            self.shared.incr('missing')
+
+    def test_shared_cache_entries_expire(self):
+        self.shared.set('short', 'value', 10)
+        later = time.time() + 60
+        with mock.patch('time.time', return_value=later):
+            self.assertIsNone(self.shared.get('short'))
+            self.assertFalse(self.shared.has_key('short'))
+            self.assertTrue(self.shared.add('short', 'again', 10))
+            self.assertEqual(self.shared.get('short'), 'again')
+
+    async def test_shared_cache_aget(self):
+        self.shared.set('greeting', 'hello')
+        self.assertEqual(await self.shared.aget('greeting'), 'hello')
+        self.assertEqual(await self.tiered.aget('greeting'), 'hello')
+
+    def test_tiered_cache_serves_local_copies_until_deleted(self):
+        self.tiered.set('speakers', ['Ada'])
+        self.shared.set('speakers', ['Ada', 'Ben'])
+        self.assertEqual(self.tiered.get('speakers'), ['Ada'])
+        self.tiered.delete('speakers')
+        self.assertIsNone(self.tiered.get('speakers'))
+        stats = self.tiered.stats()
+        self.assertEqual((stats['local_hits'], stats['shared_misses']), (1, 1))
+
+    def test_tiered_cache_evicts_least_recently_used(self):
+        for key in ('a', 'b', 'c'):
+            self.tiered.set(key, key)
+        self.shared.clear()
+        self.assertEqual([self.tiered.get(key) for key in ('a', 'b', 'c')], [None, 'b', 'c'])
+
+    def test_tiered_cache_local_copies_expire(self):
+        self.tiered.set('speakers', ['Ada'])
+        self.shared.set('speakers', ['Ada', 'Ben'])
+        with mock.patch('time.monotonic', return_value=time.monotonic() + 120):
+            self.assertEqual(self.tiered.get('speakers'), ['Ada', 'Ben'])
+
+    def test_tiered_cache_add_and_incr_use_the_shared_tier(self):
+        self.assertTrue(self.tiered.add('counter', 1))
+        self.assertFalse(self.tiered.add('counter', 5))
+        self.shared.incr('counter')
+        self.assertEqual(self.tiered.incr('counter'), 3)
+        self.assertEqual(self.tiered.get('counter'), 3)
+
+    def test_tiered_cache_reads_version_keys_from_the_shared_tier(self):
+        self.tiered.set('summit:page:version', 1)
+        self.shared.set('summit:page:version', 2)
+        self.assertEqual(self.tiered.get('summit:page:version'), 2)
+        self.assertEqual(self.tiered.stats()['local_entries'], 0)
+
+
+class LogFollowerTests(SimpleTestCase):
+
+    def setUp(self):
+        logs_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, logs_dir)
+        self.path = Path(logs_dir) / 'error.log'
+        self.path.write_bytes(b'old line\n')
+        self.follower = LogFollower('error', self.path)
+        self.addCleanup(self.follower.close)
+
+    def append(self, data):
+        with open(self.path, 'ab') as f:
+            f.write(data)
+
+    def test_follows_from_the_end_and_waits_for_whole_lines(self):
+        self.assertEqual(self.follower.poll(), [])
+        self.append(b'first\nsec')
+        self.assertEqual(self.follower.poll(), ['first'])
+        self.append(b'ond\n')
+        self.assertEqual(self.follower.poll(), ['second'])
+
+    def test_rotation_finishes_the_old_file_first(self):
+        self.follower.poll()
+        self.append(b'before rotation\n')
+        self.path.rename(self.path.with_name('error.log.1'))
+        self.path.write_bytes(b'after rotation\n')
+        self.assertEqual(self.follower.poll(), ['before rotation', 'after rotation'])
+
+    def test_truncated_file_is_reread(self):
+        self.follower.poll()
+        self.path.write_bytes(b'new\n')
+        self.assertEqual(self.follower.poll(), ['new'])
+
+    def test_truncated_and_refilled_file_is_reread(self):
+        self.follower.poll()
+        self.append(b'x' * 300 + b'\n')
+        self.follower.poll()
+        time.sleep(0.01)
+        self.path.write_bytes(b'after truncation\n' + b'y' * 400 + b'\n')
+        self.assertEqual(self.follower.poll(), ['after truncation', 'y' * 400])
+
+
+class LogParserTests(SimpleTestCase):
+
+    def test_parses_verbose_and_simple_lines(self):
+        parser = LogParser()
+        level, timestamp, module, pid, thread, message = parser.parse_line(
+            'ERROR 2026-03-02 14:03:05,250 views 1234 5678 Error in nominations view: boom\n'
+        )
+        self.assertEqual(
+            (level, module, pid, thread, message), ('ERROR', 'views', 1234, 5678, 'Error in nominations view: boom')
+        )
+        self.assertEqual(timestamp, datetime(2026, 3, 2, 14, 3, 5, 250000).timestamp())
+        self.assertEqual(
+            parser.parse_line('INFO 2026-03-02 14:03:06,000 Watching for file changes'),
+            ('INFO', datetime(2026, 3, 2, 14, 3, 6).timestamp(), '', 0, 0, 'Watching for file changes'),
+        )
+
+    def test_rejects_lines_that_do_not_start_a_record(self):
+        parser = LogParser()
+        for line in ('Traceback (most recent call last):', 'NOTICE 2026-03-02 14:03:05,250 x', 'ERROR 2026-03-02 late x', ''):
+            with self.subTest(line=line):
+                self.assertIsNone(parser.parse_line(line))
+
+    def test_continuation_lines_stay_with_their_record_across_batches(self):
+        lines = [
+            'stray line before any record\n',
+            'ERROR 2026-03-02 14:03:05,250 views 1 2 first\n',
+            'Traceback (most recent call last):\n',
+            '  ValueError: boom\n',
+            'ERROR 2026-03-02 14:03:06,250 views 1 2 second\n',
+            'ERROR 2026-03-02 14:03:07,250 views 1 2 third\n',
+        ]
+        batches = list(parse_lines(lines, batch_size=2))
+        self.assertEqual([len(batch) for batch in batches], [2, 1])
+        self.assertEqual(
+            batches[0].messages, ['first\nTraceback (most recent call last):\n  ValueError: boom', 'second']
+        )
+        self.assertEqual([row[5] for row in batches[1].rows()], ['third'])
+
+
+def log_line(message, second=0, level='ERROR', module='views'):
+    return f'{level} 2026-03-02 14:03:{second:02d},000 {module} 100 200 {message}\n'
+
+
+class LogDirTestCase(SimpleTestCase):
+    """Points the log tools at an empty logs directory."""
+
+    def setUp(self):
+        self.logs_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.logs_dir)
+        (self.logs_dir / 'archive').mkdir()
+        patcher = mock.patch.multiple(
+            log_analyzer, LOGS_DIR=self.logs_dir, ARCHIVE_DIR=self.logs_dir / 'archive',
+            CHECKPOINT_FILE=self.logs_dir / '.analyzer_checkpoint.json',
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def append(self, file_name, *lines):
+        with open(self.logs_dir / file_name, 'a') as f:
+            f.writelines(lines)
+
+    def archive(self, file_name, *lines):
+        with gzip.open(self.logs_dir / 'archive' / file_name, 'wt') as f:
+            f.writelines(lines)
+
+
+class LogAnalyzerTests(LogDirTestCase):
+
+    def collect(self, analysis='errors'):
+        return log_analyzer.collect([analysis], workers=1)[analysis]
+
+    def test_reads_archives_backups_and_the_live_log(self):
+        self.archive('error_20260301.log.gz', log_line('archived', module='mail'))
+        self.append('error.log.1', log_line('rotated', 1))
+        self.append('error.log', log_line('live', 2), 'Traceback (most recent call last):\n')
+        summary = self.collect()
+        self.assertEqual((summary['files'], summary['total']), (3, 3))
+        self.assertEqual(summary['counts']['types'], {'views': 2, 'mail': 1})
+        self.assertEqual(summary['latest'][-1][1], 'live')
+
+    def test_rerun_reads_only_appended_lines(self):
+        self.archive('error_20260301.log.gz', log_line('archived'))
+        self.append('error.log', log_line('first'), log_line('second', 1)[:20])
+        self.assertEqual(self.collect()['total'], 2)
+
+        # The half-written line is picked up once it is finished.
+        self.append('error.log', log_line('second', 1)[20:], log_line('third', 2))
+        with mock.patch.object(log_analyzer, 'scan_file', wraps=log_analyzer.scan_file) as scan_file:
+            summary = self.collect()
+        self.assertEqual(summary['total'], 4)
+        self.assertEqual(scan_file.call_count, 1)
+        self.assertEqual(scan_file.call_args.args[2], len(log_line('first')))
+
+    def test_truncated_log_is_read_again(self):
+        self.append('error.log', log_line('first'), log_line('second', 1))
+        self.collect()
+        (self.logs_dir / 'error.log').write_text(log_line('after truncation', 2))
+        summary = self.collect()
+        self.assertEqual(summary['total'], 1)
+        self.assertEqual(summary['latest'][-1][1], 'after truncation')
+
+    def test_rate_limit_peaks_keep_the_highest_count(self):
+        self.append('warning.log', *(
+            log_line(
+                f'Rate limit exceeded: scope=registration key=ip:192.0.2.1 rejected={rejected} window=7 limit=20/3600s',
+                level='WARNING', module='ratelimit',
+            )
+            for rejected in (1, 100, 200)
+        ))
+        self.assertEqual(self.collect('ratelimit')['peaks'], {'registration ip:192.0.2.1 7': 200})
+
+
+class LogWarehouseTests(LogDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.db_file = self.logs_dir / 'warehouse.sqlite3'
+
+    def ingest(self):
+        return log_warehouse.ingest(self.db_file, logs=('django', 'warning'))
+
+    def query(self, **filters):
+        return log_warehouse.query(self.db_file, **filters)
+
+    def test_request_fields(self):
+        for message, fields in (
+            ('"GET /register/?ref=x HTTP/1.1" 500 1234', ('/register/?ref=x', 500, None)),
+            ('Internal Server Error: /register/', ('/register/', None, None)),
+            ('Rate limit exceeded: scope=registration key=ip:192.0.2.1 rejected=1', (None, None, '192.0.2.1')),
+            ('Version 1.2.3.4.5 released', (None, None, None)),
+        ):
+            with self.subTest(message=message):
+                self.assertEqual(log_warehouse.request_fields(message), fields)
+
+    def test_ingest_and_query(self):
+        self.archive('django_20260301.log.gz', log_line('"GET / HTTP/1.1" 200 512', 0, 'INFO', 'basehttp'))
+        self.append(
+            'django.log',
+            log_line('"GET /speakers/ HTTP/1.1" 200 512', 10, 'INFO', 'basehttp'),
+            log_line('"POST /register/ HTTP/1.1" 500 80', 20, 'ERROR', 'basehttp'),
+            log_line('Internal Server Error: /register/', 21, 'ERROR', 'log'),
+        )
+        self.append('warning.log', log_line('Discount of 50% applied', 30, 'WARNING', 'views'))
+        self.assertEqual(self.ingest(), 5)
+
+        self.assertEqual([row[4] for row in self.query(status=500)], ['"POST /register/ HTTP/1.1" 500 80'])
+        by_path = self.query(group_by='path')
+        self.assertEqual(by_path[0], ('/register/', 2))
+        self.assertEqual(dict(by_path), {'/register/': 2, '/': 1, '/speakers/': 1, None: 1})
+        self.assertEqual(len(self.query(since='2026-03-02 14:03:10', until='2026-03-02 14:03:21')), 2)
+        self.assertEqual(len(self.query(log='django', level='error')), 2)
+        self.assertEqual(len(self.query(contains='50%')), 1)
+        with self.assertRaises(ValueError):
+            self.query(group_by='message')
+
+    def test_records_written_to_several_logs_are_stored_once(self):
+        boom = log_line('Error in registration view: boom', 5)
+        self.append('error.log', boom)
+        self.append('warning.log', log_line('slow', 3, 'WARNING'), boom)
+        self.append('info.log', boom)
+        self.assertEqual(log_warehouse.ingest(self.db_file, logs=('error', 'warning', 'info')), 2)
+        self.assertEqual(dict(self.query(group_by='level')), {'ERROR': 1, 'WARNING': 1})
+        self.assertEqual(self.query(level='error', group_by='log'), [('error', 1)])
+
+    def test_rerun_loads_only_new_lines(self):
+        self.append('django.log', log_line('"GET / HTTP/1.1" 200 512', 0, 'INFO', 'basehttp'))
+        self.assertEqual(self.ingest(), 1)
+        self.assertEqual(self.ingest(), 0)
+        self.append('django.log', log_line('"GET /speakers/ HTTP/1.1" 200 512', 1, 'INFO', 'basehttp'))
+        self.assertEqual(self.ingest(), 1)
+        self.assertEqual(len(self.query()), 2)
+
+    def test_truncated_log_replaces_its_rows(self):
+        self.append('django.log', *(log_line(f'"GET /{n}/ HTTP/1.1" 200 512', n, 'INFO', 'basehttp') for n in range(3)))
+        self.ingest()
+        (self.logs_dir / 'django.log').write_text(log_line('"GET /after/ HTTP/1.1" 200 512', 5, 'INFO', 'basehttp'))
+        self.assertEqual(self.ingest(), 1)
+        self.assertEqual(self.query(group_by='path'), [('/after/', 1)])
+
+
+class FollowLogsTests(LogDirTestCase):
+
+    def follow(self, *lines_by_log, **kwargs):
+        """Run one quiet round, write ``lines_by_log``, then stop after the next round."""
+        for log_type, _ in lines_by_log:
+            (self.logs_dir / f'{log_type}.log').write_text(log_line('before watching'))
+
+        def sleep(delay):
+            if sleep.rounds:
+                raise KeyboardInterrupt
+            sleep.rounds += 1
+            for log_type, lines in lines_by_log:
+                self.append(f'{log_type}.log', *lines)
+        sleep.rounds = 0
+
+        output = io.StringIO()
+        with (
+            mock.patch('monitor_logs.get_log_file', lambda log_type: self.logs_dir / f'{log_type}.log'),
+            mock.patch('time.sleep', sleep),
+            redirect_stdout(output),
+        ):
+            follow_logs([log_type for log_type, _ in lines_by_log], **kwargs)
+        return output.getvalue().splitlines()[2:-2]
+
+    def test_interleaves_by_time_and_prints_shared_records_once(self):
+        boom = log_line('boom', 5)
+        output = self.follow(
+            ('error', [boom, 'Traceback (most recent call last):\n']),
+            ('warning', [log_line('slow', 3, 'WARNING'), boom, log_line('late', 7, 'WARNING')]),
+        )
+        self.assertEqual(output, [
+            f"[warning] {log_line('slow', 3, 'WARNING').rstrip()}",
+            f'[error] {boom.rstrip()}',
+            '[error] Traceback (most recent call last):',
+            f"[warning] {log_line('late', 7, 'WARNING').rstrip()}",
+        ])
+
+    def test_level_filter_hides_continuations_of_hidden_records(self):
+        output = self.follow(
+            ('warning', [log_line('slow', 3, 'WARNING'), '  details\n', log_line('boom', 5)]), min_level='ERROR',
+        )
+        self.assertEqual(output, [f"[warning] {log_line('boom', 5).rstrip()}"])
+
+
+class CountingFile(io.BytesIO):
+    """In-memory file that counts the bytes read from it."""
+
+    bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+class ReadTailTests(LogDirTestCase):
+
+    def tail(self, data, lines, block_size=8):
+        path = self.logs_dir / 'info.log'
+        path.write_bytes(data)
+        return read_tail(path, lines, block_size)
+
+    def test_returns_the_last_lines_across_blocks(self):
+        data = b''.join(f'line {n}\n'.encode() for n in range(100))
+        self.assertEqual(self.tail(data, 3), ['line 97', 'line 98', 'line 99'])
+        self.assertEqual(self.tail(data, 3, block_size=8192), ['line 97', 'line 98', 'line 99'])
+
+    def test_short_and_unterminated_files(self):
+        self.assertEqual(self.tail(b'one\r\ntwo', 5), ['one', 'two'])
+        self.assertEqual(self.tail(b'only line\n', 1), ['only line'])
+        self.assertEqual(self.tail(b'', 5), [])
+        self.assertEqual(self.tail(b'one\ntwo\n', 0), [])
+
+    def test_reads_only_the_blocks_it_needs(self):
+        log_file = CountingFile(b'x' * 100000 + b'\nlast\n')
+        with mock.patch('monitor_logs.open', create=True, return_value=log_file):
+            self.assertEqual(read_tail('info.log', 1, block_size=16), ['last'])
+        self.assertEqual(log_file.bytes_read, 16)
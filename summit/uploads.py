@@ -0,0 +1,170 @@
+"""
+Streaming upload handling for nomination supporting documents.
+
+``DocumentUploadHandler`` replaces Django's memory/temporary-file handlers on
+the nomination form. Every upload goes straight to a temporary file in
+64KB chunks, so a 10MB PDF never sits in worker memory. The file type is
+checked against its first bytes as soon as they arrive, and a SHA-256 of
+the content is computed on the way through and left on the uploaded file as
+``sha256``. Files of the wrong type are skipped (the rest of their data is
+read and discarded) and the reason is reported to the form through
+``request.upload_errors``.
+
+Size is enforced without reading what is left of the body: a request whose
+Content-Length can't fit one document and the form fields is refused with a
+413 before any of it is read, and parsing stops (leaving the client to see
+the connection reset) the moment a file passes
+``SUMMIT_DOCUMENT_MAX_SIZE``.
+"""
+
+import hashlib
+import logging
+import os
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopUpload
+from django.http import HttpResponse
+from django.template.defaultfilters import filesizeformat
+from django.views.decorators.csrf import csrf_exempt
+
+logger = logging.getLogger('summit')
+
+# Accepted extensions and the leading bytes their content must start with.
+DOCUMENT_SIGNATURES = {
+    '.pdf': (b'%PDF-',),
+    '.doc': (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',),
+    '.docx': (b'PK\x03\x04',),
+    '.jpg': (b'\xff\xd8\xff',),
+    '.jpeg': (b'\xff\xd8\xff',),
+    '.png': (b'\x89PNG\r\n\x1a\n',),
+}
+DOCUMENT_EXTENSIONS = [ext.lstrip('.') for ext in DOCUMENT_SIGNATURES]
+SNIFF_BYTES = max(len(sig) for sigs in DOCUMENT_SIGNATURES.values() for sig in sigs)
+
+
+def max_document_size():
+    return getattr(settings, 'SUMMIT_DOCUMENT_MAX_SIZE', 10 * 1024 * 1024)
+
+
+def matches_signature(extension, head):
+    return any(head.startswith(sig) for sig in DOCUMENT_SIGNATURES.get(extension, ()))
+
+
+def upload_errors(request):
+    """Return ``{field_name: message}`` for files the handler rejected."""
+    return getattr(request, 'upload_errors', {})
+
+
+class DocumentUploadHandler(FileUploadHandler):
+    """Stream each file to disk, sniffing its type and hashing it on the way."""
+
+    chunk_size = 64 * 2 ** 10
+
+    def __init__(self, request=None, max_size=None):
+        super().__init__(request)
+        self.max_size = max_size or max_document_size()
+        if request is not None:
+            request.upload_errors = {}
+
+    def max_body_size(self):
+        """The largest body that can hold one document plus the form fields."""
+        return self.max_size + settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length > self.max_body_size():
+            logger.warning(f"Refused a {content_length} byte upload body")
+            raise StopUpload(connection_reset=True)
+        return None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        # The previous file now belongs to request.FILES.
+        self.__dict__.pop('file', None)
+        self.head = b''
+        self.size = 0
+        self.digest = hashlib.sha256()
+        self.extension = os.path.splitext(self.file_name)[1].lower()
+        if self.extension not in DOCUMENT_SIGNATURES:
+            self._reject(f"Unsupported file type. Allowed types: {', '.join(DOCUMENT_EXTENSIONS)}.")
+
+    def _record_rejection(self, message):
+        logger.warning(f"Rejected upload {self.file_name} ({self.field_name}): {message}")
+        if self.request is not None:
+            self.request.upload_errors[self.field_name] = message
+
+    def _reject(self, message):
+        self._record_rejection(message)
+        raise SkipFile(message)
+
+    def _signature_error(self):
+        if not matches_signature(self.extension, self.head):
+            return f"The file content does not match its {self.extension} extension."
+        return None
+
+    def _open(self):
+        self.file = TemporaryUploadedFile(
+            self.file_name, self.content_type, 0, self.charset, self.content_type_extra
+        )
+        self.file.write(self.head)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > self.max_size:
+            self._record_rejection(f"The file is larger than {filesizeformat(self.max_size)}.")
+            raise StopUpload(connection_reset=True)
+        self.digest.update(raw_data)
+        if hasattr(self, 'file'):
+            self.file.write(raw_data)
+        else:
+            self.head += raw_data
+            if len(self.head) >= SNIFF_BYTES:
+                error = self._signature_error()
+                if error:
+                    self._reject(error)
+                self._open()
+        return None
+
+    def file_complete(self, file_size):
+        if not hasattr(self, 'file'):
+            # Shorter than SNIFF_BYTES. The parser doesn't catch SkipFile
+            # here; returning None leaves the file out of request.FILES.
+            error = self._signature_error()
+            if error:
+                self._record_rejection(error)
+                return None
+            self._open()
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.digest.hexdigest()
+        return self.file
+
+    def upload_interrupted(self):
+        if hasattr(self, 'file'):
+            temp_location = self.file.temporary_file_path()
+            try:
+                self.file.close()
+                os.remove(temp_location)
+            except FileNotFoundError:
+                pass
+
+
+def stream_document_uploads(view_func):
+    """Parse the view's uploads with ``DocumentUploadHandler``.
+
+    Upload handlers can only be swapped before the body is read, which
+    CsrfViewMiddleware would otherwise do first, so the wrapper is
+    csrf_exempt: the decorated view must apply ``csrf_protect`` itself.
+    A body too large to hold a valid submission is answered with a 413.
+    """
+    @csrf_exempt
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if request.method == 'POST':
+            request.upload_handlers = [DocumentUploadHandler(request)]
+        try:
+            return view_func(request, *args, **kwargs)
+        except StopUpload:
+            return HttpResponse('The upload is too large.', status=413, content_type='text/plain')
+    return _wrapped_view
@@ -1,12 +1,18 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, async_views
+
+# The public pages have async twins for the ASGI deployment.
+public_views = async_views if getattr(settings, 'SUMMIT_ASYNC_VIEWS', False) else views
 
 urlpatterns = [
-    path('', views.home, name='home'),
-    path('speakers/', views.speakers, name='speakers'),
-    path('sponsorship/', views.sponsorship, name='sponsorship'),
+    path('', public_views.home, name='home'),
+    path('speakers/', public_views.speakers, name='speakers'),
+    path('sponsorship/', public_views.sponsorship, name='sponsorship'),
     path('nomination/', views.nominations, name='nominations'),
     path('nomination-success/', views.nomination_success, name='nomination_success'),
     path('register/', views.registration, name='registration'),
     path('registration-success/', views.registration_success, name='registration_success'),
-]
\ No newline at end of file
+    path('uploads/', views.upload_create, name='upload_create'),
+    path('uploads/<uuid:upload_id>/', views.upload_detail, name='upload_detail'),
+]
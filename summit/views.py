@@ -1,29 +1,52 @@
+import json
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
-from django.core.mail import send_mail
-from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
 import logging
 from .models import (
-    SiteSettings, EventContent, Speaker, SponsorshipLevel, Sponsor,
-    AwardCategory, Nomination, ExhibitionPackage, Exhibitor,
-    AboutSectionContent, SummitOrganizer, ConferenceRegistration
+    SiteSettings, Speaker, Sponsor, AwardCategory, SummitOrganizer,
+    ConferenceRegistration, ChunkedUpload
 )
 from .forms import NominationForm, ConferenceRegistrationForm
+from . import conditional
+from .mail import queue_email
+from .inventory import SoldOut, save_registration
+from .ratelimit import rate_limit
+from .uploads import stream_document_uploads, upload_errors
+from .chunked_uploads import UploadError, create_upload, append_chunk, attach_upload, max_chunk_size
+from .idempotency import unsign_submission_token, remember_result, recall_result
+from .cache import (
+    get_site_settings, get_event_content, get_about_section_content, cache_public_page,
+    get_slot_availability
+)
 
 # Get logger for this module
 logger = logging.getLogger('summit')
 
 
+def _site_name():
+    site_settings = get_site_settings()
+    return site_settings.site_name if site_settings else SiteSettings._meta.get_field('site_name').default
+
+
+@conditional.page_condition('home')
+@cache_public_page
 def home(request):
     try:
         logger.info(f"Home page accessed from IP: {request.META.get('REMOTE_ADDR')}")
         
-        site_settings = SiteSettings.objects.first()
-        event_content = EventContent.objects.first()
-        about_section_content = AboutSectionContent.objects.first()
-        featured_speakers = Speaker.objects.all()  # Show all speakers on home page
-        sponsors = Sponsor.objects.filter(is_active=True)
-        summit_organizers = SummitOrganizer.objects.filter(is_active=True)
+        site_settings = get_site_settings()
+        event_content = get_event_content()
+        about_section_content = get_about_section_content()
+        # Evaluated here so the log line below does not issue extra COUNT queries
+        featured_speakers = list(Speaker.objects.all())  # Show all speakers on home page
+        sponsors = list(Sponsor.objects.filter(is_active=True))
+        summit_organizers = list(SummitOrganizer.objects.filter(is_active=True))
         
         context = {
             'site_settings': site_settings,
@@ -34,7 +57,7 @@ def home(request):
             'summit_organizers': summit_organizers,
         }
         
-        logger.info(f"Home page loaded successfully with {featured_speakers.count()} speakers, {sponsors.count()} sponsors, {summit_organizers.count()} organizers")
+        logger.info(f"Home page loaded successfully with {len(featured_speakers)} speakers, {len(sponsors)} sponsors, {len(summit_organizers)} organizers")
         return render(request, 'summit/home.html', context)
         
     except Exception as e:
@@ -42,6 +65,8 @@ def home(request):
         raise
 
 
+@conditional.page_condition('speakers')
+@cache_public_page
 def speakers(request):
     speakers_list = Speaker.objects.all()
     context = {
@@ -50,9 +75,10 @@ def speakers(request):
     return render(request, 'summit/speakers.html', context)
 
 
+@conditional.page_condition('sponsorship')
+@cache_public_page
 def sponsorship(request):
-    sponsorship_levels = SponsorshipLevel.objects.all()
-    exhibition_packages = ExhibitionPackage.objects.all()
+    sponsorship_levels, exhibition_packages = get_slot_availability()
     context = {
         'sponsorship_levels': sponsorship_levels,
         'exhibition_packages': exhibition_packages,
@@ -60,6 +86,9 @@ def sponsorship(request):
     return render(request, 'summit/sponsorship.html', context)
 
 
+@stream_document_uploads
+@rate_limit('nominations', email_field='nominator_email')
+@csrf_protect
 def nominations(request):
     try:
         logger.info(f"Nominations page accessed from IP: {request.META.get('REMOTE_ADDR')}")
@@ -67,9 +96,23 @@ def nominations(request):
         
         if request.method == 'POST':
             logger.info(f"Nomination form submitted from IP: {request.META.get('REMOTE_ADDR')}")
-            form = NominationForm(request.POST, request.FILES)
+            form = NominationForm(request.POST, request.FILES, upload_errors=upload_errors(request))
             if form.is_valid():
-                nomination = form.save()
+                document = form.cleaned_data.get('supporting_documents')
+                if document:
+                    logger.info(f"Nomination document received: {document.name} ({document.size} bytes, sha256 {getattr(document, 'sha256', 'n/a')})")
+                with transaction.atomic():
+                    nomination = form.save(commit=False)
+                    document_upload = form.cleaned_data.get('document_upload')
+                    if document_upload:
+                        attach_upload(document_upload, nomination.supporting_documents)
+                    nomination.save()
+                    queue_email(
+                        nomination.nominator_email,
+                        'Your nomination has been received',
+                        'summit/emails/nomination_confirmation.txt',
+                        {'nomination': nomination, 'site_name': _site_name()},
+                    )
                 logger.info(f"New nomination submitted: {nomination.nominee_name} for {nomination.category.name} by {nomination.nominator_email}")
                 messages.success(request, 'Your nomination has been submitted successfully!')
                 return redirect('nominations')
@@ -93,19 +136,59 @@ def nomination_success(request):
     return render(request, 'summit/nomination_success.html')
 
 
+@csrf_exempt
+@rate_limit('registration', email_field='email')
+@csrf_protect
 def registration(request):
     try:
         logger.info(f"Registration page accessed from IP: {request.META.get('REMOTE_ADDR')}")
         
         if request.method == 'POST':
             logger.info(f"Registration form submitted from IP: {request.META.get('REMOTE_ADDR')}")
+            # Fast path: a resubmitted form is answered without validation or insert.
+            submission_key = unsign_submission_token(request.POST.get('submission_token', ''))
+            if submission_key and recall_result('registration', submission_key):
+                return _duplicate_registration(request)
+
             form = ConferenceRegistrationForm(request.POST)
             if form.is_valid():
-                registration = form.save()
+                submission_key = form.cleaned_data['submission_token']
+                try:
+                    with transaction.atomic():
+                        registration = form.save(commit=False)
+                        registration.idempotency_key = submission_key
+                        save_registration(registration)
+                        queue_email(
+                            registration.email,
+                            'Your registration has been received',
+                            'summit/emails/registration_confirmation.txt',
+                            {'registration': registration, 'site_name': _site_name()},
+                        )
+                except SoldOut:
+                    logger.info(f"Registration for sold out {form.cleaned_data['ticket_type']} ticket rejected")
+                    form.add_error('ticket_type', 'Sorry, this ticket type is sold out.')
+                    return render(request, 'summit/registration.html', {'form': form})
+                except IntegrityError:
+                    # A concurrent request inserted the same registration first.
+                    original = _original_registration(
+                        submission_key, form.cleaned_data['email'], form.cleaned_data['ticket_type']
+                    )
+                    if original is None:
+                        raise
+                    return _duplicate_registration(request, submission_key, original)
+
+                remember_result('registration', submission_key, registration.pk)
                 logger.info(f"New registration: {registration.first_name} {registration.last_name} ({registration.email}) - {registration.ticket_type}")
                 messages.success(request, 'Your registration has been submitted successfully! We will contact you with further details.')
                 return redirect('registration_success')
             else:
+                # The cached result may have expired, or the form may have been
+                # reloaded and sent again with a new token.
+                original = _original_registration(
+                    submission_key, request.POST.get('email', ''), request.POST.get('ticket_type', '')
+                )
+                if original:
+                    return _duplicate_registration(request, submission_key, original)
                 logger.warning(f"Invalid registration form submission from {request.META.get('REMOTE_ADDR')}: {form.errors}")
         else:
             form = ConferenceRegistrationForm()
@@ -120,5 +203,63 @@ def registration(request):
         raise
 
 
+def _original_registration(submission_key, email, ticket_type):
+    """Return the registration a submission repeats, by token or by email and ticket type."""
+    match = Q(email=email.strip().lower(), ticket_type=ticket_type) & ~Q(payment_status='expired')
+    if submission_key:
+        match |= Q(idempotency_key=submission_key)
+    return ConferenceRegistration.objects.filter(match).first()
+
+
+def _duplicate_registration(request, submission_key=None, original=None):
+    if original is not None:
+        if submission_key:
+            remember_result('registration', submission_key, original.pk)
+        logger.info(f"Duplicate registration for {original.email} ({original.ticket_type}) answered with #{original.pk}")
+    messages.info(request, 'We already have your registration. We will contact you with further details.')
+    return redirect('registration_success')
+
+
 def registration_success(request):
     return render(request, 'summit/registration_success.html')
+
+
+def _upload_state(upload):
+    return {
+        'id': str(upload.pk),
+        'offset': upload.offset,
+        'size': upload.size,
+        'status': upload.status,
+        'chunk_size': max_chunk_size(),
+    }
+
+
+@require_http_methods(['POST'])
+@rate_limit('uploads', json_response=True)
+def upload_create(request):
+    try:
+        payload = json.loads(request.body or b'{}')
+        upload = create_upload(payload.get('file_name'), int(payload.get('size', 0)))
+    except (ValueError, TypeError):
+        return JsonResponse({'error': 'Expected JSON with file_name and size.'}, status=400)
+    except UploadError as e:
+        return JsonResponse({'error': str(e)}, status=e.status)
+    return JsonResponse(_upload_state(upload), status=201)
+
+
+@require_http_methods(['GET', 'HEAD', 'PATCH'])
+@rate_limit('upload_chunks', methods=('PATCH',), json_response=True)
+def upload_detail(request, upload_id):
+    upload = get_object_or_404(ChunkedUpload, pk=upload_id)
+    if request.method == 'PATCH':
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+        except ValueError:
+            return JsonResponse({'error': 'Missing Upload-Offset header.', **_upload_state(upload)}, status=400)
+        try:
+            append_chunk(upload, offset, request)
+        except UploadError as e:
+            upload.refresh_from_db()
+            logger.warning(f"Chunk rejected for upload {upload.pk} at offset {offset}: {str(e)}")
+            return JsonResponse({'error': str(e), **_upload_state(upload)}, status=e.status)
+    return JsonResponse(_upload_state(upload))
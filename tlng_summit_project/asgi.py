@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tlng_summit_project.settings')
+# Serve the async versions of the public pages under an ASGI server.
+os.environ.setdefault('SUMMIT_ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
@@ -257,3 +257,96 @@ if not DEBUG:
         ('Admin', os.environ.get('ADMIN_EMAIL', 'admin@transportandlogisticssummit.ng')),
     ]
     MANAGERS = ADMINS
+else:
+    # Print outgoing mail instead of sending it; use the filebased backend to keep copies
+    EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+    EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Singleton content cache (SiteSettings, EventContent, AboutSectionContent).
+# Each worker re-checks the shared version key at most this often.
+SUMMIT_SINGLETON_RECHECK_SECONDS = 5
+
+# Full-page cache for anonymous visitors on home, speakers and sponsorship
+# (seconds, 0 disables). Off by default in development so template edits show.
+SUMMIT_PAGE_CACHE_TIMEOUT = int(os.environ.get('SUMMIT_PAGE_CACHE_TIMEOUT', '0' if DEBUG else '600'))
+
+# Deploy identifier mixed into the public pages' ETags, so browsers refetch
+# pages whose templates changed. Defaults to when Passenger was last
+# restarted through tmp/restart.txt; set it to the release or commit instead.
+_RESTART_FILE = BASE_DIR / 'tmp' / 'restart.txt'
+SUMMIT_BUILD_ID = os.environ.get('SUMMIT_BUILD_ID') or (
+    str(_RESTART_FILE.stat().st_mtime_ns) if _RESTART_FILE.exists() else ''
+)
+
+# Query inspection (debug/staging only): per-URL-name query budgets, checked by
+# summit.middleware.QueryInspectorMiddleware. Strict mode raises instead of logging.
+# The middleware removes itself at startup unless SUMMIT_QUERY_INSPECTOR is on;
+# settings_production.py turns it off whatever DEBUG was here.
+SUMMIT_QUERY_INSPECTOR = os.environ.get('SUMMIT_QUERY_INSPECTOR', str(DEBUG)).lower() in ('true', '1', 'yes')
+SUMMIT_QUERY_BUDGETS = {
+    'home': 7,
+    'speakers': 3,
+    'sponsorship': 4,
+    'nominations': 5,
+    'registration': 3,
+}
+SUMMIT_QUERY_BUDGET_STRICT = False
+SUMMIT_N_PLUS_ONE_THRESHOLD = 3
+
+MIDDLEWARE.append('summit.middleware.QueryInspectorMiddleware')
+
+# Image derivatives: when async, uploads queue a MediaJob for
+# `manage.py run_media_worker` instead of resizing inside the request.
+SUMMIT_MEDIA_ASYNC = os.environ.get('SUMMIT_MEDIA_ASYNC', 'False').lower() in ('true', '1', 'yes')
+SUMMIT_MEDIA_JOB_MAX_ATTEMPTS = 5
+SUMMIT_MEDIA_JOB_BACKOFF = 30  # seconds, doubled after each failed attempt
+SUMMIT_MEDIA_JOB_TIMEOUT = 600  # seconds before a running job is reclaimed
+SUMMIT_IMAGE_MISS_TIMEOUT = 60  # seconds an image without derivatives stays cached as such
+
+# Email outbox delivered by `manage.py send_outbox`
+SUMMIT_OUTBOX_MAX_ATTEMPTS = 5
+SUMMIT_OUTBOX_BACKOFF = 60  # seconds, doubled after each failed attempt
+SUMMIT_OUTBOX_CLAIM_TIMEOUT = 600  # seconds before an unfinished send is retried
+
+# Session strategy:
+#   'hybrid' (default) - cached_db sessions (only admin users get one) and
+#                        flash messages in a signed cookie, so anonymous form
+#                        round-trips never touch the django_session table
+#   'signed_cookies'   - sessions and messages entirely in signed cookies
+#   'db'               - Django's defaults
+SESSION_STRATEGY = os.environ.get('SESSION_STRATEGY', 'hybrid')
+if SESSION_STRATEGY == 'hybrid':
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+elif SESSION_STRATEGY == 'signed_cookies':
+    SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+    MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# Lifetime of the one-time token embedded in the registration form (seconds)
+SUMMIT_SUBMISSION_TOKEN_MAX_AGE = 24 * 60 * 60
+
+# Ticket inventory: unpaid registrations release their seat after this many
+# hours (`manage.py expire_reservations`); remaining capacity is cached briefly.
+SUMMIT_RESERVATION_TTL_HOURS = 72
+SUMMIT_INVENTORY_CACHE_SECONDS = 30
+
+# Route the public pages to summit.async_views; asgi.py turns this on.
+SUMMIT_ASYNC_VIEWS = os.environ.get('SUMMIT_ASYNC_VIEWS', 'False').lower() in ('true', '1', 'yes')
+
+# Request limits for the public forms and uploads as (requests, seconds), per
+# client IP and per submitted email; see summit/ratelimit.py.
+SUMMIT_RATE_LIMITS = {
+    'nominations': {'ip': (20, 60 * 60), 'email': (10, 60 * 60)},
+    'registration': {'ip': (20, 60 * 60), 'email': (5, 60 * 60)},
+    'uploads': {'ip': (30, 60 * 60)},
+    # One PATCH per SUMMIT_UPLOAD_CHUNK_SIZE, plus retries.
+    'upload_chunks': {'ip': (600, 60 * 60)},
+}
+
+# Largest nomination supporting document accepted (bytes); see summit/uploads.py.
+SUMMIT_DOCUMENT_MAX_SIZE = 10 * 1024 * 1024
+
+# Resumable uploads: parts are kept here until assembled and attached, and
+# `manage.py cleanup_uploads` removes abandoned ones.
+SUMMIT_CHUNKED_UPLOAD_DIR = BASE_DIR / 'tmp' / 'uploads'
+SUMMIT_UPLOAD_CHUNK_SIZE = 1024 * 1024
@@ -31,9 +31,27 @@ DATABASES = {
         'OPTIONS': {
             'charset': 'utf8mb4',
         },
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Connection reuse: 'pool' parks connections in a small per-worker pool between
+# requests, 'persistent' keeps one connection per thread for DB_CONN_MAX_AGE
+# seconds, 'per-request' opens and closes a connection for every request.
+DB_CONNECTION_MODE = os.environ.get('DB_CONNECTION_MODE', 'pool')
+if DB_CONNECTION_MODE == 'pool':
+    DATABASES['default'].update({
+        'ENGINE': 'summit.db.backends.mysql_pool',
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'SIZE': int(os.environ.get('DB_POOL_SIZE', '4')),
+            'RECYCLE': int(os.environ.get('DB_POOL_RECYCLE', '3600')),
+            'PING_AFTER': int(os.environ.get('DB_POOL_PING_AFTER', '30')),
+        },
+    })
+elif DB_CONNECTION_MODE == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', '300'))
+
 # Security settings for production
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -58,7 +76,7 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = '/home/transpor/public_html/media'
 
 # Email settings (update with your email provider)
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = os.environ.get('EMAIL_HOST', 'mail.yourdomain.com')
 EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '587'))
 EMAIL_USE_TLS = True
@@ -166,20 +184,43 @@ LOGGING = {
     }
 }
 
-# Cache configuration (optional - for better performance)
+# Cache configuration: a small in-process LRU (entries live at most
+# CACHE_LOCAL_TIMEOUT seconds) in front of a cache shared by all workers.
+# The shared tier is a local SQLite file unless CACHE_SHARED_BACKEND points
+# at e.g. django.core.cache.backends.memcached.PyMemcacheCache.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
-        'LOCATION': os.path.join(BASE_DIR, 'cache'),
-    }
+        'BACKEND': 'summit.cache_backends.TieredCache',
+        'OPTIONS': {
+            'SHARED': 'shared',
+            'LOCAL_MAX_ENTRIES': int(os.environ.get('CACHE_LOCAL_MAX_ENTRIES', '2000')),
+            'LOCAL_TIMEOUT': int(os.environ.get('CACHE_LOCAL_TIMEOUT', '5')),
+        },
+    },
+    'shared': {
+        'BACKEND': os.environ.get('CACHE_SHARED_BACKEND', 'summit.cache_backends.SQLiteCache'),
+        'LOCATION': os.environ.get('CACHE_SHARED_LOCATION', os.path.join(BASE_DIR, 'cache', 'cache.sqlite3')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
 }
 
-# Session configuration
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Full-page cache for anonymous visitors (seconds, 0 disables)
+SUMMIT_PAGE_CACHE_TIMEOUT = int(os.environ.get('SUMMIT_PAGE_CACHE_TIMEOUT', '600'))
+
+# Never record queries in production, even with DEBUG set in the environment
+SUMMIT_QUERY_INSPECTOR = False
+
+# Resize uploaded images in the background (run_media_worker via cron)
+SUMMIT_MEDIA_ASYNC = os.environ.get('SUMMIT_MEDIA_ASYNC', 'True').lower() in ('true', '1', 'yes')
+
+# Session configuration (SESSION_ENGINE follows SESSION_STRATEGY in settings.py)
 SESSION_COOKIE_AGE = 1209600  # 2 weeks
 
-# File upload settings
-FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
+# File upload settings: larger uploads are spooled to a temporary file
+# instead of worker memory. Nomination documents always stream to disk.
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(2.5 * 1024 * 1024)  # 2.5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 
 # Generate a new secret key for production